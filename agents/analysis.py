@@ -1,15 +1,30 @@
+import copy
 import json
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
-from config import ANALYSIS_DIR, CATEGORIES, PARSED_POSTS_DIR
+from agents.classifier import add_label, batch_category, local_category
+from agents.stylometry import measure, writing_style
+from agents.tone_merge import aggregate, mode
+from config import ANALYSIS_DIR, CATEGORIES, CATEGORY_CLASSIFIER, TONE_CHUNK_CHARS, TONE_MAX_CHUNKS
+from utils.llm_dispatcher import total_capacity
 from utils.logger import get_logger
+from utils.metrics import annotate, timed
 from utils.ollama_client import generate
+from utils.store import STORE_ERRORS, get_store
 
 logger = get_logger(__name__)
 
-_CATEGORY_PROMPT = """\
+# 프롬프트 템플릿(또는 스키마)을 바꾸면 버전을 올린다 — LLM 응답 캐시 키에 포함된다
+_CATEGORY_PROMPT_VERSION = "category-v2"
+_TONE_PROMPT_VERSION = "tone-v3"
+_COMBINED_PROMPT_VERSION = "combined-v3"
+
+# 프롬프트는 고정 지시문(_*_INSTRUCTIONS)을 앞에, 글마다 바뀌는 제목·본문(_*_POST)을 뒤에 둔다.
+# 지시문이 모든 호출에서 바이트 단위로 같은 접두부가 되어 Ollama가 KV 캐시로 재사용한다 (generate의 prefix)
+_CATEGORY_INSTRUCTIONS = """\
 다음 블로그 글을 읽고, 아래 카테고리 중 정확히 하나를 선택하세요.
 허용 카테고리: {categories}
 
@@ -17,116 +32,135 @@ _CATEGORY_PROMPT = """\
 반드시 아래 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요:
 {{"category": "tech"}}
 
+""".format(categories=", ".join(CATEGORIES))
+
+_CATEGORY_POST = """\
 제목: {title}
 본문 (일부): {content}"""
 
 
+# Ollama structured output 스키마 — 응답이 항상 이 형식의 JSON으로 제한된다
+_CATEGORY_SCHEMA = {
+    "type": "object",
+    "properties": {"category": {"type": "string", "enum": CATEGORIES}},
+    "required": ["category"],
+}
+
+
 def _parse_category(response: str) -> str:
-    """LLM 응답에서 카테고리 값을 추출한다. 실패 시 'etc'를 반환한다."""
+    """LLM 응답(JSON)에서 카테고리 값을 추출한다. 실패 시 'etc'를 반환한다."""
     try:
-        data = json.loads(response.strip())
-        return data.get("category", "etc")
+        data = json.loads(response)
+        if isinstance(data, dict) and isinstance(data.get("category"), str):
+            return data["category"]
     except json.JSONDecodeError:
         pass
 
-    # JSON 파싱 실패 시 정규식으로 카테고리 값 추출
-    match = re.search(r'"category"\s*:\s*"([^"]+)"', response)
-    if match:
-        return match.group(1)
-
     logger.warning("카테고리 파싱 실패, etc 적용: response=%r", response[:100])
     return "etc"
 
 
-def analyze(json_path: Path) -> Path | None:
+@timed("analysis.category")
+def analyze(json_path: Path, force: bool = False) -> Path | None:
     """
-    parsed_posts JSON 파일을 읽어 카테고리를 분류하고 analysis 디렉터리에 저장한다.
-    이미 분석된 파일은 스킵한다. 실패 시 None을 반환한다.
+    parsed_posts의 글을 읽어 카테고리를 분류하고 analysis에 저장한다. (json_path.stem = slug)
+    로컬 분류기(agents.classifier)를 먼저 쓰고, 확신도가 낮은 글만 LLM으로 분류한다.
+    이미 분석된 글은 스킵한다. (force=True이면 다시 분석하며 tone_and_manner도 초기화된다)
+    실패 시 None을 반환한다.
     """
-    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-
+    store = get_store()
+    slug = json_path.stem
     output_path = ANALYSIS_DIR / json_path.name
-    if output_path.exists():
-        print(f"  [skip] 이미 분석됨: {json_path.name}")
-        return output_path
-
     try:
-        post = json.loads(json_path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError) as e:
-        logger.error("parsed_posts 파일 읽기 실패: path=%s, %s", json_path, e)
+        if store.has_analysis(slug) and not force:
+            print(f"  [skip] 이미 분석됨: {json_path.name}")
+            return output_path
+        post = store.get_post(slug)
+    except STORE_ERRORS as e:
+        logger.error("parsed_posts 읽기 실패: slug=%s, %s", slug, e)
         print(f"  [fail] 파일 읽기 실패: {json_path.name}")
         return None
+    if post is None:
+        logger.error("parsed_posts 없음: slug=%s", slug)
+        print(f"  [fail] parsed_posts 없음: {json_path.name}")
+        return None
 
     title = post.get("title", "")
-    content = post.get("content", "")[:800]
-
-    prompt = _CATEGORY_PROMPT.format(
-        categories=", ".join(CATEGORIES),
-        title=title,
-        content=content,
-    )
+    content = post.get("content", "")
 
+    # 로컬 분류기가 확신하면 LLM을 호출하지 않고, 아니면 다른 워커의 글과 묶어 일괄 분류한다
+    local = local_category(title, content) if CATEGORY_CLASSIFIER else None
+    source = "local" if local is not None else "llm"
+    annotate(category_source=source)
     try:
-        response = generate(prompt)
+        if local is not None:
+            raw_category = local[0]
+        else:
+            raw_category = batch_category(title, content) if CATEGORY_CLASSIFIER else None
+        if raw_category is None:
+            response = generate(
+                _CATEGORY_POST.format(title=title, content=content[:800]),
+                format=_CATEGORY_SCHEMA,
+                cache_version=_CATEGORY_PROMPT_VERSION,
+                prefix=_CATEGORY_INSTRUCTIONS,
+            )
+            raw_category = _parse_category(response)
     except Exception as e:
-        logger.error("LLM 카테고리 분류 실패: slug=%s, %s", json_path.stem, e)
+        logger.error("LLM 카테고리 분류 실패: slug=%s, %s", slug, e)
         print(f"  [fail] LLM 호출 실패: {e}")
         return None
 
-    raw_category = _parse_category(response)
     category = raw_category if raw_category in CATEGORIES else "etc"
 
     result = {
-        "slug": json_path.stem,
+        "slug": slug,
         "url": post.get("url", ""),
         "title": title,
         "category": category,
+        "category_source": source,
         "analyzed_at": datetime.now(timezone.utc).isoformat(),
     }
 
     try:
-        output_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
-    except OSError as e:
+        store.put_analysis(slug, result)
+    except STORE_ERRORS as e:
         logger.error("분석 결과 저장 실패: path=%s, %s", output_path, e)
         print(f"  [fail] 분석 결과 저장 실패: {output_path.name}")
         return None
 
-    return output_path
+    # LLM 라벨은 learn 끝에 로컬 분류기에 더한다 (classifier.update)
+    if CATEGORY_CLASSIFIER and source == "llm":
+        add_label(slug, title, content, category)
 
+    return output_path
 
-_TONE_PROMPT = """\
-다음 블로그 글을 읽고 문체, 어휘, 구조 패턴을 분석하세요.
 
-제목: {title}
-본문:
-{content}
+_TONE_INSTRUCTIONS = """\
+다음 블로그 글을 읽고 어휘와 구조 패턴을 분석하세요.
 
 아래 항목을 분석해서 JSON 형식으로 응답하세요:
 
-1. writing_style:
-   - formality: "formal" (경어) 또는 "casual" (반말)
-   - sentence_length: "short" (짧은 문장), "medium" (중간), "long" (긴 문장)
-   - paragraph_structure: "short_paragraphs", "long_paragraphs", "mixed"
-
-2. vocabulary:
+1. vocabulary:
    - frequent_expressions: 자주 사용하는 접속사·부사 (최대 10개, 배열)
    - technical_terms: 전문 용어 또는 특정 분야 단어 (최대 10개, 배열)
    - avoid_expressions: 사용하지 않는 표현 (있다면, 배열)
 
-3. structure:
+2. structure:
    - opening_style: "question" (질문 시작), "story" (스토리텔링), "direct" (직접 설명)
    - body_style: "step_by_step" (단계별), "list" (리스트형), "narrative" (서술형)
    - closing_style: "summary" (요약), "call_to_action" (행동 유도), "question" (질문)
 
 반드시 아래 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요:
-{{"writing_style": {{}}, "vocabulary": {{}}, "structure": {{}}}}"""
+{"vocabulary": {}, "structure": {}}
+
+"""
+
+_TONE_POST = """\
+제목: {title}
+본문:
+{content}"""
 
 _TONE_DEFAULT: dict = {
-    "writing_style": {
-        "formality": "casual",
-        "sentence_length": "medium",
-        "paragraph_structure": "mixed",
-    },
     "vocabulary": {
         "frequent_expressions": [],
         "technical_terms": [],
@@ -140,77 +174,327 @@ _TONE_DEFAULT: dict = {
 }
 
 
-def _parse_tone(response: str) -> dict:
-    """LLM 응답에서 톤앤매너 dict를 추출한다. 실패 시 기본값을 반환한다."""
+def _enum(*values: str) -> dict:
+    return {"type": "string", "enum": list(values)}
+
+
+_STRING_ARRAY = {"type": "array", "items": {"type": "string"}}
+
+# writing_style(격식·문장 길이·단락 구성)은 agents.stylometry로 본문 전체에서 측정하므로 LLM에 묻지 않는다
+_TONE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "vocabulary": {
+            "type": "object",
+            "properties": {
+                "frequent_expressions": _STRING_ARRAY,
+                "technical_terms": _STRING_ARRAY,
+                "avoid_expressions": _STRING_ARRAY,
+            },
+            "required": ["frequent_expressions", "technical_terms", "avoid_expressions"],
+        },
+        "structure": {
+            "type": "object",
+            "properties": {
+                "opening_style": _enum("question", "story", "direct"),
+                "body_style": _enum("step_by_step", "list", "narrative"),
+                "closing_style": _enum("summary", "call_to_action", "question"),
+            },
+            "required": ["opening_style", "body_style", "closing_style"],
+        },
+    },
+    "required": ["vocabulary", "structure"],
+}
+
+
+_TONE_KEYS = ("vocabulary", "structure")
+
+
+def _parse_tone(response: str) -> dict | None:
+    """
+    LLM 응답(JSON)에서 vocabulary / structure를 추출한다.
+    파싱에 실패하거나 vocabulary / structure가 객체(dict)가 아니면 None을 반환한다.
+    """
     try:
-        data = json.loads(response.strip())
-        if all(k in data for k in ("writing_style", "vocabulary", "structure")):
-            return data
+        data = json.loads(response)
+        if isinstance(data, dict) and all(isinstance(data.get(k), dict) for k in _TONE_KEYS):
+            return {k: data[k] for k in _TONE_KEYS}
     except json.JSONDecodeError:
         pass
 
-    # JSON 블록만 추출 시도
-    match = re.search(r'\{[\s\S]*\}', response)
-    if match:
+    logger.warning("톤앤매너 파싱 실패, 청크 제외: response=%r", response[:100])
+    return None
+
+
+def _split_chunks(content: str, size: int = TONE_CHUNK_CHARS, limit: int = TONE_MAX_CHUNKS) -> list[str]:
+    """
+    본문을 단락(줄) 경계에서 size자 이하 청크로 나눈다. size보다 긴 단락은 그 단락만 잘라 나눈다.
+    청크가 limit개를 넘으면 첫 청크(도입부)와 마지막 청크(마무리)를 포함해 고르게 limit개를 고른다.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    length = 0
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if current and length + len(line) > size:
+            chunks.append("\n".join(current))
+            current, length = [], 0
+        while len(line) > size:
+            chunks.append(line[:size])
+            line = line[size:]
+        current.append(line)
+        length += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+
+    if len(chunks) <= limit:
+        return chunks or [""]
+    if limit <= 1:
+        return chunks[:1]
+    step = (len(chunks) - 1) / (limit - 1)
+    return [chunks[round(i * step)] for i in range(limit)]
+
+
+def _generate_chunks(prompts: list[str], schema: dict, cache_version: str, prefix: str) -> list[str | None]:
+    """
+    청크별 프롬프트(prefix 뒤에 붙는 부분)를 동시에 LLM에 보내고 응답을 청크 순서대로 반환한다.
+    동시 요청 수는 Ollama 백엔드 처리량(total_capacity)을 넘지 않는다.
+    실패한 청크는 None으로 자리를 남겨 첫·마지막 청크의 위치가 유지되게 하고,
+    모두 실패하면 마지막 예외를 다시 발생시킨다.
+    """
+    annotate(chunks=len(prompts))
+    if len(prompts) == 1:
+        return [generate(prompts[0], format=schema, cache_version=cache_version, prefix=prefix)]
+
+    def call(prompt: str) -> str | Exception:
         try:
-            data = json.loads(match.group())
-            if all(k in data for k in ("writing_style", "vocabulary", "structure")):
-                return data
-        except json.JSONDecodeError:
-            pass
+            return generate(prompt, format=schema, cache_version=cache_version, prefix=prefix)
+        except Exception as e:
+            logger.warning("청크 분석 실패, 나머지 청크로 진행: %s", e)
+            return e
 
-    logger.warning("톤앤매너 파싱 실패, 기본값 적용: response=%r", response[:100])
-    return _TONE_DEFAULT.copy()
+    with ThreadPoolExecutor(min(len(prompts), total_capacity())) as pool:
+        results = list(pool.map(call, prompts))
+    if not any(isinstance(r, str) for r in results):
+        raise results[-1]
+    return [r if isinstance(r, str) else None for r in results]
 
 
+def _merge_tone(partials: list[dict | None], features: dict) -> dict:
+    """
+    청크별 톤앤매너(_parse_tone 결과)를 스타일 가이드 집계(aggregate)와 같은 규칙으로 합친다.
+    파싱에 실패한 청크(None)는 제외하고, 모든 청크가 실패했을 때만 기본값을 사용한다.
+    도입부 스타일은 첫 청크, 마무리 스타일은 마지막 청크 결과를 사용한다. (그 청크가 실패했으면 최빈값)
+    writing_style은 본문 전체를 측정한 문체 지표로 정한다.
+    """
+    style = {"writing_style": writing_style(features)}
+    parsed = [tm for tm in partials if tm is not None]
+    if not parsed:
+        logger.warning("톤앤매너 파싱 실패 (전체 청크 %d개), 기본값 적용", len(partials))
+        return style | copy.deepcopy(_TONE_DEFAULT)
+    if len(parsed) == 1:
+        return style | parsed[0]
+    merged = aggregate([{"tone_and_manner": tm} for tm in parsed])
+    structure = merged["structure"]
+    if partials[0] is not None:
+        structure["opening_style"] = partials[0]["structure"].get("opening_style") or structure["opening_style"]
+    if partials[-1] is not None:
+        structure["closing_style"] = partials[-1]["structure"].get("closing_style") or structure["closing_style"]
+    return style | {"vocabulary": merged["vocabulary"], "structure": structure}
+
+
+@timed("analysis.tone")
 def add_tone_and_manner(analysis_path: Path) -> bool:
     """
-    analysis JSON에 tone_and_manner 필드를 추가한다.
+    analysis 레코드에 tone_and_manner 필드를 추가한다. (analysis_path.stem = slug)
+    긴 글은 단락 경계 청크로 나눠 동시에 분석한 뒤 합친다.
     이미 필드가 있으면 스킵한다. 성공 시 True, 실패 시 False를 반환한다.
     """
+    store = get_store()
     try:
-        analysis = json.loads(analysis_path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError) as e:
-        logger.error("analysis 파일 읽기 실패: path=%s, %s", analysis_path, e)
+        analysis = store.get_analysis(analysis_path.stem)
+    except STORE_ERRORS as e:
+        logger.error("analysis 읽기 실패: slug=%s, %s", analysis_path.stem, e)
         print(f"  [fail] analysis 파일 읽기 실패: {analysis_path.name}")
         return False
+    if analysis is None:
+        logger.error("analysis 없음: slug=%s", analysis_path.stem)
+        print(f"  [fail] analysis 없음: {analysis_path.name}")
+        return False
 
     if "tone_and_manner" in analysis:
         print(f"  [skip] 톤앤매너 이미 분석됨: {analysis_path.name}")
         return True
 
     slug = analysis.get("slug", analysis_path.stem)
-    parsed_path = PARSED_POSTS_DIR / f"{slug}.json"
-    if not parsed_path.exists():
+    try:
+        post = store.get_post(slug)
+    except STORE_ERRORS as e:
+        logger.error("parsed_posts 읽기 실패: slug=%s, %s", slug, e)
+        print(f"  [fail] parsed_posts 파일 읽기 실패: {slug}.json")
+        return False
+    if post is None:
         logger.error("parsed_posts 파일 없음: slug=%s", slug)
         print(f"  [fail] parsed_posts 파일 없음: {slug}.json")
         return False
 
-    try:
-        post = json.loads(parsed_path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError) as e:
-        logger.error("parsed_posts 파일 읽기 실패: path=%s, %s", parsed_path, e)
-        print(f"  [fail] parsed_posts 파일 읽기 실패: {parsed_path.name}")
-        return False
-
     title = post.get("title", "")
-    content = post.get("content", "")[:2000]
+    content = post.get("content", "")
+    features = measure(content)
 
-    prompt = _TONE_PROMPT.format(title=title, content=content)
+    prompts = [_TONE_POST.format(title=title, content=chunk) for chunk in _split_chunks(content)]
 
     try:
-        response = generate(prompt)
-        analysis["tone_and_manner"] = _parse_tone(response)
+        responses = _generate_chunks(prompts, _TONE_SCHEMA, _TONE_PROMPT_VERSION, _TONE_INSTRUCTIONS)
+        analysis["tone_and_manner"] = _merge_tone([None if r is None else _parse_tone(r) for r in responses], features)
     except Exception as e:
         logger.error("LLM 톤앤매너 분석 실패: slug=%s, %s", slug, e)
         print(f"  [fail] LLM 호출 실패 (톤앤매너): {e}")
-        analysis["tone_and_manner"] = _TONE_DEFAULT.copy()
+        analysis["tone_and_manner"] = {"writing_style": writing_style(features)} | copy.deepcopy(_TONE_DEFAULT)
+    analysis["stylometry"] = features
 
     try:
-        analysis_path.write_text(json.dumps(analysis, ensure_ascii=False, indent=2), encoding="utf-8")
-    except OSError as e:
+        store.put_analysis(analysis_path.stem, analysis)
+    except STORE_ERRORS as e:
         logger.error("톤앤매너 저장 실패: path=%s, %s", analysis_path, e)
         print(f"  [fail] 톤앤매너 저장 실패: {analysis_path.name}")
         return False
 
     return True
+
+
+_COMBINED_INSTRUCTIONS = """\
+다음 블로그 글을 읽고 카테고리를 분류한 뒤 어휘와 구조 패턴을 분석하세요.
+
+아래 항목을 분석해서 JSON 형식으로 응답하세요:
+
+0. category: 아래 허용 카테고리 중 정확히 하나 (목록에 없으면 "etc")
+   허용 카테고리: {categories}
+
+1. vocabulary:
+   - frequent_expressions: 자주 사용하는 접속사·부사 (최대 10개, 배열)
+   - technical_terms: 전문 용어 또는 특정 분야 단어 (최대 10개, 배열)
+   - avoid_expressions: 사용하지 않는 표현 (있다면, 배열)
+
+2. structure:
+   - opening_style: "question" (질문 시작), "story" (스토리텔링), "direct" (직접 설명)
+   - body_style: "step_by_step" (단계별), "list" (리스트형), "narrative" (서술형)
+   - closing_style: "summary" (요약), "call_to_action" (행동 유도), "question" (질문)
+
+반드시 아래 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요:
+{{"category": "tech", "vocabulary": {{}}, "structure": {{}}}}
+
+""".format(categories=", ".join(CATEGORIES))
+
+_COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "category": _CATEGORY_SCHEMA["properties"]["category"],
+        **_TONE_SCHEMA["properties"],
+    },
+    "required": ["category", *_TONE_SCHEMA["required"]],
+}
+
+
+@timed("analysis.combined")
+def analyze_combined(json_path: Path, force: bool = False) -> Path | None:
+    """
+    카테고리 분류와 톤앤매너 분석을 한 프롬프트로 수행해 analysis 디렉터리에 저장한다.
+    긴 글은 청크별로 동시에 호출하고 카테고리는 최빈값, 톤앤매너는 _merge_tone으로 합친다.
+    로컬 분류기가 카테고리를 확신하는 글은 톤앤매너 프롬프트만 사용한다.
+    analyze() + add_tone_and_manner()와 같은 형식의 레코드를 한 번에 기록한다.
+    톤앤매너까지 분석된 글은 스킵한다. (force=True이면 다시 분석한다) 실패 시 None을 반환한다.
+    """
+    store = get_store()
+    slug = json_path.stem
+    output_path = ANALYSIS_DIR / json_path.name
+    if not force:
+        try:
+            existing = store.get_analysis(slug)
+        except STORE_ERRORS:
+            existing = None
+        if existing is not None and "tone_and_manner" in existing:
+            print(f"  [skip] 이미 분석됨: {json_path.name}")
+            return output_path
+
+    try:
+        post = store.get_post(slug)
+    except STORE_ERRORS as e:
+        logger.error("parsed_posts 읽기 실패: slug=%s, %s", slug, e)
+        print(f"  [fail] 파일 읽기 실패: {json_path.name}")
+        return None
+    if post is None:
+        logger.error("parsed_posts 없음: slug=%s", slug)
+        print(f"  [fail] parsed_posts 없음: {json_path.name}")
+        return None
+
+    title = post.get("title", "")
+    content = post.get("content", "")
+    features = measure(content)
+
+    # 로컬 분류기가 카테고리를 확신하면 톤앤매너만 묻는다
+    local = local_category(title, content) if CATEGORY_CLASSIFIER else None
+    source = "local" if local is not None else "llm"
+    annotate(category_source=source)
+    prompts = [_TONE_POST.format(title=title, content=chunk) for chunk in _split_chunks(content)]
+    if local is not None:
+        schema, cache_version, instructions = _TONE_SCHEMA, _TONE_PROMPT_VERSION, _TONE_INSTRUCTIONS
+    else:
+        schema, cache_version, instructions = _COMBINED_SCHEMA, _COMBINED_PROMPT_VERSION, _COMBINED_INSTRUCTIONS
+
+    try:
+        responses = _generate_chunks(prompts, schema, cache_version, instructions)
+    except Exception as e:
+        logger.error("LLM 통합 분석 실패: slug=%s, %s", slug, e)
+        print(f"  [fail] LLM 호출 실패: {e}")
+        return None
+
+    if local is not None:
+        category = local[0]
+    else:
+        # 청크별 카테고리의 최빈값 (동률이면 앞 청크 우선)
+        categories = [_parse_category(r) for r in responses if r is not None]
+        category = mode([c if c in CATEGORIES else "etc" for c in categories])
+
+    result = {
+        "slug": slug,
+        "url": post.get("url", ""),
+        "title": title,
+        "category": category,
+        "category_source": source,
+        "analyzed_at": datetime.now(timezone.utc).isoformat(),
+        "tone_and_manner": _merge_tone([None if r is None else _parse_tone(r) for r in responses], features),
+        "stylometry": features,
+    }
+
+    try:
+        store.put_analysis(slug, result)
+    except STORE_ERRORS as e:
+        logger.error("분석 결과 저장 실패: path=%s, %s", output_path, e)
+        print(f"  [fail] 분석 결과 저장 실패: {output_path.name}")
+        return None
+
+    # LLM 라벨은 learn 끝에 로컬 분류기에 더한다 (classifier.update)
+    if CATEGORY_CLASSIFIER and source == "llm":
+        add_label(slug, title, content, category)
+
+    return output_path
+
+
+def analyze_post(json_path: Path, analysis_mode: str, force: bool = False) -> tuple[Path | None, float]:
+    """
+    분석 단계(카테고리 + 톤앤매너)를 analysis_mode("combined" / "split")에 따라 수행하고
+    (analysis 경로 또는 None, 소요 시간)을 반환한다.
+    """
+    started = time.perf_counter()
+
+    if analysis_mode == "combined":
+        analysis_path = analyze_combined(json_path, force=force)
+    else:
+        analysis_path = analyze(json_path, force=force)
+        if analysis_path is not None and not add_tone_and_manner(analysis_path):
+            analysis_path = None
+
+    return analysis_path, time.perf_counter() - started
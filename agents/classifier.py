@@ -0,0 +1,402 @@
+"""
+카테고리 사전 분류기.
+
+1. 로컬 분류: 이전에 LLM이 분류한 글(analysis의 category)로 학습한 다항 나이브 베이즈 모델.
+   제목·본문 앞부분의 어절과 어절 내 글자 2-gram을 특징으로 하며 분류는 수 마이크로초~밀리초에 끝난다.
+   사후확률(확신도)이 CATEGORY_CONFIDENCE 이상이면 LLM을 호출하지 않는다.
+2. LLM 일괄 분류: 확신도가 낮은 글은 동시에 분석 중인 다른 글과 최대 CATEGORY_BATCH_SIZE개씩
+   한 프롬프트로 묶어 분류한다.
+
+로컬 분류 결과는 category_source = "local"로 기록하고 학습 데이터에서 제외한다. (자기 강화 방지)
+모델은 카테고리별 토큰 빈도를 저장하므로 learn은 그 실행에서 LLM이 분류한 글만 더한다. (update)
+저장소 전체를 다시 읽어 처음부터 학습하는 것은 `classify train`뿐이다. (train)
+일괄 분류는 분석 워커가 둘 이상(total_capacity() > 1)일 때만 묶을 글이 생긴다.
+agreement_report()는 LLM 라벨에 대한 교차 검증으로 임계값별 적용 비율·일치율을 계산한다.
+"""
+import copy
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from config import (
+    CATEGORIES,
+    CATEGORY_BATCH_SIZE,
+    CATEGORY_BATCH_WAIT,
+    CATEGORY_CONFIDENCE,
+    CATEGORY_MIN_LABELS,
+    CATEGORY_MODEL_FILE,
+    OLLAMA_FIRST_TOKEN_TIMEOUT,
+    OLLAMA_TIMEOUT,
+)
+from utils.llm_dispatcher import total_capacity
+from utils.logger import get_logger
+from utils.metrics import annotate, timed
+from utils.ollama_client import generate
+from utils.store import STORE_ERRORS, get_store
+
+logger = get_logger(__name__)
+
+# 특징 추출 방식을 바꾸면 올린다 — 이전 버전 모델은 사용하지 않고 다시 학습한다
+_MODEL_VERSION = 1
+_BATCH_PROMPT_VERSION = "category-batch-v2"
+
+_CONTENT_CHARS = 800  # 단건 LLM 분류 프롬프트와 같은 범위만 본다
+_BATCH_CONTENT_CHARS = 400  # 일괄 프롬프트는 글 여러 개가 컨텍스트에 들어가도록 더 짧게 자른다
+_WORD_RE = re.compile(r"\w+")
+
+# 나이브 베이즈는 특징이 독립이라고 가정해 긴 글일수록 확신도가 1에 붙는다.
+# 학습에 있던 토큰이 이 수보다 많으면 로그우도를 줄여 이 수만큼의 증거로 본다
+_EVIDENCE_TOKENS = 20
+
+_REPORT_FOLDS = 5
+_REPORT_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+# 일괄 분류 결과를 기다리는 최대 시간 (초) — 백엔드 대기와 LLM 응답을 모두 포함한다. 넘으면 단건 프롬프트로 분류한다
+_BATCH_RESULT_TIMEOUT = OLLAMA_FIRST_TOKEN_TIMEOUT + OLLAMA_TIMEOUT
+
+# 고정 지시문을 앞에 두어 묶음 크기와 관계없이 같은 접두부가 되게 한다 (generate의 prefix)
+_BATCH_INSTRUCTIONS = """\
+다음 블로그 글들을 읽고, 각 글마다 아래 카테고리 중 정확히 하나를 선택하세요.
+허용 카테고리: {categories}
+
+목록에 없는 카테고리는 절대 사용하지 말고 "etc"를 선택하세요.
+글 번호 순서대로 글마다 카테고리 하나씩 배열에 담아 아래 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요:
+{{"categories": ["tech", "food"]}}
+
+""".format(categories=", ".join(CATEGORIES))
+
+_BATCH_POST = """\
+[{number}]
+제목: {title}
+본문 (일부): {content}"""
+
+
+def _tokens(title: str, content: str) -> list[str]:
+    """어절과 어절 내 글자 2-gram. 제목은 본문보다 주제를 잘 드러내므로 두 번 센다."""
+    text = f"{title}\n{title}\n{content[:_CONTENT_CHARS]}".lower()
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        tokens.append(word)
+        if len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _empty_model() -> dict:
+    return {"version": _MODEL_VERSION, "labels": 0, "docs": {}, "counts": {}, "totals": {}, "vocab": 0}
+
+
+def _add_sample(model: dict, tokens: list[str], category: str) -> None:
+    """모델에 글 하나의 카테고리별 문서 수·토큰 빈도를 더한다."""
+    counts = model["counts"].setdefault(category, {})
+    for token in tokens:
+        if token not in counts and not any(token in c for c in model["counts"].values()):
+            model["vocab"] += 1
+        counts[token] = counts.get(token, 0) + 1
+    model["docs"][category] = model["docs"].get(category, 0) + 1
+    model["totals"][category] = model["totals"].get(category, 0) + len(tokens)
+    model["labels"] += 1
+
+
+def _fit(samples: list[tuple[list[str], str]]) -> dict:
+    """(토큰 목록, 카테고리) 목록으로 나이브 베이즈 모델(카테고리별 문서 수·토큰 빈도)을 만든다."""
+    model = _empty_model()
+    for tokens, category in samples:
+        _add_sample(model, tokens, category)
+    return model
+
+
+def _posterior(model: dict, tokens: list[str]) -> dict[str, float]:
+    """카테고리별 사후확률. 학습에 없던 토큰은 무시한다."""
+    known = [t for t in tokens if any(t in counts for counts in model["counts"].values())]
+    scale = min(1.0, _EVIDENCE_TOKENS / len(known)) if known else 0.0
+    scores = {}
+    for category, doc_count in model["docs"].items():
+        counts = model["counts"][category]
+        denominator = model["totals"][category] + model["vocab"]
+        likelihood = sum(math.log((counts.get(t, 0) + 1) / denominator) for t in known)
+        scores[category] = math.log(doc_count / model["labels"]) + likelihood * scale
+
+    top = max(scores.values())
+    weights = {category: math.exp(score - top) for category, score in scores.items()}
+    total = sum(weights.values())
+    return {category: weight / total for category, weight in weights.items()}
+
+
+def _best(model: dict, tokens: list[str]) -> tuple[str, float]:
+    posterior = _posterior(model, tokens)
+    category = max(posterior, key=posterior.get)
+    return category, posterior[category]
+
+
+def _labeled_samples() -> dict[str, tuple[list[str], str]]:
+    """LLM이 분류한 글의 {slug: (토큰, 카테고리)}. 로컬 분류기가 매긴 라벨은 제외한다."""
+    store = get_store()
+    samples = {}
+    for slug, analysis in store.iter_analyses():
+        category = analysis.get("category")
+        if category not in CATEGORIES or analysis.get("category_source") == "local":
+            continue
+        try:
+            post = store.get_post(slug)
+        except STORE_ERRORS as e:
+            logger.warning("분류기 학습용 글 읽기 실패, 스킵: slug=%s, %s", slug, e)
+            continue
+        if post is None:
+            continue
+        samples[slug] = (_tokens(post.get("title", ""), post.get("content", "")), category)
+    return samples
+
+
+_model: dict | None = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def _load_model() -> dict | None:
+    global _model, _model_loaded
+    with _model_lock:
+        if not _model_loaded:
+            _model_loaded = True
+            try:
+                model = json.loads(CATEGORY_MODEL_FILE.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                model = None
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning("카테고리 분류기 읽기 실패, LLM만 사용: path=%s, %s", CATEGORY_MODEL_FILE, e)
+                model = None
+            if model is not None and model.get("version") != _MODEL_VERSION:
+                model = None
+            _model = model
+        return _model
+
+
+# 이번 실행에서 LLM으로 분류한 글: {slug: (토큰, 카테고리)} — update()가 모델에 더한다
+_pending: dict[str, tuple[list[str], str]] = {}
+_pending_lock = threading.Lock()
+
+
+def _save_model(model: dict) -> None:
+    global _model, _model_loaded
+    CATEGORY_MODEL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = CATEGORY_MODEL_FILE.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(model, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(CATEGORY_MODEL_FILE)
+    with _model_lock:
+        _model, _model_loaded = model, True
+
+
+def train() -> int:
+    """
+    저장소의 모든 LLM 라벨로 분류기를 처음부터 학습해 CATEGORY_MODEL_FILE에 저장하고 학습한 글 수를 반환한다.
+    글 전체를 다시 읽으므로 `classify train` 명령에서만 사용한다. (learn은 update()로 새 라벨만 더한다)
+    """
+    samples = _labeled_samples()
+    model = _fit(list(samples.values()))
+    model["slugs"] = {slug: category for slug, (_, category) in samples.items()}
+    with _pending_lock:
+        _pending.clear()
+    _save_model(model)
+    return model["labels"]
+
+
+def add_label(slug: str, title: str, content: str, category: str) -> None:
+    """LLM이 분류한 글을 다음 update()에서 모델에 더하도록 기록한다."""
+    if category not in CATEGORIES:
+        return
+    with _pending_lock:
+        _pending[slug] = (_tokens(title, content), category)
+
+
+def update() -> tuple[int, int]:
+    """
+    add_label()로 기록한 새 LLM 라벨만 저장된 모델에 더하고 (더한 글 수, 학습한 전체 글 수)를 반환한다.
+    이미 학습한 글은 다시 더하지 않는다. (재분석으로 라벨이 바뀐 글은 `classify train` 때 반영된다)
+    저장된 모델이 없거나 버전이 다르면 train()으로 처음부터 학습한다.
+    """
+    model = _load_model()
+    if model is None or "slugs" not in model:
+        labels = train()
+        return labels, labels
+
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    model = copy.deepcopy(model)  # local_category가 읽는 중인 모델은 바꾸지 않는다
+    added = 0
+    for slug, (tokens, category) in pending.items():
+        if slug in model["slugs"]:
+            continue
+        _add_sample(model, tokens, category)
+        model["slugs"][slug] = category
+        added += 1
+    if added:
+        _save_model(model)
+    return added, model["labels"]
+
+
+def local_category(title: str, content: str) -> tuple[str, float] | None:
+    """
+    로컬 분류기의 확신도가 CATEGORY_CONFIDENCE 이상이면 (카테고리, 확신도)를 반환한다.
+    모델이 없거나 학습한 글이 CATEGORY_MIN_LABELS개 미만이거나 확신도가 낮으면 None.
+    """
+    model = _load_model()
+    if model is None or model["labels"] < CATEGORY_MIN_LABELS:
+        return None
+    category, confidence = _best(model, _tokens(title, content))
+    annotate(local_confidence=round(confidence, 3))
+    if confidence < CATEGORY_CONFIDENCE or category not in CATEGORIES:
+        return None
+    return category, confidence
+
+
+_BATCH_SCHEMA_ITEM = {"type": "string", "enum": CATEGORIES}
+
+
+@timed("analysis.category_batch")
+def classify_batch(posts: list[tuple[str, str]]) -> list[str | None]:
+    """
+    (제목, 본문) 여러 개를 한 프롬프트로 분류한다.
+    응답 배열의 길이가 맞지 않거나 값이 허용 카테고리가 아니면 해당 글은 None이다.
+    """
+    annotate(posts=len(posts))
+    prompt = "\n\n".join(
+        _BATCH_POST.format(number=i, title=title, content=content[:_BATCH_CONTENT_CHARS])
+        for i, (title, content) in enumerate(posts, 1)
+    )
+    schema = {
+        "type": "object",
+        "properties": {
+            "categories": {
+                "type": "array",
+                "items": _BATCH_SCHEMA_ITEM,
+                "minItems": len(posts),
+                "maxItems": len(posts),
+            }
+        },
+        "required": ["categories"],
+    }
+    response = generate(
+        prompt, format=schema, cache_version=_BATCH_PROMPT_VERSION, prefix=_BATCH_INSTRUCTIONS
+    )
+
+    try:
+        categories = json.loads(response).get("categories")
+    except (json.JSONDecodeError, AttributeError):
+        categories = None
+    if not isinstance(categories, list) or len(categories) != len(posts):
+        logger.warning("일괄 분류 응답 형식 오류, 글별 분류로 대체: response=%r", response[:100])
+        return [None] * len(posts)
+    return [c if c in CATEGORIES else None for c in categories]
+
+
+class _Batcher:
+    """
+    여러 분석 워커의 LLM 분류 요청을 모아 classify_batch 한 번으로 보낸다.
+    묶음이 가득 차면 바로, 아니면 첫 요청 후 CATEGORY_BATCH_WAIT초가 지나면 모인 만큼 보낸다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: list[tuple[tuple[str, str], Future]] = []
+
+    def _take(self) -> list[tuple[tuple[str, str], Future]]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self, batch: list[tuple[tuple[str, str], Future]]) -> None:
+        if len(batch) == 1:
+            batch[0][1].set_result(None)  # 묶을 글이 없으면 단건 프롬프트를 쓴다 (기존 캐시 재사용)
+            return
+        try:
+            results = classify_batch([post for post, _ in batch])
+        except BaseException as e:
+            # Ollama 연결 실패 시 generate()가 SystemExit을 일으키므로 BaseException까지 받아
+            # 묶음의 모든 요청에 전달한다 (대기 중인 다른 워커가 멈춰 있지 않도록)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), category in zip(batch, results):
+            future.set_result(category)
+
+    def classify(self, title: str, content: str) -> str | None:
+        future: Future = Future()
+        with self._lock:
+            self._pending.append(((title, content), future))
+            leader = len(self._pending) == 1
+            batch = self._take() if len(self._pending) >= CATEGORY_BATCH_SIZE else None
+        if batch:
+            self._run(batch)
+        elif leader:
+            time.sleep(CATEGORY_BATCH_WAIT)
+            with self._lock:
+                batch = self._take()
+            if batch:
+                self._run(batch)
+        try:
+            return future.result(timeout=_BATCH_RESULT_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning("일괄 분류 응답 대기 시간 초과, 단건 분류로 전환: title=%s", title[:40])
+            return None
+
+
+_batcher = _Batcher()
+
+
+def batch_category(title: str, content: str) -> str | None:
+    """
+    동시에 분석 중인 다른 글과 묶어 LLM으로 분류한다.
+    묶을 글이 없었거나 일괄 응답에서 이 글의 카테고리를 얻지 못하면 None (호출 측이 단건 프롬프트로 분류).
+    분석 워커가 하나뿐이면(total_capacity() == 1) 묶을 글이 올 수 없으므로 기다리지 않고 None을 반환한다.
+    """
+    if total_capacity() <= 1:
+        return None
+    return _batcher.classify(title, content)
+
+
+def agreement_report(thresholds: tuple[float, ...] = _REPORT_THRESHOLDS) -> dict:
+    """
+    LLM 라벨을 _REPORT_FOLDS겹 교차 검증해 임계값별로
+    로컬 분류 적용 비율(coverage), 적용한 글의 LLM 라벨 일치율(local_agreement),
+    나머지를 LLM으로 분류했을 때의 전체 일치율(overall_agreement)을 계산한다.
+    {"labels", "thresholds": [{"threshold", "coverage", "local_agreement", "overall_agreement"}],
+     "categories": {카테고리: {"labels", "agreement"}}} — categories는 임계값 없이 로컬 분류만 쓴 일치율
+    """
+    samples = sorted(_labeled_samples().items())
+    predictions: list[tuple[str, float, str]] = []  # (예측, 확신도, LLM 라벨)
+    folds = min(_REPORT_FOLDS, len(samples))
+    for fold in range(folds):
+        train_set = [s for i, (_, s) in enumerate(samples) if i % folds != fold]
+        if not train_set:
+            continue
+        model = _fit(train_set)
+        for i, (_, (tokens, label)) in enumerate(samples):
+            if i % folds == fold:
+                predictions.append(_best(model, tokens) + (label,))
+
+    rows = []
+    for threshold in thresholds:
+        covered = [(p, l) for p, c, l in predictions if c >= threshold]
+        agree = sum(p == l for p, l in covered)
+        total = len(predictions)
+        rows.append({
+            "threshold": threshold,
+            "coverage": len(covered) / total if total else 0.0,
+            "local_agreement": agree / len(covered) if covered else None,
+            "overall_agreement": (agree + total - len(covered)) / total if total else None,
+        })
+
+    by_category: dict[str, dict] = {}
+    for category in CATEGORIES:
+        labeled = [p for p, _, l in predictions if l == category]
+        if labeled:
+            by_category[category] = {
+                "labels": len(labeled),
+                "agreement": sum(p == category for p in labeled) / len(labeled),
+            }
+    return {"labels": len(predictions), "thresholds": rows, "categories": by_category}
@@ -1,28 +1,61 @@
+import asyncio
+import hashlib
+import json
+import threading
 import time
 import urllib.robotparser
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
 from config import (
+    CRAWL_CONCURRENCY,
     CRAWL_DELAY,
+    CRAWL_MANIFEST_FILE,
     CRAWL_RETRY,
     CRAWL_TIMEOUT,
     CRAWL_USER_AGENT,
     RAW_HTML_DIR,
+    ROBOTS_CACHE_FILE,
+    ROBOTS_CACHE_TTL,
 )
+from utils.html_archive import has_html, put_html
+from utils.logger import get_logger
+from utils.metrics import annotate, span, timed
+from utils.urls import canonical_url, naver_postview_url
+
+logger = get_logger(__name__)
+
+# robots.txt 캐시: {"scheme://host": {"fetched_at": float, "status": int, "body": str}}
+# 실행 중에는 메모리에서 공유하고, 새로 받아온 항목은 ROBOTS_CACHE_FILE에 저장한다.
+_robots_entries: dict[str, dict] | None = None
+_robots_parsers: dict[str, urllib.robotparser.RobotFileParser] = {}
+_robots_key_locks: dict[str, threading.Lock] = {}
+_robots_lock = threading.Lock()
+
+# 크롤링 매니페스트: {slug: {"url", "fetch_url", "etag", "last_modified",
+#                           "content_hash", "fetched_at", "status"}}
+# status: "new"(최초 수집) / "modified"(내용 변경) / "unchanged"(304 또는 해시 동일)
+_manifest: dict[str, dict] | None = None
+_manifest_lock = threading.Lock()
 
 
 def _resolve_naver_url(url: str, html: str) -> str:
-    """네이버 블로그 URL인 경우 iframe 내부 실제 콘텐츠 URL로 변환한다."""
+    """
+    네이버 블로그 틀 페이지면 iframe 내부 실제 콘텐츠 URL로 변환한다.
+    글 URL은 naver_postview_url()로 바로 본문 주소를 만들므로, 주소를 만들 수 없는 형태이거나
+    직접 요청이 실패했을 때만 사용하는 대체 경로다.
+    """
     parsed = urlparse(url)
     if "blog.naver.com" not in parsed.netloc:
         return url
 
     soup = BeautifulSoup(html, "html.parser")
-    iframe = soup.find("iframe", src=True)
+    iframe = soup.find("iframe", id="mainFrame", src=True) or soup.find("iframe", src=True)
     if iframe:
         src = iframe["src"]
         if src.startswith("/"):
@@ -31,63 +64,485 @@ def _resolve_naver_url(url: str, html: str) -> str:
     return url
 
 
-def _url_to_slug(url: str) -> str:
-    """URL을 파일명으로 사용 가능한 slug로 변환한다."""
+def _path_slug(url: str) -> str:
     parsed = urlparse(url)
     slug = (parsed.netloc + parsed.path).strip("/").replace("/", "-").replace(".", "-")
     return slug or "unknown"
 
 
-def _is_allowed_by_robots(url: str, user_agent: str) -> bool:
-    """robots.txt 규칙에 따라 해당 URL 크롤링 허용 여부를 반환한다."""
+def _legacy_slug(url: str) -> str | None:
+    """
+    정규화 이전 규칙(입력 URL 그대로)으로 이미 저장된 글이면 그 slug를, 아니면 None을 반환한다.
+    쿼리가 slug에 들어가지 않던 규칙이라 매니페스트에 같은 글로 기록된 경우만 인정한다.
+    (매니페스트 기록이 없으면 쿼리 없는 URL만 — PostView 주소처럼 여러 글이 한 slug를 썼을 수 있다)
+    """
+    slug = _path_slug(url)
+    if not has_html(slug):
+        return None
+    with _manifest_lock:
+        entry = _load_manifest().get(slug)
+    if entry is not None:
+        return slug if canonical_url(entry["url"]) == canonical_url(url) else None
+    return slug if not urlparse(url).query else None
+
+
+def _url_to_slug(url: str) -> str:
+    """
+    URL을 파일명으로 사용 가능한 slug로 변환한다.
+    정규화한 URL 기준이므로 같은 글의 다른 URL 형태(네이버 PostView·모바일 등)는 같은 slug가 된다.
+    정규화 이전 slug(www.·대문자 호스트·PostView 형태 등)로 이미 수집한 글은 그 slug를 계속 쓴다.
+    (저장된 parsed_posts·analysis가 새 slug로 다시 분석되어 스타일 가이드에 두 번 집계되지 않도록)
+    """
+    slug = _path_slug(canonical_url(url))
+    if not has_html(slug):
+        legacy = _legacy_slug(url)
+        if legacy is not None:
+            return legacy
+    return slug
+
+
+def _robots_key(url: str) -> str:
     parsed = urlparse(url)
-    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _load_robots_entries() -> dict[str, dict]:
+    """디스크의 robots.txt 캐시를 읽는다. 호출 측에서 _robots_lock을 잡고 있어야 한다."""
+    global _robots_entries
+    if _robots_entries is None:
+        try:
+            _robots_entries = json.loads(ROBOTS_CACHE_FILE.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            _robots_entries = {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("robots.txt 캐시 읽기 실패, 초기화: path=%s, %s", ROBOTS_CACHE_FILE, e)
+            _robots_entries = {}
+    return _robots_entries
+
+
+def _save_robots_entries() -> None:
+    """robots.txt 캐시를 디스크에 저장한다. 호출 측에서 _robots_lock을 잡고 있어야 한다."""
+    try:
+        ROBOTS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = ROBOTS_CACHE_FILE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(_robots_entries, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(ROBOTS_CACHE_FILE)
+    except OSError as e:
+        logger.warning("robots.txt 캐시 저장 실패: path=%s, %s", ROBOTS_CACHE_FILE, e)
+
+
+def _fetch_robots(key: str) -> dict:
+    """robots.txt를 내려받아 캐시 항목을 만든다. 네트워크 오류 시 status 0을 기록한다."""
+    try:
+        response = httpx.get(
+            f"{key}/robots.txt",
+            headers={"User-Agent": CRAWL_USER_AGENT},
+            timeout=CRAWL_TIMEOUT,
+            follow_redirects=True,
+        )
+        status, body = response.status_code, response.text
+    except Exception as e:
+        logger.debug("robots.txt 요청 실패: %s, %s", key, e)
+        status, body = 0, ""
+    return {"fetched_at": time.time(), "status": status, "body": body}
+
+
+def _build_robot_parser(entry: dict) -> urllib.robotparser.RobotFileParser:
+    """캐시 항목으로 RobotFileParser를 만든다. 상태 코드 처리는 RobotFileParser.read()와 같다."""
     rp = urllib.robotparser.RobotFileParser()
-    rp.set_url(robots_url)
+    status = entry["status"]
+    if status in (401, 403):
+        rp.disallow_all = True
+    elif status >= 400 or status == 0:
+        rp.allow_all = True  # robots.txt 없음·읽기 실패 시 허용으로 간주
+    else:
+        rp.parse(entry["body"].splitlines())
+    return rp
+
+
+@timed("crawl.robots")
+def _get_robots(url: str) -> urllib.robotparser.RobotFileParser:
+    """
+    URL 호스트의 RobotFileParser를 반환한다.
+    캐시가 없거나 ROBOTS_CACHE_TTL이 지난 경우에만 robots.txt를 다시 요청한다.
+    같은 호스트의 동시 요청은 한 번만 내려받는다.
+    """
+    key = _robots_key(url)
+    annotate(host=key)
+
+    with _robots_lock:
+        key_lock = _robots_key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _robots_lock:
+            entry = _load_robots_entries().get(key)
+            if entry and time.time() - entry["fetched_at"] < ROBOTS_CACHE_TTL:
+                rp = _robots_parsers.get(key)
+                if rp is None:
+                    rp = _robots_parsers[key] = _build_robot_parser(entry)
+                annotate(cache_hit=True)
+                return rp
+
+        entry = _fetch_robots(key)
+        rp = _build_robot_parser(entry)
+
+        with _robots_lock:
+            _robots_parsers[key] = rp
+            if entry["status"]:  # 네트워크 오류는 디스크에 남기지 않고 이번 실행에서만 사용
+                _load_robots_entries()[key] = entry
+                _save_robots_entries()
+        return rp
+
+
+def _crawl_delay(rp: urllib.robotparser.RobotFileParser) -> float:
+    """호스트 요청 간격을 반환한다. robots.txt의 Crawl-delay가 CRAWL_DELAY보다 길면 그 값을 따른다."""
+    robots_delay = rp.crawl_delay(CRAWL_USER_AGENT)
+    return max(CRAWL_DELAY, float(robots_delay or 0))
+
+
+def _robots_check(url: str) -> float | None:
+    """
+    실제로 요청할 URL에 robots.txt를 적용한다.
+    허용되면 그 호스트의 요청 간격(_crawl_delay)을, 차단되면 None을 반환한다.
+    """
+    rp = _get_robots(url)
+    if not rp.can_fetch(CRAWL_USER_AGENT, url):
+        return None
+    return _crawl_delay(rp)
+
+
+def _load_manifest() -> dict[str, dict]:
+    """
+    크롤링 매니페스트를 읽는다. 같은 slug는 마지막 기록이 우선한다.
+    호출 측에서 _manifest_lock을 잡고 있어야 한다.
+    """
+    global _manifest
+    if _manifest is not None:
+        return _manifest
+
+    _manifest = {}
+    if not CRAWL_MANIFEST_FILE.exists():
+        return _manifest
+
+    lines = 0
     try:
-        rp.read()
-        return rp.can_fetch(user_agent, url)
-    except Exception:
-        return True  # robots.txt 읽기 실패 시 허용으로 간주
+        with CRAWL_MANIFEST_FILE.open(encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 중단된 마지막 줄
+                _manifest[entry["slug"]] = entry
+    except OSError as e:
+        logger.warning("크롤링 매니페스트 읽기 실패: path=%s, %s", CRAWL_MANIFEST_FILE, e)
+        return _manifest
+
+    # 누적된 중복 기록이 많으면 최신 항목만 남겨 다시 쓴다
+    if lines > 2 * len(_manifest) + 100:
+        tmp_path = CRAWL_MANIFEST_FILE.with_suffix(".tmp")
+        tmp_path.write_text(
+            "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in _manifest.values()),
+            encoding="utf-8",
+        )
+        tmp_path.replace(CRAWL_MANIFEST_FILE)
+    return _manifest
+
+
+def _record_fetch(entry: dict) -> None:
+    """매니페스트에 크롤링 결과 한 줄을 추가한다."""
+    with _manifest_lock:
+        _load_manifest()[entry["slug"]] = entry
+        try:
+            CRAWL_MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with CRAWL_MANIFEST_FILE.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning("크롤링 매니페스트 기록 실패: slug=%s, %s", entry["slug"], e)
+
+
+def _previous_fetch(slug: str) -> dict | None:
+    """이전 크롤링 기록을 반환한다. 저장된 HTML이 없으면 조건부 요청을 할 수 없으므로 None."""
+    if not has_html(slug):
+        return None
+    with _manifest_lock:
+        return _load_manifest().get(slug)
+
+
+def _conditional_headers(prev: dict | None, fetch_url: str) -> dict[str, str]:
+    """이전 기록과 같은 URL을 다시 받을 때 If-None-Match / If-Modified-Since 헤더를 만든다."""
+    if not prev or prev.get("fetch_url") != fetch_url:
+        return {}
+    headers = {}
+    if prev.get("etag"):
+        headers["If-None-Match"] = prev["etag"]
+    if prev.get("last_modified"):
+        headers["If-Modified-Since"] = prev["last_modified"]
+    return headers
 
 
+def _check_status(response: httpx.Response) -> None:
+    """304 Not Modified는 정상 응답으로 취급하고, 그 외 오류 상태는 예외를 발생시킨다."""
+    if response.status_code != 304:
+        response.raise_for_status()
+
+
+def _store_response(url: str, fetch_url: str, response: httpx.Response, prev: dict | None) -> Path:
+    """
+    응답 본문을 원문 HTML 아카이브에 저장하고 매니페스트에 기록한다.
+    반환하는 raw_html/{slug}.html 경로는 slug를 나타내는 키이며, 본문은 open_html(slug)로 읽는다.
+    304 응답이거나 본문 해시가 이전과 같으면 다시 저장하지 않는다.
+    """
+    slug = _url_to_slug(url)
+    output_path = RAW_HTML_DIR / f"{slug}.html"
+
+    if response.status_code == 304:
+        content_hash = prev["content_hash"]
+        status = "unchanged"
+    else:
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if prev is None:
+            status = "new"
+        elif prev.get("content_hash") == content_hash:
+            status = "unchanged"
+        else:
+            status = "modified"
+        if status != "unchanged":
+            put_html(slug, response.text.encode("utf-8"))
+
+    # 304 응답에는 검증자 헤더가 빠질 수 있으므로 이전 값을 유지한다
+    etag = response.headers.get("ETag") or (prev or {}).get("etag")
+    last_modified = response.headers.get("Last-Modified") or (prev or {}).get("last_modified")
+
+    _record_fetch({
+        "slug": slug,
+        "url": url,
+        "fetch_url": fetch_url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "content_hash": content_hash,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "status": status,
+    })
+    return output_path
+
+
+def _get(url: str, headers: dict[str, str], span_name: str = "crawl.fetch") -> httpx.Response:
+    with span(span_name, url=url) as s:
+        response = httpx.get(url, headers=headers, timeout=CRAWL_TIMEOUT, follow_redirects=True)
+        s["status"] = response.status_code
+        s["bytes"] = len(response.content)
+    _check_status(response)
+    return response
+
+
+def crawl_status(url: str) -> str | None:
+    """
+    URL의 마지막 크롤링 결과 상태("new" / "modified" / "unchanged")를 반환한다.
+    "unchanged"이면 이후 파싱·분석 단계를 건너뛸 수 있다. 기록이 없으면 None.
+    """
+    slug = _url_to_slug(url)
+    with _manifest_lock:
+        entry = _load_manifest().get(slug)
+    return entry["status"] if entry else None
+
+
+@timed("crawl")
 def crawl(url: str) -> Path | None:
     """
-    URL을 크롤링해 raw_html 디렉터리에 저장하고 저장 경로를 반환한다.
+    URL을 크롤링해 원문 HTML 아카이브에 저장하고 slug 키 경로(raw_html/{slug}.html)를 반환한다.
+    이전 기록이 있으면 조건부 요청을 보내며, 결과 상태는 crawl_status()로 확인한다.
     실패 시 CRAWL_RETRY 횟수만큼 재시도하며, 최종 실패 시 None을 반환한다.
     """
     RAW_HTML_DIR.mkdir(parents=True, exist_ok=True)
 
-    if not _is_allowed_by_robots(url, CRAWL_USER_AGENT):
-        print(f"  [skip] robots.txt 차단: {url}")
+    # 네이버 블로그 글은 틀 페이지를 거치지 않고 본문(PostView)을 바로 요청하므로 robots.txt도 그 주소로 확인한다
+    postview_url = naver_postview_url(url)
+    delay = _robots_check(postview_url or url)
+    if delay is None:
+        print(f"  [skip] robots.txt 차단: {postview_url or url}")
         return None
 
+    prev = _previous_fetch(_url_to_slug(url))
     headers = {"User-Agent": CRAWL_USER_AGENT}
     attempts = 0
 
     while attempts <= CRAWL_RETRY:
         try:
-            response = httpx.get(url, headers=headers, timeout=CRAWL_TIMEOUT, follow_redirects=True)
-            response.raise_for_status()
+            fetch_url = postview_url or url
+            try:
+                response = _get(fetch_url, headers | _conditional_headers(prev, fetch_url))
+            except httpx.HTTPStatusError as e:
+                if fetch_url == url or _robots_check(url) is None:
+                    raise
+                logger.warning("네이버 PostView 직접 요청 실패, 틀 페이지로 재시도: url=%s, %s", url, e)
+                fetch_url = url
+                response = _get(url, headers | _conditional_headers(prev, url))
 
-            # 네이버 블로그: iframe 내부 URL로 재요청
-            actual_url = _resolve_naver_url(url, response.text)
-            if actual_url != url:
-                response = httpx.get(actual_url, headers=headers, timeout=CRAWL_TIMEOUT, follow_redirects=True)
-                response.raise_for_status()
+            # 네이버 블로그 틀 페이지: iframe 내부 URL로 재요청 (대체 경로)
+            if fetch_url == url and response.status_code != 304:
+                actual_url = _resolve_naver_url(url, response.text)
+                if actual_url != url:
+                    if _robots_check(actual_url) is None:
+                        print(f"  [skip] robots.txt 차단: {actual_url}")
+                        return None
+                    fetch_url = actual_url
+                    response = _get(
+                        actual_url,
+                        headers | _conditional_headers(prev, actual_url),
+                        span_name="crawl.naver_iframe",
+                    )
 
-            slug = _url_to_slug(url)
-            output_path = RAW_HTML_DIR / f"{slug}.html"
-            output_path.write_text(response.text, encoding="utf-8")
+            output_path = _store_response(url, fetch_url, response, prev)
 
-            time.sleep(CRAWL_DELAY)
+            time.sleep(delay)
             return output_path
 
         except Exception as e:
             attempts += 1
             if attempts <= CRAWL_RETRY:
                 print(f"  [retry] {url} — {e}")
-                time.sleep(CRAWL_DELAY)
+                time.sleep(delay)
             else:
                 print(f"  [fail] {url} — {e}")
                 return None
+
+
+class HostPacer:
+    """
+    비동기 크롤링의 요청 속도를 제어한다.
+    전체 동시 요청 수는 concurrency로 제한하고,
+    같은 호스트에 대한 요청 시작 간격은 delay(또는 set_delay로 지정한 값) 이상으로 유지한다.
+    """
+
+    def __init__(self, concurrency: int = CRAWL_CONCURRENCY, delay: float = CRAWL_DELAY):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._delay = delay
+        self._host_delays: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._next_at: dict[str, float] = {}
+
+    def set_delay(self, host: str, delay: float) -> None:
+        """호스트별 요청 간격을 지정한다. (robots.txt Crawl-delay 반영용)"""
+        self._host_delays[host] = delay
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """호스트 간격을 기다린 뒤 전체 동시 요청 슬롯 하나를 점유한다."""
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = self._next_at.get(host, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._semaphore.acquire()
+            self._next_at[host] = time.monotonic() + self._host_delays.get(host, self._delay)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+async def _get_async(
+    client: httpx.AsyncClient,
+    pacer: HostPacer,
+    url: str,
+    headers: dict[str, str],
+    span_name: str = "crawl.fetch",
+) -> httpx.Response:
+    async with pacer.slot(urlparse(url).netloc):
+        with span(span_name, url=url) as s:
+            response = await client.get(url, headers=headers)
+            s["status"] = response.status_code
+            s["bytes"] = len(response.content)
+    _check_status(response)
+    return response
+
+
+async def _robots_pace(pacer: HostPacer, url: str) -> bool:
+    """url에 robots.txt를 적용해 허용 여부를 반환하고, 허용되면 그 호스트의 요청 간격을 pacer에 지정한다."""
+    delay = await asyncio.to_thread(_robots_check, url)
+    if delay is None:
+        return False
+    pacer.set_delay(urlparse(url).netloc, delay)
+    return True
+
+
+@timed("crawl")
+async def crawl_async(client: httpx.AsyncClient, pacer: HostPacer, url: str) -> Path | None:
+    """
+    crawl()의 비동기 버전. 공유 AsyncClient와 HostPacer를 사용한다.
+    저장 경로와 재시도 규칙(CRAWL_RETRY)은 crawl()과 동일하다.
+    """
+    RAW_HTML_DIR.mkdir(parents=True, exist_ok=True)
+
+    # 네이버 블로그 글은 틀 페이지를 거치지 않고 본문(PostView)을 바로 요청하므로 robots.txt도 그 주소로 확인한다
+    postview_url = naver_postview_url(url)
+    if not await _robots_pace(pacer, postview_url or url):
+        print(f"  [skip] robots.txt 차단: {postview_url or url}")
+        return None
+
+    prev = _previous_fetch(_url_to_slug(url))
+    attempts = 0
+
+    while attempts <= CRAWL_RETRY:
+        try:
+            fetch_url = postview_url or url
+            try:
+                response = await _get_async(client, pacer, fetch_url, _conditional_headers(prev, fetch_url))
+            except httpx.HTTPStatusError as e:
+                if fetch_url == url or not await _robots_pace(pacer, url):
+                    raise
+                logger.warning("네이버 PostView 직접 요청 실패, 틀 페이지로 재시도: url=%s, %s", url, e)
+                fetch_url = url
+                response = await _get_async(client, pacer, url, _conditional_headers(prev, url))
+
+            # 네이버 블로그 틀 페이지: iframe 내부 URL로 재요청 (대체 경로)
+            if fetch_url == url and response.status_code != 304:
+                actual_url = _resolve_naver_url(url, response.text)
+                if actual_url != url:
+                    if not await _robots_pace(pacer, actual_url):
+                        print(f"  [skip] robots.txt 차단: {actual_url}")
+                        return None
+                    fetch_url = actual_url
+                    response = await _get_async(
+                        client,
+                        pacer,
+                        actual_url,
+                        _conditional_headers(prev, actual_url),
+                        span_name="crawl.naver_iframe",
+                    )
+
+            return _store_response(url, fetch_url, response, prev)
+
+        except Exception as e:
+            attempts += 1
+            if attempts <= CRAWL_RETRY:
+                print(f"  [retry] {url} — {e}")
+            else:
+                print(f"  [fail] {url} — {e}")
+                return None
+
+
+def new_async_client(concurrency: int = CRAWL_CONCURRENCY) -> httpx.AsyncClient:
+    """비동기 크롤링에 공유할 AsyncClient를 생성한다."""
+    return httpx.AsyncClient(
+        headers={"User-Agent": CRAWL_USER_AGENT},
+        timeout=CRAWL_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    )
+
+
+async def _crawl_many(urls: list[str], concurrency: int) -> dict[str, Path | None]:
+    pacer = HostPacer(concurrency)
+    async with new_async_client(concurrency) as client:
+        paths = await asyncio.gather(*(crawl_async(client, pacer, url) for url in urls))
+    return dict(zip(urls, paths))
+
+
+def crawl_many(urls: list[str], concurrency: int = CRAWL_CONCURRENCY) -> dict[str, Path | None]:
+    """
+    여러 URL을 asyncio로 동시에 크롤링하고 {url: 저장 경로 또는 None}을 반환한다.
+    호스트별로는 CRAWL_DELAY 간격을 지키므로 서로 다른 호스트끼리만 병렬로 진행된다.
+    """
+    return asyncio.run(_crawl_many(urls, concurrency))
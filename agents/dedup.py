@@ -0,0 +1,218 @@
+"""
+분석 전 중복 글 탐지.
+
+- URL: utils.urls.canonical_url로 정규화해 같은 글의 다른 URL 형태는 같은 slug가 된다.
+- 본문: 64비트 SimHash의 해밍 거리가 DEDUP_MAX_DISTANCE 이하면 같은 글(교차 게시·퍼온 글)로 본다.
+  64비트를 밴드 (DEDUP_MAX_DISTANCE + 1)개로 나눠 색인하므로,
+  거리가 임계값 이하인 두 서명은 적어도 한 밴드가 같다. (비둘기집 원리)
+  후보 조회는 밴드 수만큼의 dict 조회로 끝난다.
+
+색인은 DEDUP_INDEX_FILE에 JSONL로 추가 기록한다.
+원본이 이미 분석된 중복 글은 LLM 분석을 하지 않고, 스타일 가이드 집계에서도 제외해 원본 한 번만 센다.
+원본이 아직 분석 전이거나 분석에 실패했으면 중복 글을 분석하고, 원본 분석이 생기기 전까지는 집계에도 넣는다.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+
+from config import DEDUP_INDEX_FILE, DEDUP_MAX_DISTANCE
+from utils.logger import get_logger
+from utils.metrics import annotate, timed
+from utils.store import STORE_ERRORS, get_store
+from utils.urls import canonical_url
+
+logger = get_logger(__name__)
+
+_BITS = 64
+_SHINGLE = 3  # 어절 n-gram 크기
+_WORD_RE = re.compile(r"\w+")
+
+# 색인: {slug: {"slug", "url", "simhash", "duplicate_of"}}
+# 밴드 색인: {(밴드 번호, 밴드 값): {원본 slug, ...}} — 중복으로 판정된 글은 넣지 않는다
+_entries: dict[str, dict] | None = None
+_bands: dict[tuple[int, int], set[str]] = {}
+_lock = threading.Lock()
+
+
+def _band_count() -> int:
+    return DEDUP_MAX_DISTANCE + 1
+
+
+def _band_keys(signature: int) -> list[tuple[int, int]]:
+    """서명을 밴드로 나눈 (밴드 번호, 값) 목록. 64비트가 나누어떨어지지 않으면 마지막 밴드가 길어진다."""
+    count = _band_count()
+    width = _BITS // count
+    keys = []
+    for i in range(count):
+        bits = width if i < count - 1 else _BITS - width * i
+        keys.append((i, (signature >> (width * i)) & ((1 << bits) - 1)))
+    return keys
+
+
+def simhash(text: str) -> int:
+    """
+    본문의 64비트 SimHash. 어절 3-gram을 특징으로 하며 같은 특징은 등장 횟수만큼 가중한다.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < _SHINGLE:
+        features = [" ".join(words)] if words else []
+    else:
+        features = [" ".join(words[i:i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)]
+    if not features:
+        return 0
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+        for f in features
+    ]
+    # 비트 위치별 1의 개수를 문자열 열 단위로 센다 (비트마다 정수 연산을 반복하는 것보다 빠르다)
+    columns = zip(*(format(h, "064b") for h in hashes))
+    half = len(hashes) / 2
+    signature = 0
+    for column in columns:
+        signature = (signature << 1) | (column.count("1") > half)
+    return signature
+
+
+def _distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _index(entry: dict) -> None:
+    if entry.get("duplicate_of") is None:
+        for key in _band_keys(entry["simhash"]):
+            _bands.setdefault(key, set()).add(entry["slug"])
+
+
+def _unindex(entry: dict) -> None:
+    for key in _band_keys(entry["simhash"]):
+        slugs = _bands.get(key)
+        if slugs is not None:
+            slugs.discard(entry["slug"])
+
+
+def _load() -> dict[str, dict]:
+    """
+    색인을 읽는다. 같은 slug는 마지막 기록이 우선한다.
+    호출 측에서 _lock을 잡고 있어야 한다.
+    """
+    global _entries
+    if _entries is not None:
+        return _entries
+
+    _entries = {}
+    _bands.clear()
+    if not DEDUP_INDEX_FILE.exists():
+        return _entries
+
+    lines = 0
+    try:
+        with DEDUP_INDEX_FILE.open(encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 중단된 마지막 줄
+                _entries[entry["slug"]] = entry
+    except OSError as e:
+        logger.warning("중복 탐지 색인 읽기 실패: path=%s, %s", DEDUP_INDEX_FILE, e)
+
+    for entry in _entries.values():
+        _index(entry)
+
+    # 누적된 중복 기록이 많으면 최신 항목만 남겨 다시 쓴다
+    if lines > 2 * len(_entries) + 100:
+        tmp_path = DEDUP_INDEX_FILE.with_suffix(".tmp")
+        tmp_path.write_text(
+            "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in _entries.values()),
+            encoding="utf-8",
+        )
+        tmp_path.replace(DEDUP_INDEX_FILE)
+    return _entries
+
+
+def _append(entry: dict) -> None:
+    try:
+        DEDUP_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with DEDUP_INDEX_FILE.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning("중복 탐지 색인 기록 실패: slug=%s, %s", entry["slug"], e)
+
+
+def _nearest(slug: str, signature: int) -> str | None:
+    """거리가 임계값 이하인 원본 중 가장 가까운 slug. 호출 측에서 _lock을 잡고 있어야 한다."""
+    candidates = set()
+    for key in _band_keys(signature):
+        candidates |= _bands.get(key, set())
+    candidates.discard(slug)
+
+    best = None
+    for other in sorted(candidates):
+        distance = _distance(signature, _entries[other]["simhash"])
+        if distance <= DEDUP_MAX_DISTANCE and (best is None or distance < best[0]):
+            best = (distance, other)
+    return best[1] if best else None
+
+
+@timed("dedup")
+def check_duplicate(json_path: Path) -> str | None:
+    """
+    파싱된 글(json_path.stem = slug)을 색인에 등록하고, 이미 본 글과 중복이면 원본 slug를 반환한다.
+    원본의 분석 결과가 저장소에 없으면(분석 전·실패) 이 글을 분석하도록 None을 반환한다. (색인에는 중복으로 남는다)
+    본문이 이전과 같으면 이전 판정을 그대로 쓴다. 글을 읽을 수 없으면 중복이 아닌 것으로 본다.
+    """
+    slug = json_path.stem
+    try:
+        post = get_store().get_post(slug)
+    except STORE_ERRORS as e:
+        logger.error("중복 탐지용 글 읽기 실패: slug=%s, %s", slug, e)
+        return None
+    if post is None:
+        return None
+
+    signature = simhash(post.get("content", ""))
+
+    with _lock:
+        entries = _load()
+        prev = entries.get(slug)
+        if prev is not None and prev["simhash"] == signature:
+            duplicate_of = prev.get("duplicate_of")
+        else:
+            if prev is not None:
+                _unindex(prev)
+            duplicate_of = _nearest(slug, signature)
+            entry = {
+                "slug": slug,
+                "url": canonical_url(post.get("url", "")),
+                "simhash": signature,
+                "duplicate_of": duplicate_of,
+            }
+            entries[slug] = entry
+            _index(entry)
+            _append(entry)
+
+    annotate(duplicate=duplicate_of is not None)
+    if duplicate_of is None:
+        return None
+    try:
+        analyzed = get_store().has_analysis(duplicate_of)
+    except STORE_ERRORS as e:
+        logger.error("중복 원본 분석 결과 확인 실패: slug=%s, %s", duplicate_of, e)
+        analyzed = False
+    if not analyzed:
+        logger.info("중복 원본이 분석 전이라 이 글을 분석: slug=%s, 원본=%s", slug, duplicate_of)
+        return None
+    return duplicate_of
+
+
+def duplicate_slugs() -> dict[str, str]:
+    """
+    다른 글의 중복으로 판정된 {slug: 원본 slug}.
+    스타일 가이드 집계는 원본이 분석된 중복 글만 제외한다.
+    """
+    with _lock:
+        return {slug: entry["duplicate_of"] for slug, entry in _load().items() if entry.get("duplicate_of")}
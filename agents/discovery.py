@@ -0,0 +1,448 @@
+"""
+블로그 URL 탐색 (discover). 블로그 하나를 RSS 피드·사이트맵으로 펼쳐 글 URL을 찾고,
+새 글과 수정된 글만 BLOG_URLS_FILE에 예약한다.
+
+- 대상: 네이버 blogId 또는 blog.naver.com/{blogId}, 티스토리 도메인, 그 밖의 블로그 루트 URL
+  - 네이버: rss.blog.naver.com/{blogId}.xml (블로그별 공개 사이트맵이 없어 최근 글만 나온다)
+  - 티스토리: /rss, robots.txt의 Sitemap: (없으면 /sitemap.xml)
+  - 그 외: 첫 페이지의 <link rel="alternate"> 피드, robots.txt의 Sitemap: (없으면 /sitemap.xml)
+- 피드·사이트맵은 내려받는 대로 XMLPullParser에 넣고 <url>·<item> 단위로 처리한 뒤 버리므로
+  수만 개 URL이 든 사이트맵도 통째로 메모리에 올리지 않는다. 사이트맵 인덱스는 하위 사이트맵을 따라가며,
+  lastmod가 지난번과 같은 하위 사이트맵은 다시 받지 않는다.
+- 프런티어(DISCOVERY_FRONTIER_FILE): 정규 URL별 lastmod와 예약 당시의 lastmod를 기록한다.
+  처음 보는 글은 urls 파일 끝에 추가하고, lastmod가 예약 당시보다 새로워진 글은 진행 저널에
+  queued로 기록해 다음 learn에서 다시 크롤링한다. 예약은 lastmod 최신순이다.
+"""
+import email.utils
+import json
+import re
+import time
+import urllib.robotparser
+import xml.etree.ElementTree as ET
+import zlib
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+
+from agents.crawler import _crawl_delay, _get_robots, _robots_key
+from config import (
+    BLOG_URLS_FILE,
+    CRAWL_TIMEOUT,
+    CRAWL_USER_AGENT,
+    DISCOVERY_FRONTIER_FILE,
+    DISCOVERY_MAX_SITEMAPS,
+)
+from utils.file_manager import STAGE_QUEUED, append_urls, mark_stage, read_urls
+from utils.logger import get_logger
+from utils.metrics import span, timed
+from utils.urls import canonical_url, naver_post_id
+
+logger = get_logger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+_GZIP_MAGIC = b"\x1f\x8b"
+
+_NAVER_BLOG_ID_RE = re.compile(r"[A-Za-z0-9_-]+")
+_TISTORY_POST_RE = re.compile(r"/(\d+|entry/.+)")
+# 글이 아닌 목록·안내 페이지 경로
+_LISTING_RE = re.compile(
+    r"/(tag|tags|category|categories|page|archive|archives|author|search|guestbook|notice|location)(/|$)",
+    re.IGNORECASE,
+)
+_FEED_TYPES = {"application/rss+xml", "application/atom+xml"}
+
+# 호스트별 마지막 요청 시각 (time.monotonic)
+_last_request: dict[str, float] = {}
+
+
+def _local(tag: str) -> str:
+    """네임스페이스를 뺀 요소 이름"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem: ET.Element, *names: str) -> str | None:
+    """names 순서대로 찾은 첫 자식 요소의 텍스트. 없으면 None."""
+    for name in names:
+        for child in elem:
+            if _local(child.tag) == name and (child.text or "").strip():
+                return child.text.strip()
+    return None
+
+
+def _parse_date(value: str | None) -> str | None:
+    """사이트맵(W3C)·Atom(ISO 8601)·RSS(RFC 822) 날짜를 UTC ISO 8601 문자열로 바꾼다. 읽을 수 없으면 None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _load_frontier() -> dict[str, dict]:
+    """프런티어를 읽는다. 같은 URL은 마지막 기록이 우선한다. 중복 기록이 많이 쌓였으면 최신 기록만 남겨 다시 쓴다."""
+    frontier: dict[str, dict] = {}
+    if not DISCOVERY_FRONTIER_FILE.exists():
+        return frontier
+
+    lines = 0
+    try:
+        with DISCOVERY_FRONTIER_FILE.open(encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 중단된 마지막 줄
+                frontier[record["url"]] = record
+    except OSError as e:
+        logger.warning("프런티어 읽기 실패: path=%s, %s", DISCOVERY_FRONTIER_FILE, e)
+        return frontier
+
+    if lines > 2 * len(frontier) + 100:
+        tmp_path = DISCOVERY_FRONTIER_FILE.with_suffix(".tmp")
+        tmp_path.write_text(
+            "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in frontier.values()),
+            encoding="utf-8",
+        )
+        tmp_path.replace(DISCOVERY_FRONTIER_FILE)
+    return frontier
+
+
+def _record(frontier: dict[str, dict], records: list[dict]) -> None:
+    """프런티어에 기록을 추가한다."""
+    if not records:
+        return
+    for record in records:
+        frontier[record["url"]] = record
+    try:
+        DISCOVERY_FRONTIER_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with DISCOVERY_FRONTIER_FILE.open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+    except OSError as e:
+        logger.warning("프런티어 기록 실패: path=%s, %s", DISCOVERY_FRONTIER_FILE, e)
+
+
+def _wait_turn(url: str) -> bool:
+    """robots.txt가 허용하면 호스트 요청 간격(CRAWL_DELAY·Crawl-delay)을 지켜 기다린 뒤 True를 반환한다."""
+    rp = _get_robots(url)
+    if not rp.can_fetch(CRAWL_USER_AGENT, url):
+        print(f"  [skip] robots.txt 차단: {url}")
+        return False
+    host = urlparse(url).netloc
+    wait = _last_request.get(host, 0.0) + _crawl_delay(rp) - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    _last_request[host] = time.monotonic()
+    return True
+
+
+def _iter_elements(url: str, tags: set[str]) -> Iterator[ET.Element]:
+    """
+    XML 문서를 내려받는 대로 파싱해, 이름(네임스페이스 제외)이 tags에 있는 요소가 닫힐 때마다 반환한다.
+    반환한 요소는 부모에서 떼어 내 트리에 쌓이지 않게 한다. gzip 압축 사이트맵(.xml.gz)은 받으면서 푼다.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: list[ET.Element] = []
+    gunzip = None
+    first = True
+
+    with httpx.stream(
+        "GET",
+        url,
+        headers={"User-Agent": CRAWL_USER_AGENT},
+        timeout=CRAWL_TIMEOUT,
+        follow_redirects=True,
+    ) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes(_CHUNK_SIZE):
+            if first:
+                first = False
+                if chunk.startswith(_GZIP_MAGIC):
+                    gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            parser.feed(gunzip.decompress(chunk) if gunzip else chunk)
+            yield from _closed_elements(parser, stack, tags)
+        if gunzip:
+            parser.feed(gunzip.flush())  # 압축 해제 버퍼에 남은 마지막 바이트
+    parser.close()
+    yield from _closed_elements(parser, stack, tags)
+
+
+def _closed_elements(parser: ET.XMLPullParser, stack: list[ET.Element], tags: set[str]) -> Iterator[ET.Element]:
+    """지금까지 파싱한 이벤트 중 tags에 있는 요소가 닫힌 것을 반환하고 부모에서 떼어 낸다."""
+    for event, elem in parser.read_events():
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if _local(elem.tag) in tags:
+            yield elem
+            if stack:
+                stack[-1].remove(elem)
+
+
+def _feed_entry(elem: ET.Element) -> tuple[str | None, str | None]:
+    """RSS <item> / Atom <entry>에서 (글 URL, 날짜)를 꺼낸다. RSS는 수정일이 없어 발행일을 쓴다."""
+    if _local(elem.tag) == "item":
+        return _child_text(elem, "link", "guid"), _parse_date(_child_text(elem, "pubDate", "date"))
+    link = None
+    for child in elem:
+        if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+            link = child.get("href")
+            break
+    return link, _parse_date(_child_text(elem, "updated", "published"))
+
+
+def _resolve_target(target: str) -> tuple[str, str | None, list[str], list[str]]:
+    """
+    탐색 대상을 (블로그 키, 글 호스트, 피드 URL 목록, 사이트맵 URL 목록)으로 바꾼다.
+    블로그 키는 프런티어의 source 값이다. 네이버 블로그는 글 호스트 대신 None을 반환한다. (글 URL 형태로 판별)
+    """
+    target = target.strip().rstrip("/")
+    if _NAVER_BLOG_ID_RE.fullmatch(target):
+        return f"blog.naver.com/{target}", None, [f"https://rss.blog.naver.com/{target}.xml"], []
+
+    parsed = urlparse(target if "://" in target else f"https://{target}")
+    host = parsed.netloc.lower()
+    if host in ("blog.naver.com", "m.blog.naver.com"):
+        blog_id = parse_qs(parsed.query).get("blogId", [""])[0] or parsed.path.strip("/").split("/")[0]
+        return f"blog.naver.com/{blog_id}", None, [f"https://rss.blog.naver.com/{blog_id}.xml"], []
+
+    root = f"{parsed.scheme}://{parsed.netloc}"
+    sitemaps = _get_robots(root).site_maps() or [f"{root}/sitemap.xml"]
+    if host.endswith(".tistory.com"):
+        feeds = [f"{root}/rss"]
+    else:
+        feeds = _feed_links(root)
+    post_host = urlparse(canonical_url(root)).netloc
+    return post_host, post_host, feeds, sitemaps
+
+
+def _feed_links(root: str) -> list[str]:
+    """블로그 첫 페이지의 <link rel="alternate" type="application/rss+xml|atom+xml"> 피드 URL"""
+    if not _wait_turn(root):
+        return []
+    try:
+        response = httpx.get(
+            root, headers={"User-Agent": CRAWL_USER_AGENT}, timeout=CRAWL_TIMEOUT, follow_redirects=True
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning("첫 페이지 요청 실패, 피드 탐색 스킵: url=%s, %s", root, e)
+        return []
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    feeds = []
+    for link in soup.find_all("link", href=True):
+        if "alternate" in (link.get("rel") or []) and link.get("type", "").lower() in _FEED_TYPES:
+            feeds.append(urljoin(str(response.url), link["href"]))
+    return list(dict.fromkeys(feeds))
+
+
+def _is_post_url(url: str, host: str | None) -> bool:
+    """정규 URL이 대상 블로그의 글 페이지인지 판별한다. host가 None이면 네이버 블로그 글인지 본다."""
+    if host is None:
+        return naver_post_id(url) is not None
+    parsed = urlparse(url)
+    if parsed.netloc != host or parsed.path == "/":
+        return False
+    if host.endswith(".tistory.com"):
+        return bool(_TISTORY_POST_RE.fullmatch(parsed.path))
+    return not _LISTING_RE.search(parsed.path)
+
+
+def _add_post(found: dict[str, tuple[str, str | None]], link: str, lastmod: str | None, host: str | None) -> None:
+    """
+    글 URL을 정규화한 키로 found에 (적힌 URL, lastmod)를 넣는다.
+    같은 글이 여러 번 나오면 처음 나온 URL과 가장 최근 lastmod를 남긴다.
+    """
+    url = canonical_url(link)
+    if not _is_post_url(url, host):
+        return
+    if url not in found:
+        found[url] = (link.strip(), lastmod)
+    elif lastmod and lastmod > (found[url][1] or ""):
+        found[url] = (found[url][0], lastmod)
+
+
+def _drop_disallowed(found: dict[str, tuple[str, str | None]]) -> None:
+    """robots.txt가 막은 글을 found에서 뺀다. (호스트별로 robots.txt를 한 번만 확인)"""
+    parsers: dict[str, urllib.robotparser.RobotFileParser] = {}
+    for url, (link, _) in list(found.items()):
+        key = _robots_key(link)
+        rp = parsers.get(key)
+        if rp is None:
+            rp = parsers[key] = _get_robots(link)
+        if not rp.can_fetch(CRAWL_USER_AGENT, link):
+            del found[url]
+
+
+def _read_feeds(feeds: list[str], found: dict[str, tuple[str, str | None]], host: str | None) -> int:
+    """피드의 글 URL을 found에 모으고 읽은 피드 수를 반환한다."""
+    read = 0
+    for feed in feeds:
+        if not _wait_turn(feed):
+            continue
+        with span("discover.feed", url=feed) as s:
+            entries = 0
+            try:
+                for elem in _iter_elements(feed, {"item", "entry"}):
+                    link, date = _feed_entry(elem)
+                    if link:
+                        entries += 1
+                        _add_post(found, link, date, host)
+            except (httpx.HTTPError, ET.ParseError, zlib.error) as e:
+                logger.warning("피드 읽기 실패: url=%s, %s", feed, e)
+                print(f"  [fail] 피드 읽기 실패: {feed}")
+                continue
+            s["entries"] = entries
+        read += 1
+    return read
+
+
+def _read_sitemaps(
+    sitemaps: list[str],
+    found: dict[str, tuple[str, str | None]],
+    host: str | None,
+    frontier: dict[str, dict],
+    full: bool,
+) -> tuple[int, int, list[dict]]:
+    """
+    사이트맵(인덱스 포함)의 글 URL을 found에 모으고 (읽은 사이트맵 수, 변경 없어 건너뛴 수, 사이트맵 기록)을 반환한다.
+    full=False이면 인덱스에 적힌 lastmod가 지난번과 같은 하위 사이트맵은 받지 않는다.
+    사이트맵 기록은 호출 측이 글 기록과 함께 프런티어에 쓴다. (먼저 쓰고 중단되면 다음 실행이 그 사이트맵을
+    변경 없음으로 건너뛰어 거기서 찾은 글을 다시 보지 못한다)
+    """
+    queue: list[tuple[str, str | None]] = [(url, None) for url in sitemaps]
+    seen: set[str] = set()
+    read = skipped = 0
+    records: list[dict] = []
+
+    while queue and read < DISCOVERY_MAX_SITEMAPS:
+        url, lastmod = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+
+        prev = frontier.get(url)
+        if not full and lastmod and prev and prev.get("kind") == "sitemap" and prev.get("lastmod") == lastmod:
+            skipped += 1
+            continue
+        if not _wait_turn(url):
+            continue
+
+        children: list[tuple[str, str | None]] = []
+        with span("discover.sitemap", url=url) as s:
+            entries = 0
+            try:
+                for elem in _iter_elements(url, {"url", "sitemap"}):
+                    loc = _child_text(elem, "loc")
+                    if not loc:
+                        continue
+                    entries += 1
+                    if _local(elem.tag) == "sitemap":
+                        children.append((loc, _parse_date(_child_text(elem, "lastmod"))))
+                    else:
+                        _add_post(found, loc, _parse_date(_child_text(elem, "lastmod")), host)
+            except (httpx.HTTPError, ET.ParseError, zlib.error) as e:
+                logger.warning("사이트맵 읽기 실패: url=%s, %s", url, e)
+                print(f"  [fail] 사이트맵 읽기 실패: {url}")
+                continue
+            s["entries"] = entries
+            s["children"] = len(children)
+
+        read += 1
+        queue.extend(children)
+        records.append({
+            "url": url,
+            "kind": "sitemap",
+            "lastmod": lastmod,
+            "read_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    if queue:
+        logger.warning("사이트맵 %d개를 읽어 DISCOVERY_MAX_SITEMAPS에 도달, 남은 %d개 스킵", read, len(queue))
+    return read, skipped, records
+
+
+@timed("discover")
+def discover(target: str, limit: int | None = None, full: bool = False) -> dict[str, int]:
+    """
+    블로그 하나의 글 URL을 찾아 새 글·수정된 글을 BLOG_URLS_FILE에 lastmod 최신순으로 예약한다.
+    limit이 있으면 그 수까지만 예약하고, 나머지는 프런티어에 남겨 다음 실행에서 예약한다.
+    full=True이면 lastmod가 같은 하위 사이트맵도 다시 읽는다.
+    {"feeds", "sitemaps", "skipped_sitemaps", "found", "new", "changed"}를 반환한다.
+    """
+    frontier = _load_frontier()
+    source, host, feeds, sitemaps = _resolve_target(target)
+
+    found: dict[str, tuple[str, str | None]] = {}  # 정규 URL → (피드·사이트맵에 적힌 URL, lastmod)
+    feeds_read = _read_feeds(feeds, found, host)
+    sitemaps_read, sitemaps_skipped, sitemap_records = _read_sitemaps(sitemaps, found, host, frontier, full)
+    # 이전 실행에서 찾았지만 limit에 걸려 아직 예약하지 못한 글 (변경 없는 사이트맵을 건너뛰어도 남는다)
+    for record in frontier.values():
+        if record.get("kind") == "post" and record["source"] == source and not record["scheduled_at"]:
+            found.setdefault(record["url"], (record["link"], record["lastmod"]))
+    _drop_disallowed(found)
+
+    # urls 파일에 이미 있는 글 (직접 추가했거나 이전 탐색에서 예약) — 정규 URL → 파일에 적힌 URL
+    listed = {canonical_url(line): line for line in read_urls(BLOG_URLS_FILE, include_done=True)}
+    now = datetime.now(timezone.utc).isoformat()
+
+    records: dict[str, dict] = {}
+    candidates: list[tuple[str, str | None, bool]] = []  # (url, lastmod, 수정 여부)
+    for url, (link, lastmod) in found.items():
+        prev = frontier.get(url) or {}
+        record = records[url] = {
+            "url": url,
+            "link": prev.get("link", link),
+            "kind": "post",
+            "source": source,
+            "lastmod": lastmod or prev.get("lastmod"),
+            "first_seen": prev.get("first_seen", now),
+            "scheduled_lastmod": prev.get("scheduled_lastmod"),
+            "scheduled_at": prev.get("scheduled_at"),
+        }
+        if not record["scheduled_at"]:
+            if url in listed:  # 이미 urls 파일에 있으므로 지금 lastmod를 기준으로만 기록한다
+                record["scheduled_lastmod"], record["scheduled_at"] = record["lastmod"], now
+            else:
+                candidates.append((url, record["lastmod"], False))
+        elif lastmod and record["scheduled_lastmod"] and lastmod > record["scheduled_lastmod"]:
+            candidates.append((url, lastmod, True))
+        elif lastmod and not record["scheduled_lastmod"]:
+            record["scheduled_lastmod"] = lastmod  # 예약 당시 날짜를 몰랐던 글은 지금 값을 기준으로 삼는다
+
+    # lastmod 최신순, 날짜 없는 글은 뒤로
+    candidates.sort(key=lambda c: c[1] or "", reverse=True)
+    if limit is not None:
+        candidates = candidates[:limit]
+    for url, lastmod, _ in candidates:
+        records[url]["scheduled_lastmod"], records[url]["scheduled_at"] = lastmod, now
+
+    new_urls = [records[url]["link"] for url, _, changed in candidates if not changed or url not in listed]
+    append_urls(BLOG_URLS_FILE, new_urls)
+    for url, _, changed in candidates:
+        if changed and url in listed:
+            mark_stage(BLOG_URLS_FILE, listed[url], STAGE_QUEUED)
+    # 사이트맵 lastmod는 그 사이트맵에서 찾은 글과 함께 기록한다 (_read_sitemaps 참고)
+    _record(frontier, sitemap_records + [r for url, r in records.items() if r != frontier.get(url)])
+
+    changed = sum(1 for _, _, is_changed in candidates if is_changed)
+    return {
+        "feeds": feeds_read,
+        "sitemaps": sitemaps_read,
+        "skipped_sitemaps": sitemaps_skipped,
+        "found": len(found),
+        "new": len(candidates) - changed,
+        "changed": changed,
+    }
@@ -1,11 +1,17 @@
-import json
+import codecs
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 
-from config import PARSED_POSTS_DIR
-from utils.logger import get_logger
+from config import PARSE_WORKERS, PARSED_POSTS_DIR, PARSER_BACKEND
+from utils.html_archive import ARCHIVE_ERRORS, open_html
+from utils.logger import get_logger, init_worker_logging, worker_log_queue
+from utils.metrics import annotate, span, timed
+from utils.store import STORE_ERRORS, get_store
 
 logger = get_logger(__name__)
 
@@ -31,6 +37,22 @@ _CONTENT_SELECTORS = [
 ]
 
 
+_MIN_CONTENT_LENGTH = 200
+
+# auto가 고르는 백엔드 (우선순위 순)
+# selectolax(lexbor)는 HTML5 트리 구성 규칙을 따라 깨진 HTML(표 안의 단락을 표 앞으로 옮김, head 안의 noscript를
+# 닫고 본문으로 넘김 등)에서 html.parser와 결과가 다르므로, 결과가 같아질 때까지 직접 지정할 때만 사용한다
+AUTO_BACKENDS = ("lxml", "html.parser")
+
+# 원문 HTML을 압축 해제·디코딩하는 단위
+_READ_CHUNK = 1024 * 1024
+
+
+def _clean_title(text: str) -> str:
+    """<title> 태그 — " : 네이버 블로그" 등 사이트명 접미사 제거"""
+    return text.split(" : ")[0].split(" | ")[0].strip()
+
+
 def _extract_title(soup: BeautifulSoup) -> str:
     # 네이버 블로그 스마트에디터 제목
     naver_title = soup.select_one(".se-title-text")
@@ -41,10 +63,9 @@ def _extract_title(soup: BeautifulSoup) -> str:
     if h1 and h1.get_text(strip=True):
         return h1.get_text(strip=True)
 
-    # <title> 태그 — " : 네이버 블로그" 등 사이트명 접미사 제거
     title_tag = soup.find("title")
     if title_tag:
-        return title_tag.get_text(strip=True).split(" : ")[0].split(" | ")[0].strip()
+        return _clean_title(title_tag.get_text(strip=True))
 
     return ""
 
@@ -56,29 +77,149 @@ def _extract_content(soup: BeautifulSoup) -> str:
             for noise in element.find_all(_NOISE_TAGS):
                 noise.decompose()
             text = element.get_text(separator="\n", strip=True)
-            if len(text) > 200:
+            if len(text) > _MIN_CONTENT_LENGTH:
                 return text
     return ""
 
 
-def parse(url: str, html_path: Path) -> Path | None:
+def _extract_bs4(html: str, features: str) -> tuple[str, str]:
+    soup = BeautifulSoup(html, features)
+    return _extract_title(soup), _extract_content(soup)
+
+
+def _selectolax_text(
+    node,
+    separator: str = "\n",
+    skip: frozenset[str] = frozenset(),
+    skipped: list | None = None,
+) -> str:
     """
-    HTML 파일에서 본문을 추출해 parsed_posts 디렉터리에 JSON으로 저장한다.
-    본문 추출 실패(200자 미만) 시 None을 반환한다.
+    BeautifulSoup get_text(separator=..., strip=True)와 같은 규칙으로 텍스트를 합친다.
+    skip에 든 태그의 하위 텍스트는 건너뛰고, skipped를 주면 건너뛴 노드를 담는다. (node 자신은 건너뛰지 않는다)
+    """
+    parts = []
+    stack = [node.child] if node.child else []
+    while stack:
+        child = stack.pop()
+        if child.next:
+            stack.append(child.next)
+        if child.tag == "-text":
+            text = child.text_content.strip()
+            if text:
+                parts.append(text)
+        elif child.tag in skip:
+            if skipped is not None:
+                skipped.append(child)
+        elif child.child:
+            stack.append(child.child)
+    return separator.join(parts)
+
+
+def _extract_selectolax(html: str) -> tuple[str, str]:
+    """selectolax(lexbor) 기반 추출. _extract_title / _extract_content와 같은 규칙을 따른다."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+
+    title = ""
+    naver_title = tree.css_first(".se-title-text")
+    h1 = tree.css_first("h1")
+    title_tag = tree.css_first("title")
+    if naver_title:
+        title = _selectolax_text(naver_title, "")
+    elif h1 and _selectolax_text(h1, ""):
+        title = _selectolax_text(h1, "")
+    elif title_tag:
+        title = _clean_title(_selectolax_text(title_tag, ""))
+
+    noise_tags = frozenset(_NOISE_TAGS)
+    for selector in _CONTENT_SELECTORS:
+        element = tree.css_first(selector)
+        if element:
+            noise: list = []
+            text = _selectolax_text(element, skip=noise_tags, skipped=noise)
+            # _extract_content처럼 후보 안의 노이즈를 트리에서 지워 다음 후보 선택에도 반영한다
+            # (건너뛴 노드는 서로 겹치지 않으므로 바깥 노이즈를 지운 뒤 안쪽 노드를 다시 지우는 일이 없다)
+            for node in noise:
+                node.decompose()
+            if len(text) > _MIN_CONTENT_LENGTH:
+                return title, text
+    return title, ""
+
+
+def _is_installed(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends() -> list[str]:
+    """현재 환경에서 사용할 수 있는 추출 백엔드 목록을 우선순위 순으로 반환한다."""
+    backends = []
+    if _is_installed("selectolax"):
+        backends.append("selectolax")
+    if builder_registry.lookup("lxml") is not None:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend == "auto":
+        return next(b for b in available_backends() if b in AUTO_BACKENDS)
+    if backend not in available_backends():
+        logger.warning("추출 백엔드 사용 불가, html.parser 사용: backend=%s", backend)
+        return "html.parser"
+    return backend
+
+
+def extract(html: str, backend: str = PARSER_BACKEND) -> tuple[str, str]:
+    """
+    HTML에서 (제목, 본문)을 추출한다. 본문이 200자 이하이면 빈 문자열을 반환한다.
+    backend는 "selectolax" / "lxml" / "html.parser" / "auto" 중 하나이며,
+    AUTO_BACKENDS의 백엔드는 결과가 같다. (selectolax는 깨진 HTML에서 다를 수 있다)
     """
-    PARSED_POSTS_DIR.mkdir(parents=True, exist_ok=True)
+    backend = _resolve_backend(backend)
+    with span("parse.extract", backend=backend):
+        if backend == "selectolax":
+            return _extract_selectolax(html)
+        return _extract_bs4(html, backend)
+
+
+def _read_html(slug: str) -> tuple[str, int]:
+    """
+    원문 HTML을 스트리밍으로 풀면서 UTF-8로 디코딩해 (HTML, 바이트 수)를 반환한다.
+    압축 해제된 바이트 전체를 따로 들고 있지 않으므로 수 MB짜리 페이지도 메모리를 두 배로 쓰지 않는다.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    size = 0
+    with open_html(slug) as f:
+        while chunk := f.read(_READ_CHUNK):
+            size += len(chunk)
+            parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), size
+
 
+@timed("parse")
+def parse(url: str, html_path: Path, backend: str = PARSER_BACKEND) -> Path | None:
+    """
+    원문 HTML 아카이브에서 html_path.stem(slug)의 본문을 추출해 저장소(기본: parsed_posts 디렉터리 JSON)에 저장한다.
+    반환하는 parsed_posts 경로의 stem이 글의 slug다.
+    본문 추출 실패(200자 미만) 시 None을 반환한다.
+    """
     try:
-        html = html_path.read_text(encoding="utf-8")
-    except OSError as e:
+        html, size = _read_html(html_path.stem)
+    except ARCHIVE_ERRORS as e:
         logger.error("HTML 파일 읽기 실패: path=%s, %s", html_path, e)
         print(f"  [fail] HTML 파일 읽기 실패: {html_path.name}")
         return None
+    annotate(url=url, bytes=size)
 
-    soup = BeautifulSoup(html, "html.parser")
-
-    title = _extract_title(soup)
-    content = _extract_content(soup)
+    title, content = extract(html, backend)
 
     if not content:
         logger.warning("본문 추출 실패 (200자 미만): url=%s", url)
@@ -95,10 +236,41 @@ def parse(url: str, html_path: Path) -> Path | None:
     output_path = PARSED_POSTS_DIR / html_path.with_suffix(".json").name
 
     try:
-        output_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
-    except OSError as e:
+        get_store().put_post(output_path.stem, result)
+    except STORE_ERRORS as e:
         logger.error("파싱 결과 저장 실패: path=%s, %s", output_path, e)
         print(f"  [fail] 파싱 결과 저장 실패: {output_path.name}")
         return None
 
     return output_path
+
+
+def parse_many(
+    items: list[tuple[str, Path]],
+    workers: int = PARSE_WORKERS,
+    backend: str = PARSER_BACKEND,
+) -> dict[str, Path | None]:
+    """
+    (url, html_path) 목록을 여러 프로세스로 나눠 파싱하고 {url: parsed_posts 경로 또는 None}을 반환한다.
+    대량 재처리(backfill)처럼 파싱이 CPU 병목일 때 사용한다.
+    """
+    if not items:
+        return {}
+
+    urls = [url for url, _ in items]
+    paths = [path for _, path in items]
+
+    if workers <= 1 or len(items) == 1:
+        return {url: parse(url, path, backend) for url, path in items}
+
+    # spawn: 호출 측에서 실행 중인 스레드의 락 상태를 자식 프로세스로 복제하지 않는다
+    # 워커의 로그는 프로세스 간 큐로 이 프로세스의 로그 리스너에 보낸다
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker_logging,
+        initargs=(worker_log_queue(),),
+    ) as pool:
+        chunksize = max(1, len(items) // (workers * 4))
+        results = pool.map(parse, urls, paths, [backend] * len(items), chunksize=chunksize)
+        return dict(zip(urls, results))
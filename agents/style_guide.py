@@ -1,13 +1,37 @@
 import json
+import shutil
 from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
-from config import ANALYSIS_DIR, STYLE_GUIDES_DIR, VOCAB_TOP_N
+from agents.dedup import duplicate_slugs
+from agents.stylometry import STYLOMETRY_VERSION, honorific_ratio, short_paragraph_share, writing_style
+from config import CATEGORIES, STYLE_GUIDE_STATE_DIR, STYLE_GUIDES_DIR, VOCAB_TOP_N
 from utils.logger import get_logger
+from utils.metrics import percentile, timed
+from utils.store import STORE_ERRORS, get_store
 
 logger = get_logger(__name__)
 
+# 증분 집계 상태
+# - state.v{N}.json = {"index": {analysis 파일명: {"stat": 저장소의 변경 감지값, "category"}},
+#                      "tallies": {카테고리: 누적 집계 (_new_tally)}}
+#   색인과 누적 집계를 한 파일로 교체해, 중단되더라도 같은 변경이 두 번 더해지지 않는다
+# - entries.v{N}.jsonl = {"name", "stat", "entry": 집계용 항목 또는 null(제거)} 추가 기록
+#   글이 바뀌거나 지워지면 이전 값을 빼야 하므로 글별 기여분을 남긴다 (뺄 때만 읽는다)
+# 집계 항목 형식을 바꾸면 _STATE_VERSION을 올린다 — 다음 실행에서 전체 재생성한다
+_STATE_VERSION = 3
+_STATE_FILE = STYLE_GUIDE_STATE_DIR / f"state.v{_STATE_VERSION}.json"
+_STATE_ENTRIES = STYLE_GUIDE_STATE_DIR / f"entries.v{_STATE_VERSION}.jsonl"
+
+# 누적 집계에서 세는 tone_and_manner 필드 (agents.tone_merge.aggregate와 같은 필드·조건)
+_LABEL_FIELDS = {
+    "writing_style": ("formality", "sentence_length", "paragraph_structure"),
+    "structure": ("opening_style", "body_style", "closing_style"),
+}
+_VOCAB_FIELDS = ("frequent_expressions", "technical_terms", "avoid_expressions")
+_STYLOMETRY_SUMS = ("sentences", "paragraphs", "formal_endings", "casual_endings")
+
 _HUMANIZE_SECTION = """\
 ## Humanize 정책
 
@@ -20,71 +44,6 @@ _HUMANIZE_SECTION = """\
 """
 
 
-def _mode(values: list[str]) -> str:
-    """최빈값을 반환한다. 값이 없으면 빈 문자열을 반환한다."""
-    if not values:
-        return ""
-    return Counter(values).most_common(1)[0][0]
-
-
-def _top_n(items: list[str], n: int = VOCAB_TOP_N) -> list[str]:
-    """빈도 내림차순으로 상위 n개를 반환한다."""
-    return [item for item, _ in Counter(items).most_common(n)]
-
-
-def _aggregate(entries: list[dict]) -> dict:
-    """tone_and_manner 데이터를 집계한다."""
-    formality, sentence_length, paragraph_structure = [], [], []
-    frequent_expressions, technical_terms, avoid_expressions = [], [], []
-    opening_style, body_style, closing_style = [], [], []
-
-    for e in entries:
-        tm = e.get("tone_and_manner")
-        if not isinstance(tm, dict):
-            logger.warning("tone_and_manner 필드가 dict가 아님, 스킵: slug=%s", e.get("slug"))
-            continue
-
-        ws = tm.get("writing_style") or {}
-        vocab = tm.get("vocabulary") or {}
-        struct = tm.get("structure") or {}
-
-        if ws.get("formality"):
-            formality.append(ws["formality"])
-        if ws.get("sentence_length"):
-            sentence_length.append(ws["sentence_length"])
-        if ws.get("paragraph_structure"):
-            paragraph_structure.append(ws["paragraph_structure"])
-
-        frequent_expressions.extend(vocab.get("frequent_expressions") or [])
-        technical_terms.extend(vocab.get("technical_terms") or [])
-        avoid_expressions.extend(vocab.get("avoid_expressions") or [])
-
-        if struct.get("opening_style"):
-            opening_style.append(struct["opening_style"])
-        if struct.get("body_style"):
-            body_style.append(struct["body_style"])
-        if struct.get("closing_style"):
-            closing_style.append(struct["closing_style"])
-
-    return {
-        "writing_style": {
-            "formality": _mode(formality),
-            "sentence_length": _mode(sentence_length),
-            "paragraph_structure": _mode(paragraph_structure),
-        },
-        "vocabulary": {
-            "frequent_expressions": _top_n(frequent_expressions),
-            "technical_terms": _top_n(technical_terms),
-            "avoid_expressions": list(dict.fromkeys(avoid_expressions)),
-        },
-        "structure": {
-            "opening_style": _mode(opening_style),
-            "body_style": _mode(body_style),
-            "closing_style": _mode(closing_style),
-        },
-    }
-
-
 _FORMALITY_LABEL = {"formal": "경어체", "casual": "반말/구어체"}
 _SENTENCE_LABEL = {
     "short": "짧은 문장 위주",
@@ -113,6 +72,36 @@ _CLOSING_LABEL = {
 }
 
 
+def _share(histogram: dict[str, int]) -> str:
+    """구간별 분포를 "구간 n%" 목록으로 만든다."""
+    total = sum(histogram.values())
+    return " · ".join(f"{name} {count / total:.0%}" for name, count in histogram.items() if count)
+
+
+def _measured(stylometry: dict | None) -> dict[str, str]:
+    """문체 지표 합산값을 표의 측정값 문구로 만든다. 지표가 없으면 빈 문구를 반환한다."""
+    if not stylometry or not stylometry["sentences"]:
+        return {"formality": "", "sentence": "", "paragraph": "", "connectives": ""}
+
+    ratio = honorific_ratio(stylometry)
+    share = short_paragraph_share(stylometry)
+    chars = stylometry["sentence_chars"]
+    paragraphs = stylometry["paragraphs"]
+    connectives = list(stylometry["connectives"].items())[:VOCAB_TOP_N]
+    return {
+        "formality": f" — 경어 종결 {ratio:.0%}" if ratio is not None else "",
+        "sentence": (
+            f" — 평균 {chars['mean']:.0f}자, 중앙값 {chars['p50']}자, 90% {chars['p90']}자 이하"
+            f" ({_share(stylometry['sentence_histogram'])})"
+        ),
+        "paragraph": (
+            f" — 단락당 평균 {stylometry['sentences'] / paragraphs:.1f}문장, 2문장 이하 단락 {share:.0%}"
+            if paragraphs else ""
+        ),
+        "connectives": ", ".join(f"{word}({count})" for word, count in connectives) or "(없음)",
+    }
+
+
 def _render_markdown(category: str, agg: dict, count: int) -> str:
     ws = agg["writing_style"]
     vocab = agg["vocabulary"]
@@ -130,6 +119,14 @@ def _render_markdown(category: str, agg: dict, count: int) -> str:
     body_val = f"{struct['body_style']} ({_BODY_LABEL.get(struct['body_style'], struct['body_style'])})"
     closing_val = f"{struct['closing_style']} ({_CLOSING_LABEL.get(struct['closing_style'], struct['closing_style'])})"
 
+    measured = _measured(agg.get("stylometry"))
+    formality_val += measured["formality"]
+    sentence_val += measured["sentence"]
+    paragraph_val += measured["paragraph"]
+    connectives_section = (
+        f"\n### 접속 표현 (본문 측정, 등장 횟수)\n{measured['connectives']}\n" if measured["connectives"] else ""
+    )
+
     return f"""\
 # {category} 스타일 가이드
 
@@ -151,7 +148,7 @@ def _render_markdown(category: str, agg: dict, count: int) -> str:
 
 ### 자주 쓰는 표현 (빈도 순)
 {freq_expr}
-
+{connectives_section}
 ### 전문 용어
 {tech_terms}
 
@@ -173,56 +170,438 @@ def _render_markdown(category: str, agg: dict, count: int) -> str:
 {_HUMANIZE_SECTION}"""
 
 
-def generate_style_guides() -> list[Path]:
+def _write_json(path: Path, data: dict) -> None:
+    """임시 파일에 쓴 뒤 교체해 중단되더라도 이전 상태가 남게 한다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _read_json(path: Path, default: dict) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return default
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("스타일 가이드 상태 파일 손상, 무시: path=%s, %s", path, e)
+        return default
+
+
+def _append_entries(records: list[dict]) -> None:
+    if not records:
+        return
+    _STATE_ENTRIES.parent.mkdir(parents=True, exist_ok=True)
+    with _STATE_ENTRIES.open("a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+
+def _read_entries() -> tuple[dict[str, dict], int]:
     """
-    analysis 디렉터리의 모든 JSON 파일을 카테고리별로 집계해
-    style_guides/{category}.md 파일을 생성한다.
-    생성된 파일 경로 목록을 반환한다.
+    글별 기여분 기록을 읽어 ({파일명: {"stat", "entry"}}, 기록 줄 수)를 반환한다.
+    같은 파일명은 마지막 기록이 우선하고, 제거 기록(entry가 null)은 빠진다.
     """
-    STYLE_GUIDES_DIR.mkdir(parents=True, exist_ok=True)
+    entries: dict[str, dict] = {}
+    lines = 0
+    try:
+        with _STATE_ENTRIES.open(encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 중단된 마지막 줄
+                if record["entry"] is None:
+                    entries.pop(record["name"], None)
+                else:
+                    entries[record["name"]] = record
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("스타일 가이드 집계 항목 읽기 실패: path=%s, %s", _STATE_ENTRIES, e)
+    return entries, lines
+
+
+def _write_entries(entries: dict[str, dict]) -> None:
+    """글별 기여분 기록을 현재 항목만 남겨 다시 쓴다."""
+    _STATE_ENTRIES.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = _STATE_ENTRIES.with_suffix(".tmp")
+    tmp_path.write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in entries.values()),
+        encoding="utf-8",
+    )
+    tmp_path.replace(_STATE_ENTRIES)
+
+
+def _new_tally() -> dict:
+    """
+    카테고리 하나의 누적 집계.
+    순서가 있는 카운터(라벨·어휘·접속 표현)는 {값: [개수, 처음 나온 파일명, 그 글 안의 순서]}로 두고,
+    p50 / p90은 글별 값의 {값: 글 수}로 둔다.
+    """
+    return {
+        "posts": 0,
+        "labels": {field: {} for fields in _LABEL_FIELDS.values() for field in fields},
+        "vocabulary": {field: {} for field in _VOCAB_FIELDS},
+        "stylometry": {
+            "posts": 0,
+            "total_chars": 0,
+            **dict.fromkeys(_STYLOMETRY_SUMS, 0),
+            "sentence_histogram": {},
+            "paragraph_histogram": {},
+            "connectives": {},
+            "p50": {},
+            "p90": {},
+        },
+    }
 
-    if not ANALYSIS_DIR.exists():
-        logger.warning("analysis 디렉터리가 없습니다: %s", ANALYSIS_DIR)
-        print("  [warn] analysis 디렉터리가 없습니다.")
-        return []
 
-    # 카테고리별 그룹핑
-    groups: dict[str, list[dict]] = {}
-    for path in sorted(ANALYSIS_DIR.glob("*.json")):
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError) as e:
-            logger.error("analysis 파일 읽기 실패, 스킵: path=%s, %s", path, e)
-            print(f"  [warn] 읽기 실패, 스킵: {path.name}")
-            continue
+def _count(counter: dict, name: str, weights: dict, sign: int) -> None:
+    """
+    순서가 있는 카운터에 글 하나(name)의 {값: 횟수}를 더하거나(sign=1) 뺀다(sign=-1). weights는 글 안의 등장 순서다.
+    전체 재생성은 파일명 순으로 Counter에 넣으므로, 동률은 (파일명, 글 안의 순서)가 가장 작은 값이 앞선다.
+    그 글이 빠지면 순서를 None으로 두고 파일명을 남은 글의 하한으로 남긴다. (_unordered 참고)
+    """
+    for order, (item, count) in enumerate(weights.items()):
+        slot = counter.get(item)
+        if sign < 0:
+            if slot is None:
+                continue
+            slot[0] -= count
+            if slot[0] <= 0:
+                del counter[item]
+            elif slot[1] == name:
+                slot[2] = None
+        elif slot is None:
+            counter[item] = [count, name, order]
+        else:
+            slot[0] += count
+            # 처음 나온 글을 모르면 하한 이하의 파일명만 가장 앞선다고 확정할 수 있다
+            if (name <= slot[1]) if slot[2] is None else ((name, order) < (slot[1], slot[2])):
+                slot[1], slot[2] = name, order
+
+
+def _tally_entry(tally: dict, name: str, entry: dict, sign: int) -> None:
+    """집계용 항목 하나를 누적 집계에 더하거나(sign=1) 뺀다(sign=-1)."""
+    tally["posts"] += sign
+    tm = entry.get("tone_and_manner")
+    if not isinstance(tm, dict):
+        if sign > 0:
+            logger.warning("tone_and_manner 필드가 dict가 아님, 스킵: slug=%s", entry.get("slug"))
+        return
+
+    for group, fields in _LABEL_FIELDS.items():
+        values = tm.get(group) or {}
+        for field in fields:
+            if values.get(field):
+                _count(tally["labels"][field], name, {values[field]: 1}, sign)
+    vocab = tm.get("vocabulary") or {}
+    for field in _VOCAB_FIELDS:
+        _count(tally["vocabulary"][field], name, Counter(vocab.get(field) or []), sign)
+
+    features = entry.get("stylometry")
+    if not isinstance(features, dict):
+        return
+    stylometry = tally["stylometry"]
+    stylometry["posts"] += sign
+    stylometry["total_chars"] += sign * features["sentence_chars"]["total"]
+    for key in _STYLOMETRY_SUMS:
+        stylometry[key] += sign * features[key]
+    for key in ("sentence_histogram", "paragraph_histogram"):
+        histogram = stylometry[key]
+        for bucket, count in features[key].items():
+            histogram[bucket] = histogram.get(bucket, 0) + sign * count
+    _count(stylometry["connectives"], name, features["connectives"], sign)
+    for key in ("p50", "p90"):
+        values = stylometry[key]
+        value = str(features["sentence_chars"][key])
+        values[value] = values.get(value, 0) + sign
+        if not values[value]:
+            del values[value]
+
+
+def _unordered(tally: dict) -> bool:
+    """처음 나온 글이 빠져 동률 순서를 정할 수 없는 값이 있는지 확인한다."""
+    counters = [*tally["labels"].values(), *tally["vocabulary"].values(), tally["stylometry"]["connectives"]]
+    return any(slot[2] is None for counter in counters for slot in counter.values())
+
+
+def _ranked(counter: dict) -> list[str]:
+    """빈도 내림차순, 동률이면 파일명 순 집계에서 먼저 나온 값이 앞선다. (Counter.most_common과 같은 순서)"""
+    return sorted(counter, key=lambda item: (-counter[item][0], counter[item][1], counter[item][2]))
+
+
+def _aggregate_tally(tally: dict) -> dict:
+    """누적 집계를 agents.tone_merge.aggregate()와 같은 형식의 결과로 만든다."""
+    labels = tally["labels"]
+    mode = {field: next(iter(_ranked(counter)), "") for field, counter in labels.items()}
+    vocab = tally["vocabulary"]
+    avoid = vocab["avoid_expressions"]
+
+    stylometry = None
+    s = tally["stylometry"]
+    if s["posts"]:
+        sentences = s["sentences"]
+        stylometry = {
+            "version": STYLOMETRY_VERSION,
+            "posts": s["posts"],
+            "sentences": sentences,
+            "sentence_chars": {
+                "total": s["total_chars"],
+                "mean": round(s["total_chars"] / sentences, 1) if sentences else 0.0,
+                "p50": percentile([int(v) for v, n in s["p50"].items() for _ in range(n)], 50),
+                "p90": percentile([int(v) for v, n in s["p90"].items() for _ in range(n)], 50),
+            },
+            "sentence_histogram": dict(s["sentence_histogram"]),
+            "paragraphs": s["paragraphs"],
+            "paragraph_histogram": dict(s["paragraph_histogram"]),
+            "formal_endings": s["formal_endings"],
+            "casual_endings": s["casual_endings"],
+            "connectives": {word: s["connectives"][word][0] for word in _ranked(s["connectives"])},
+        }
 
-        if "tone_and_manner" not in data:
-            logger.warning("tone_and_manner 없음, 스킵: %s", path.name)
-            print(f"  [warn] tone_and_manner 없음, 스킵: {path.name}")
-            continue
+    return {
+        "writing_style": writing_style(stylometry) if stylometry else {
+            field: mode[field] for field in _LABEL_FIELDS["writing_style"]
+        },
+        "vocabulary": {
+            "frequent_expressions": _ranked(vocab["frequent_expressions"])[:VOCAB_TOP_N],
+            "technical_terms": _ranked(vocab["technical_terms"])[:VOCAB_TOP_N],
+            "avoid_expressions": sorted(avoid, key=lambda item: (avoid[item][1], avoid[item][2])),
+        },
+        "structure": {field: mode[field] for field in _LABEL_FIELDS["structure"]},
+        "stylometry": stylometry,
+    }
 
-        category = data.get("category", "etc")
-        groups.setdefault(category, []).append(data)
 
-    if not groups:
+def _scan_analysis() -> dict[str, list[int]]:
+    """
+    저장소의 분석 결과 {파일명(slug.json): 변경 감지용 값}을 반환한다.
+    다른 글의 중복으로 판정된 글은 원본이 분석되어 있으면 원본만 세도록 제외한다. (증분 집계에서는 삭제로 처리된다)
+    """
+    duplicates = duplicate_slugs()
+    stamps = get_store().analysis_stamps()
+    return {
+        f"{slug}.json": stamp
+        for slug, stamp in stamps.items()
+        if duplicates.get(slug) not in stamps
+    }
+
+
+def _to_entry(name: str, data: dict) -> tuple[str, dict] | None:
+    """analysis 레코드를 (카테고리, 집계용 항목)으로 바꾼다. tone_and_manner가 없으면 None."""
+    if "tone_and_manner" not in data:
+        logger.warning("tone_and_manner 없음, 스킵: %s", name)
+        print(f"  [warn] tone_and_manner 없음, 스킵: {name}")
+        return None
+
+    # 누적 집계가 사용하는 필드만 남긴다
+    entry = {"slug": data.get("slug"), "tone_and_manner": data["tone_and_manner"]}
+    if "stylometry" in data:
+        entry["stylometry"] = data["stylometry"]
+    return data.get("category", "etc"), entry
+
+
+def _read_entry(name: str) -> tuple[str, dict] | None:
+    """
+    analysis 레코드를 읽어 (카테고리, 집계용 항목)을 반환한다.
+    읽기 실패 또는 tone_and_manner가 없으면 None을 반환한다.
+    """
+    try:
+        data = get_store().get_analysis(name.removesuffix(".json"))
+    except STORE_ERRORS as e:
+        logger.error("analysis 파일 읽기 실패, 스킵: name=%s, %s", name, e)
+        print(f"  [warn] 읽기 실패, 스킵: {name}")
+        return None
+    if data is None:
+        return None
+    return _to_entry(name, data)
+
+
+def _render_category(category: str, tally: dict) -> Path | None:
+    content = _render_markdown(category, _aggregate_tally(tally), tally["posts"])
+    out_path = STYLE_GUIDES_DIR / f"{category}.md"
+
+    try:
+        out_path.write_text(content, encoding="utf-8")
+    except OSError as e:
+        logger.error("스타일 가이드 저장 실패: path=%s, %s", out_path, e)
+        print(f"  [fail] 스타일 가이드 저장 실패: {out_path.name}")
+        return None
+
+    print(f"  [done] 스타일 가이드 생성: {out_path.name} ({tally['posts']}개 글 기반)")
+    return out_path
+
+
+def _remove_category(category: str) -> None:
+    """글이 모두 빠진 카테고리의 스타일 가이드 파일을 지운다."""
+    out_path = STYLE_GUIDES_DIR / f"{category}.md"
+    if out_path.exists():
+        out_path.unlink()
+        print(f"  [done] 스타일 가이드 삭제 (글 없음): {out_path.name}")
+
+
+def _full_rebuild() -> list[Path]:
+    """모든 분석 결과를 한 번에 읽어 전체 카테고리를 다시 만들고 증분 상태를 새로 저장한다."""
+    previous = _read_json(_STATE_FILE, {}).get("tallies", {})
+    tallies: dict[str, dict] = {}
+    index: dict[str, dict] = {}
+    entries: dict[str, dict] = {}
+    # 변경 감지값을 먼저 읽어 두면, 읽는 도중 바뀐 레코드는 다음 증분 실행에서 다시 반영된다
+    stamps = _scan_analysis()
+    for slug, data in get_store().iter_analyses():
+        name = f"{slug}.json"
+        if name not in stamps:
+            continue
+        result = _to_entry(name, data)
+        category = None
+        if result is not None:
+            category, entry = result
+            _tally_entry(tallies.setdefault(category, _new_tally()), name, entry, 1)
+            entries[name] = {"name": name, "stat": stamps[name], "entry": entry}
+        index[name] = {"stat": stamps[name], "category": category}
+
+    # 이전 버전의 상태(index.v*.json, categories/ 등)는 지운다
+    if STYLE_GUIDE_STATE_DIR.exists():
+        for stale in STYLE_GUIDE_STATE_DIR.iterdir():
+            if stale.is_dir():
+                shutil.rmtree(stale)
+            elif stale not in (_STATE_FILE, _STATE_ENTRIES):
+                stale.unlink()
+    _write_json(_STATE_FILE, {"index": index, "tallies": tallies})
+    _write_entries(entries)
+
+    for category in sorted((set(CATEGORIES) | previous.keys()) - tallies.keys()):
+        _remove_category(category)
+
+    if not tallies:
         logger.warning("집계할 데이터가 없습니다.")
         print("  [warn] 집계할 데이터가 없습니다.")
         return []
 
     generated: list[Path] = []
-    for category, entries in sorted(groups.items()):
-        agg = _aggregate(entries)
-        content = _render_markdown(category, agg, len(entries))
-        out_path = STYLE_GUIDES_DIR / f"{category}.md"
-
-        try:
-            out_path.write_text(content, encoding="utf-8")
-        except OSError as e:
-            logger.error("스타일 가이드 저장 실패: path=%s, %s", out_path, e)
-            print(f"  [fail] 스타일 가이드 저장 실패: {out_path.name}")
+    for category, tally in sorted(tallies.items()):
+        out_path = _render_category(category, tally)
+        if out_path is not None:
+            generated.append(out_path)
+    return generated
+
+
+def _incremental() -> list[Path]:
+    """
+    이전 실행 이후 추가·변경·삭제된 analysis 파일만 읽어 카테고리별 누적 집계에 더하고 빼며,
+    영향을 받은 카테고리만 다시 렌더링한다. 이전 기여분을 찾을 수 없으면 전체 재생성한다.
+    """
+    state = _read_json(_STATE_FILE, {})
+    if "index" not in state:
+        return _full_rebuild()
+    index: dict[str, dict] = state["index"]
+    tallies: dict[str, dict] = state["tallies"]
+
+    removed: list[tuple[str, dict]] = []  # (파일명, 이전 색인 항목)
+    added: dict[str, tuple[str, dict]] = {}  # {파일명: (카테고리, 집계용 항목)}
+    current = _scan_analysis()
+
+    for name in index.keys() - current.keys():
+        removed.append((name, index.pop(name)))
+
+    for name, stamp in sorted(current.items()):
+        prev = index.get(name)
+        if prev is not None and prev["stat"] == stamp:
+            continue
+        if prev is not None:
+            removed.append((name, prev))
+        result = _read_entry(name)
+        if result is not None:
+            added[name] = result
+        index[name] = {"stat": stamp, "category": result[0] if result is not None else None}
+
+    touched: set[str] = set()
+    records: list[dict] = []
+    entries: dict[str, dict] | None = None
+    lines = 0
+    for name, prev in removed:
+        category = prev["category"]
+        if category is None:
             continue
+        if entries is None:
+            entries, lines = _read_entries()
+        old = entries.pop(name, None)
+        if old is None or old["stat"] != prev["stat"] or category not in tallies:
+            logger.warning("스타일 가이드 이전 집계 항목 없음, 전체 재생성: %s", name)
+            return _full_rebuild()
+        _tally_entry(tallies[category], name, old["entry"], -1)
+        touched.add(category)
+        if name not in added:
+            records.append({"name": name, "stat": None, "entry": None})
+
+    for name, (category, entry) in added.items():
+        _tally_entry(tallies.setdefault(category, _new_tally()), name, entry, 1)
+        touched.add(category)
+        record = {"name": name, "stat": index[name]["stat"], "entry": entry}
+        records.append(record)
+        if entries is not None:
+            entries[name] = record
+
+    for category in sorted(touched):
+        tally = tallies[category]
+        if not tally["posts"]:
+            del tallies[category]
+        elif _unordered(tally):
+            # 동률 순서를 정하던 글이 빠졌다 — 남은 글의 기여분으로 이 카테고리만 다시 집계한다
+            # (순서를 모르는 값은 글을 뺄 때만 생기므로 entries는 이미 읽혀 있다)
+            names = sorted(name for name, meta in index.items() if meta["category"] == category)
+            if any(name not in entries for name in names):
+                logger.warning("스타일 가이드 집계 항목 누락, 전체 재생성: category=%s", category)
+                return _full_rebuild()
+            tally = tallies[category] = _new_tally()
+            for name in names:
+                _tally_entry(tally, name, entries[name]["entry"], 1)
+
+    # 누적 집계를 먼저 교체하고 기여분을 기록한다 — 그 사이에 중단되면 다음 실행이 기여분 불일치로 전체 재생성한다
+    if removed or added:
+        _write_json(_STATE_FILE, {"index": index, "tallies": tallies})
+        if entries is not None and lines + len(records) > 2 * len(entries) + 100:
+            _write_entries(entries)
+        else:
+            _append_entries(records)
+
+    for category in touched - tallies.keys():
+        _remove_category(category)
+
+    # 스타일 가이드 파일이 지워진 카테고리도 다시 만든다
+    for category in tallies:
+        if not (STYLE_GUIDES_DIR / f"{category}.md").exists():
+            touched.add(category)
+
+    if not tallies:
+        logger.warning("집계할 데이터가 없습니다.")
+        print("  [warn] 집계할 데이터가 없습니다.")
+        return []
 
-        print(f"  [done] 스타일 가이드 생성: {out_path.name} ({len(entries)}개 글 기반)")
-        generated.append(out_path)
+    if not touched:
+        print("  [skip] 변경된 분석 결과 없음, 기존 스타일 가이드 유지")
+        return []
 
+    generated: list[Path] = []
+    for category in sorted(touched & tallies.keys()):
+        out_path = _render_category(category, tallies[category])
+        if out_path is not None:
+            generated.append(out_path)
     return generated
+
+
+@timed("style_guide.generate")
+def generate_style_guides(full: bool = False) -> list[Path]:
+    """
+    저장소의 분석 결과를 카테고리별로 집계해
+    style_guides/{category}.md 파일을 생성한다.
+    기본은 증분 방식으로, 이전 실행 이후 추가·변경·삭제된 레코드가 속한 카테고리만 다시 만든다.
+    full=True이면 모든 레코드를 다시 읽어 전체 카테고리를 재생성한다. (검증용)
+    생성된 파일 경로 목록을 반환한다.
+    """
+    STYLE_GUIDES_DIR.mkdir(parents=True, exist_ok=True)
+
+    if full:
+        return _full_rebuild()
+    return _incremental()
@@ -0,0 +1,216 @@
+"""
+본문에서 직접 측정하는 문체 지표 (LLM 호출 없음).
+
+- 문장 길이: 문장별 글자 수(공백 제외)의 평균·중앙값·90% 지점과 구간별 분포
+- 단락 구성: 단락(본문의 줄)별 문장 수 분포
+- 격식: 한글로 끝나는 문장 중 경어 종결(…요, …니다, …니까 등)의 비율
+- 접속 표현: 자주 쓰이는 접속사·부사의 등장 횟수
+
+writing_style의 formality / sentence_length / paragraph_structure는 이 지표로 정하며,
+스타일 가이드는 글별 지표를 합산한 분포를 함께 보여 준다.
+"""
+import re
+from collections import Counter
+
+from utils.logger import get_logger
+from utils.metrics import percentile
+from utils.store import STORE_ERRORS, get_store
+
+logger = get_logger(__name__)
+
+# 측정 방식을 바꾸면 올린다 — backfill이 이전 버전의 지표를 다시 계산한다
+STYLOMETRY_VERSION = 3
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。…~])\s+")
+_TRAILING_RE = re.compile(r"[^가-힣A-Za-z0-9]+$")
+_HANGUL_END_RE = re.compile(r"[가-힣]$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 경어 종결 (해요체·하십시오체)
+_FORMAL_ENDINGS = ("요", "죠", "니다", "니까", "시오", "세요")  # 죠: 지요의 준말
+
+_CONNECTIVES = [
+    "그리고", "그래서", "하지만", "그런데", "그러나", "또한", "게다가", "따라서", "그러므로",
+    "결국", "사실", "특히", "예를 들어", "즉", "물론", "그러니까", "아무튼", "우선",
+    "마지막으로", "한편", "다만", "오히려", "덕분에", "그럼에도",
+]
+_CONNECTIVE_RE = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, _CONNECTIVES)) + r")(?!\w)")
+
+# 구간: (상한, 이름) — 상한 이하이면 해당 구간
+_SENTENCE_BUCKETS = [(20, "~20자"), (40, "21~40자"), (60, "41~60자"), (None, "61자~")]
+_PARAGRAPH_BUCKETS = [(1, "1문장"), (2, "2문장"), (3, "3문장"), (5, "4~5문장"), (None, "6문장~")]
+
+# 라벨 기준
+_SHORT_SENTENCE_CHARS = 25  # 평균이 이 값 미만이면 short
+_LONG_SENTENCE_CHARS = 45  # 평균이 이 값 초과이면 long
+_SHORT_PARAGRAPH_SHARE = 0.7  # 2문장 이하 단락 비율이 이 값 이상이면 short_paragraphs
+_LONG_PARAGRAPH_SHARE = 0.3  # 이 값 이하이면 long_paragraphs
+
+
+def _bucket(value: int, buckets: list[tuple[int | None, str]]) -> str:
+    for upper, name in buckets:
+        if upper is None or value <= upper:
+            return name
+    return buckets[-1][1]
+
+
+def _histogram(values: list[int], buckets: list[tuple[int | None, str]]) -> dict[str, int]:
+    counts = dict.fromkeys((name for _, name in buckets), 0)
+    for value in values:
+        counts[_bucket(value, buckets)] += 1
+    return counts
+
+
+def measure(content: str) -> dict:
+    """
+    본문 하나의 문체 지표를 계산한다.
+    {"version", "sentences", "sentence_chars": {"total", "mean", "p50", "p90"}, "sentence_histogram",
+     "paragraphs", "paragraph_histogram", "formal_endings", "casual_endings", "connectives"}
+    """
+    sentence_lengths: list[int] = []
+    paragraph_sizes: list[int] = []
+    formal = casual = 0
+
+    for line in content.splitlines():
+        sentences = [s for s in _SENTENCE_END_RE.split(line.strip()) if s]
+        if not sentences:
+            continue
+        paragraph_sizes.append(len(sentences))
+        for sentence in sentences:
+            sentence_lengths.append(len(_WHITESPACE_RE.sub("", sentence)))
+            ending = _TRAILING_RE.sub("", sentence)
+            if not _HANGUL_END_RE.search(ending):
+                continue  # 코드·영문·숫자로 끝나는 문장은 격식 판단에서 제외
+            if ending.endswith(_FORMAL_ENDINGS):
+                formal += 1
+            else:
+                casual += 1
+
+    ordered = sorted(sentence_lengths)
+    total_chars = sum(ordered)
+    return {
+        "version": STYLOMETRY_VERSION,
+        "sentences": len(ordered),
+        "sentence_chars": {
+            "total": total_chars,
+            "mean": round(total_chars / len(ordered), 1) if ordered else 0.0,
+            "p50": percentile(ordered, 50),
+            "p90": percentile(ordered, 90),
+        },
+        "sentence_histogram": _histogram(sentence_lengths, _SENTENCE_BUCKETS),
+        "paragraphs": len(paragraph_sizes),
+        "paragraph_histogram": _histogram(paragraph_sizes, _PARAGRAPH_BUCKETS),
+        "formal_endings": formal,
+        "casual_endings": casual,
+        "connectives": dict(Counter(_CONNECTIVE_RE.findall(content)).most_common()),
+    }
+
+
+def merge(features: list[dict]) -> dict:
+    """
+    여러 글의 지표를 합산한다. 분포는 문장·단락 단위로 합치므로 긴 글일수록 비중이 크다.
+    결과는 measure()와 같은 형식이며 "posts"(합산한 글 수)가 추가된다. p50 / p90은 글별 값의 중앙값이다.
+    """
+    sentences = sum(f["sentences"] for f in features)
+    total_chars = sum(f["sentence_chars"]["total"] for f in features)
+    sentence_histogram: Counter = Counter()
+    paragraph_histogram: Counter = Counter()
+    connectives: Counter = Counter()
+    for f in features:
+        sentence_histogram.update(f["sentence_histogram"])
+        paragraph_histogram.update(f["paragraph_histogram"])
+        connectives.update(f["connectives"])
+
+    return {
+        "version": STYLOMETRY_VERSION,
+        "posts": len(features),
+        "sentences": sentences,
+        "sentence_chars": {
+            "total": total_chars,
+            "mean": round(total_chars / sentences, 1) if sentences else 0.0,
+            "p50": percentile([f["sentence_chars"]["p50"] for f in features], 50),
+            "p90": percentile([f["sentence_chars"]["p90"] for f in features], 50),
+        },
+        "sentence_histogram": {name: sentence_histogram[name] for _, name in _SENTENCE_BUCKETS},
+        "paragraphs": sum(f["paragraphs"] for f in features),
+        "paragraph_histogram": {name: paragraph_histogram[name] for _, name in _PARAGRAPH_BUCKETS},
+        "formal_endings": sum(f["formal_endings"] for f in features),
+        "casual_endings": sum(f["casual_endings"] for f in features),
+        "connectives": dict(connectives.most_common()),
+    }
+
+
+def honorific_ratio(features: dict) -> float | None:
+    """한글로 끝나는 문장 중 경어 종결 비율. 판단할 문장이 없으면 None."""
+    judged = features["formal_endings"] + features["casual_endings"]
+    return features["formal_endings"] / judged if judged else None
+
+
+def short_paragraph_share(features: dict) -> float | None:
+    """2문장 이하 단락의 비율. 단락이 없으면 None."""
+    if not features["paragraphs"]:
+        return None
+    histogram = features["paragraph_histogram"]
+    return (histogram["1문장"] + histogram["2문장"]) / features["paragraphs"]
+
+
+def writing_style(features: dict) -> dict:
+    """지표로 writing_style 라벨(formality / sentence_length / paragraph_structure)을 정한다."""
+    ratio = honorific_ratio(features)
+    mean = features["sentence_chars"]["mean"]
+    share = short_paragraph_share(features)
+
+    if mean < _SHORT_SENTENCE_CHARS:
+        sentence_length = "short"
+    elif mean > _LONG_SENTENCE_CHARS:
+        sentence_length = "long"
+    else:
+        sentence_length = "medium"
+
+    if share is None:
+        paragraph_structure = "mixed"
+    elif share >= _SHORT_PARAGRAPH_SHARE:
+        paragraph_structure = "short_paragraphs"
+    elif share <= _LONG_PARAGRAPH_SHARE:
+        paragraph_structure = "long_paragraphs"
+    else:
+        paragraph_structure = "mixed"
+
+    return {
+        "formality": "formal" if ratio is not None and ratio >= 0.5 else "casual",
+        "sentence_length": sentence_length,
+        "paragraph_structure": paragraph_structure,
+    }
+
+
+def backfill(force: bool = False) -> int:
+    """
+    저장소의 분석 결과 중 지표가 없거나 이전 버전인 글의 지표를 계산해 넣고 그 수를 반환한다.
+    tone_and_manner.writing_style도 측정값 기준 라벨로 바꾼다. (LLM 호출 없음)
+    """
+    store = get_store()
+    updated = 0
+    for slug, analysis in store.iter_analyses():
+        current = analysis.get("stylometry") or {}
+        if current.get("version") == STYLOMETRY_VERSION and not force:
+            continue
+        try:
+            post = store.get_post(slug)
+        except STORE_ERRORS as e:
+            logger.error("parsed_posts 읽기 실패: slug=%s, %s", slug, e)
+            continue
+        if post is None:
+            logger.warning("parsed_posts 없음, 문체 지표 스킵: slug=%s", slug)
+            continue
+
+        features = measure(post.get("content", ""))
+        analysis["stylometry"] = features
+        if isinstance(analysis.get("tone_and_manner"), dict):
+            analysis["tone_and_manner"]["writing_style"] = writing_style(features)
+        try:
+            store.put_analysis(slug, analysis)
+        except STORE_ERRORS as e:
+            logger.error("문체 지표 저장 실패: slug=%s, %s", slug, e)
+            continue
+        updated += 1
+    return updated
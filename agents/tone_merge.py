@@ -0,0 +1,89 @@
+"""
+tone_and_manner 집계 규칙. 여러 글(스타일 가이드)이나 한 글의 여러 청크(톤앤매너 분석)를 같은 규칙으로 합친다.
+
+- 라벨(formality, opening_style 등): 최빈값 (동률이면 먼저 나온 값)
+- 어휘: 빈도 상위 VOCAB_TOP_N개, avoid_expressions는 등장 순서대로 중복 제거
+- writing_style: 문체 지표(stylometry)가 있으면 합산한 분포로 정한다
+
+스타일 가이드는 같은 규칙을 카테고리별 누적 집계(agents.style_guide._aggregate_tally)로 따른다. 규칙을 바꾸면 함께 바꾼다.
+"""
+from collections import Counter
+
+from agents.stylometry import merge, writing_style
+from config import VOCAB_TOP_N
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def mode(values: list[str]) -> str:
+    """최빈값을 반환한다. 값이 없으면 빈 문자열을 반환한다."""
+    if not values:
+        return ""
+    return Counter(values).most_common(1)[0][0]
+
+
+def _top_n(items: list[str], n: int = VOCAB_TOP_N) -> list[str]:
+    """빈도 내림차순으로 상위 n개를 반환한다."""
+    return [item for item, _ in Counter(items).most_common(n)]
+
+
+def aggregate(entries: list[dict]) -> dict:
+    """
+    tone_and_manner 데이터를 집계한다.
+    문체 지표(stylometry)가 있는 글이 있으면 writing_style은 글별 라벨의 최빈값 대신 합산한 분포로 정한다.
+    """
+    formality, sentence_length, paragraph_structure = [], [], []
+    features = []
+    frequent_expressions, technical_terms, avoid_expressions = [], [], []
+    opening_style, body_style, closing_style = [], [], []
+
+    for e in entries:
+        tm = e.get("tone_and_manner")
+        if not isinstance(tm, dict):
+            logger.warning("tone_and_manner 필드가 dict가 아님, 스킵: slug=%s", e.get("slug"))
+            continue
+
+        ws = tm.get("writing_style") or {}
+        vocab = tm.get("vocabulary") or {}
+        struct = tm.get("structure") or {}
+
+        if isinstance(e.get("stylometry"), dict):
+            features.append(e["stylometry"])
+        if ws.get("formality"):
+            formality.append(ws["formality"])
+        if ws.get("sentence_length"):
+            sentence_length.append(ws["sentence_length"])
+        if ws.get("paragraph_structure"):
+            paragraph_structure.append(ws["paragraph_structure"])
+
+        frequent_expressions.extend(vocab.get("frequent_expressions") or [])
+        technical_terms.extend(vocab.get("technical_terms") or [])
+        avoid_expressions.extend(vocab.get("avoid_expressions") or [])
+
+        if struct.get("opening_style"):
+            opening_style.append(struct["opening_style"])
+        if struct.get("body_style"):
+            body_style.append(struct["body_style"])
+        if struct.get("closing_style"):
+            closing_style.append(struct["closing_style"])
+
+    stylometry = merge(features) if features else None
+    return {
+        "writing_style": writing_style(stylometry) if stylometry else {
+            "formality": mode(formality),
+            "sentence_length": mode(sentence_length),
+            "paragraph_structure": mode(paragraph_structure),
+        },
+        "vocabulary": {
+            "frequent_expressions": _top_n(frequent_expressions),
+            "technical_terms": _top_n(technical_terms),
+            "avoid_expressions": list(dict.fromkeys(avoid_expressions)),
+        },
+        "structure": {
+            "opening_style": mode(opening_style),
+            "body_style": mode(body_style),
+            "closing_style": mode(closing_style),
+        },
+        "stylometry": stylometry,
+    }
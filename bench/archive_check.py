@@ -0,0 +1,78 @@
+"""
+원문 HTML 아카이브 재압축 확인 스크립트.
+임시 데이터 디렉터리에 객체를 저장한 뒤 압축 방식 변경(gzip → zstd)과 zstd 사전 교체 후 recompress()를 실행하고,
+모든 slug의 객체가 남아 있고 원래 바이트로 풀리는지 확인한다. zstandard가 없으면 건너뛴다.
+
+    python -m bench.archive_check
+"""
+import os
+import sys
+import tempfile
+
+_POSTS = 40
+
+
+def _page(n: int) -> bytes:
+    """공통 상용구 사이에 글마다 다른 문단이 든 HTML"""
+    body = "".join(f"<p>{n}번 글의 {i}번째 문단입니다. 오늘의 기록 {n * i}.</p>\n" for i in range(40 + n % 7))
+    return (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>글 {n} : 네이버 블로그</title>'
+        '<script src="/static/app.js"></script></head><body><div class="se-main-container">{body}</div>'
+        "<footer>© 예제 블로그</footer></body></html>"
+    ).format(n=n, body=body).encode("utf-8")
+
+
+def _check(archive, pages: dict[str, bytes], step: str) -> list[str]:
+    """slug별로 객체가 있고 같은 바이트로 풀리는지 확인하고 실패 목록을 반환한다."""
+    errors = []
+    for slug, data in pages.items():
+        if not archive.has_html(slug):
+            errors.append(f"{step}: 객체 없음 {slug}")
+            continue
+        with archive.open_html(slug) as f:
+            if f.read() != data:
+                errors.append(f"{step}: 내용 불일치 {slug}")
+    objects = sum(1 for _ in archive.iter_objects())
+    if objects != len(pages):
+        errors.append(f"{step}: 객체 수 {objects}개 (기대 {len(pages)}개)")
+    print(f"  [{'ok' if not errors else 'FAIL'}] {step}: 객체 {objects}개")
+    return errors
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory(prefix="vibewriter-archive-") as data_dir:
+        # config는 import 시점에 환경 변수를 읽으므로 utils.html_archive를 import하기 전에 설정한다
+        os.environ["VIBEWRITER_DATA_DIR"] = data_dir
+        from utils import html_archive as archive
+
+        if archive.zstandard is None:
+            print("zstandard 미설치, 건너뜀: pip install zstandard")
+            return
+
+        pages = {f"post-{n}": _page(n) for n in range(_POSTS)}
+        for slug, data in pages.items():
+            archive.put_html(slug, data)
+        errors = _check(archive, pages, "gzip 저장")
+
+        archive.RAW_HTML_COMPRESSION = "zstd"
+        archive._compression.cache_clear()
+        archive.recompress()
+        errors += _check(archive, pages, "gzip → zstd 재압축")
+
+        for i in (1, 2):
+            if i == 2:
+                # 말뭉치를 바꿔 다른 사전이 학습되게 한다 — 새 글은 사전 1로 압축된 채 저장된다
+                for n in range(_POSTS, _POSTS * 2):
+                    pages[f"post-{n}"] = _page(n).replace(b"se-main-container", b"post-view")
+                    archive.put_html(f"post-{n}", pages[f"post-{n}"])
+            dict_id = archive.train_dictionary(dict_size=4096)
+            converted = archive.recompress()
+            errors += _check(archive, pages, f"사전 {i} 학습 후 재압축 ({converted}개, dict_id={dict_id})")
+
+    for line in errors:
+        print(f"  {line}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
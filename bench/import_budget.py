@@ -0,0 +1,109 @@
+"""
+CLI 시작 시간(import) 예산 확인.
+
+`python -X importtime main.py <인자>`를 실행해, 빈 인터프리터(`python -X importtime -c pass`)도 불러오는
+모듈을 뺀 나머지의 import 시간(모듈별 self 합)을 잰다. 잡음을 줄이려고 여러 번 실행한 중앙값을 쓴다.
+
+    python -m bench.import_budget            # 예산 확인 — 넘거나 금지 모듈을 불러오면 종료 코드 1
+    python -m bench.import_budget --top 15   # 오래 걸린 모듈 목록을 함께 출력
+
+아무 작업도 하지 않는 명령(--help)은 설정만 읽어야 하므로 에이전트·httpx·bs4 등을 불러오면 실패로 본다.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+# (main.py 인자, 예산 ms)
+_COMMANDS = [
+    (["--help"], 15.0),
+    (["learn", "--help"], 15.0),
+    (["discover", "--help"], 15.0),
+]
+
+# 인자 처리만 하는 명령에서 불러오면 안 되는 모듈 (이름 또는 패키지 접두어)
+_FORBIDDEN = [
+    "agents",
+    "pipelines",
+    "httpx",
+    "bs4",
+    "lxml",
+    "selectolax",
+    "zstandard",
+    "sqlite3",
+    "asyncio",
+    "multiprocessing",
+    "utils.ollama_client",
+    "utils.store",
+]
+
+
+def _import_times(args: list[str]) -> dict[str, int]:
+    """-X importtime 출력을 {모듈: self 시간(us)}으로 읽는다."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+
+def _forbidden(modules) -> list[str]:
+    """modules 중 불러온 금지 모듈(_FORBIDDEN 항목)"""
+    return [
+        prefix for prefix in _FORBIDDEN
+        if any(m == prefix or m.startswith(prefix + ".") for m in modules)
+    ]
+
+
+def check(command: list[str], budget_ms: float, runs: int, top: int) -> bool:
+    """명령 하나의 import 시간과 금지 모듈을 확인해 출력하고, 통과하면 True를 반환한다."""
+    baseline = set(_import_times(["-c", "pass"]))
+    samples = []
+    modules: dict[str, list[int]] = {}
+    for _ in range(runs):
+        times = {m: us for m, us in _import_times(["main.py", *command]).items() if m not in baseline}
+        samples.append(sum(times.values()) / 1000)
+        for module, us in times.items():
+            modules.setdefault(module, []).append(us)
+
+    total = statistics.median(samples)
+    forbidden = _forbidden(modules)
+    ok = total <= budget_ms and not forbidden
+
+    label = " ".join(command)
+    print(f"  [{'ok' if ok else 'fail'}] main.py {label}: {total:.1f}ms / 예산 {budget_ms:.0f}ms, 모듈 {len(modules)}개")
+    if forbidden:
+        print(f"         금지 모듈: {', '.join(forbidden)}")
+    if top:
+        slowest = sorted(modules.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:top]
+        for module, us in slowest:
+            print(f"         {statistics.median(us) / 1000:6.2f}ms  {module}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench.import_budget", description="CLI 시작 시간(import) 예산 확인")
+    parser.add_argument("--runs", type=int, default=5, help="명령별 반복 실행 수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=0, help="오래 걸린 모듈을 N개 출력한다")
+    parser.add_argument("--scale", type=float, default=1.0, help="예산 배율 (느린 CI 머신용)")
+    args = parser.parse_args()
+
+    results = [check(command, budget * args.scale, args.runs, args.top) for command, budget in _COMMANDS]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
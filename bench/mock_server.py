@@ -0,0 +1,246 @@
+"""
+벤치마크용 로컬 HTTP 서버. 블로그 호스트와 Ollama /api/generate를 한 서버에서 흉내 낸다.
+
+- GET  /robots.txt  — 전체 허용
+- GET  /post/{n}    — bench/fixtures/html의 픽스처를 순환해 응답 (ETag, If-None-Match → 304)
+- GET  /huge/{n}    — 실행 시 생성한 수 MB짜리 병적(pathological) 페이지
+- POST /api/generate — 요청의 format(JSON 스키마)에 맞는 응답을 지연 후 반환
+                       ("stream": true이면 Ollama처럼 토큰 단위 NDJSON을 chunked로 전송)
+                       최근 프롬프트와 겹치는 접두부는 KV 캐시에 있는 것으로 보고 prompt_eval_count에서 뺀다
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+# 본문 추출에 성공하는 픽스처만 블로그 글로 사용한다
+_POST_FIXTURES = [
+    "naver_smarteditor.html",
+    "naver_legacy_postviewarea.html",
+    "generic_article.html",
+    "selector_fallback.html",
+    "malformed_tistory.html",
+]
+
+_TOKEN_CHARS = 4  # 스트리밍 응답에서 토큰 하나로 보내는 글자 수
+_PROMPT_BYTES_PER_TOKEN = 3  # 프롬프트 토큰 수 추정 (한글 UTF-8 기준)
+_KV_SLOTS = 4  # 접두부 캐시를 흉내 낼 때 기억하는 최근 프롬프트 수 (OLLAMA_NUM_PARALLEL)
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+_HUGE_COMPONENT = (
+    '<div class="se-component se-text"><p class="se-text-paragraph">'
+    "<span>문단 {n}번입니다. 오늘도 같은 내용을 조금씩 바꿔 가며 이어서 적어 봅니다 &amp; 계속.</span>"
+    "<script>track({n});</script></p></div>\n"
+)
+
+
+def huge_page(components: int = 20_000) -> bytes:
+    """스마트에디터 구조에 문단·스크립트가 수만 개 들어 있는 수 MB짜리 페이지를 만든다."""
+    body = "".join(_HUGE_COMPONENT.format(n=n) for n in range(components))
+    html = (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">'
+        "<title>아주 긴 글 : 네이버 블로그</title></head><body>"
+        '<div class="se-title-text"><span>아주 긴 글</span></div>'
+        f'<div class="se-main-container">{body}</div>'
+        "</body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def _fake_value(schema: dict, seed: int):
+    """JSON 스키마에 맞는 값을 만든다. enum은 seed로 골라 카테고리·스타일이 고르게 섞이게 한다."""
+    if "enum" in schema:
+        return schema["enum"][seed % len(schema["enum"])]
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: _fake_value(sub, seed + i)
+            for i, (key, sub) in enumerate(schema.get("properties", {}).items())
+        }
+    if kind == "array" and "enum" in schema.get("items", {}):
+        return [_fake_value(schema["items"], seed + i) for i in range(schema.get("minItems", 3))]
+    if kind == "array":
+        words = ["그리고", "또한", "사실", "결국", "특히", "예를 들어"]
+        return [words[(seed + i) % len(words)] for i in range(3)]
+    if kind in ("number", "integer"):
+        return seed % 10
+    if kind == "boolean":
+        return bool(seed % 2)
+    return "벤치마크"
+
+
+class MockServer:
+    """
+    백그라운드 스레드에서 동작하는 목 서버.
+    blog_latency / llm_latency(초)만큼 응답을 늦춰 네트워크·모델 지연을 흉내 낸다.
+    """
+
+    def __init__(
+        self,
+        blog_latency: float = 0.0,
+        llm_latency: float = 0.05,
+        huge_components: int = 20_000,
+    ):
+        self.blog_latency = blog_latency
+        self.llm_latency = llm_latency
+        self.posts = [(FIXTURES_DIR / name).read_bytes() for name in _POST_FIXTURES]
+        self.huge = huge_page(huge_components)
+        self.generate_calls = 0
+        self._kv_slots: list[bytes] = []
+        self._pending_load_ns = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def post(self, n: int) -> bytes:
+        """n번째 글. 픽스처를 순환하되 첫 문장에 글 번호를 넣어 글마다 본문이 조금씩 다르게 한다."""
+        body = self.posts[n % len(self.posts)]
+        return body.replace("다.".encode(), f"다 ({n}번째 글).".encode(), 1)
+
+    def unload(self) -> None:
+        """모델을 내린 것처럼 KV 캐시를 비우고 다음 응답에 load_duration을 싣는다."""
+        with self._lock:
+            self._kv_slots = []
+            self._pending_load_ns = int(2e9)
+
+    def _generate(self, request: dict) -> dict:
+        """Ollama /api/generate 비스트리밍 응답과 같은 형태의 dict를 만든다."""
+        prompt = request.get("prompt", "")
+        encoded = prompt.encode("utf-8")
+        with self._lock:
+            self.generate_calls += 1
+            cached = max((_common_prefix(encoded, p) for p in self._kv_slots), default=0)
+            self._kv_slots = [encoded] + self._kv_slots[:_KV_SLOTS - 1]
+            load_ns, self._pending_load_ns = self._pending_load_ns, 0
+        prompt_tokens = max(1, len(encoded) // _PROMPT_BYTES_PER_TOKEN)
+        evaluated = max(1, (len(encoded) - cached) // _PROMPT_BYTES_PER_TOKEN)
+
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        schema = request.get("format")
+        if isinstance(schema, dict):
+            response = json.dumps(_fake_value(schema, seed), ensure_ascii=False)
+        else:
+            response = json.dumps({"result": "벤치마크"}, ensure_ascii=False)
+
+        time.sleep(self.llm_latency)
+        latency_ns = int(self.llm_latency * 1e9)
+        return {
+            "model": request.get("model", ""),
+            "response": response,
+            "done": True,
+            "total_duration": latency_ns + load_ns,
+            "load_duration": load_ns,
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": latency_ns // 4 * evaluated // prompt_tokens,
+            "eval_count": len(response) // 4,
+            "eval_duration": latency_ns - latency_ns // 4,
+        }
+
+    def _stream_lines(self, request: dict) -> list[bytes]:
+        """_generate 응답을 Ollama 스트리밍 형식의 NDJSON 줄(토큰 조각 + 통계가 든 마지막 줄)로 나눈다."""
+        final = self._generate(request)
+        response = final.pop("response")
+        lines = [
+            {"model": final["model"], "response": response[i:i + _TOKEN_CHARS], "done": False}
+            for i in range(0, len(response), _TOKEN_CHARS)
+        ]
+        lines.append(final | {"response": "", "done_reason": "stop"})
+        return [json.dumps(line, ensure_ascii=False).encode("utf-8") + b"\n" for line in lines]
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # keep-alive 연결에서 헤더·본문 분할 전송 시 지연(delayed ACK) 방지
+
+            def log_message(self, format, *args) -> None:
+                pass  # 요청마다 stderr에 찍히지 않게 한다
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: dict | None = None) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, lines: list[bytes]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for line in lines:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # 클라이언트가 JSON 완성 후 조기 종료
+
+            def _send_page(self, body: bytes) -> None:
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                time.sleep(server.blog_latency)
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", "text/html; charset=utf-8", {"ETag": etag})
+                    return
+                self._send(200, body, "text/html; charset=utf-8", {"ETag": etag})
+
+            def do_GET(self) -> None:
+                parts = self.path.strip("/").split("/")
+                if self.path == "/robots.txt":
+                    self._send(200, b"User-agent: *\nAllow: /\n", "text/plain")
+                elif len(parts) == 2 and parts[0] == "post" and parts[1].isdigit():
+                    self._send_page(server.post(int(parts[1])))
+                elif len(parts) == 2 and parts[0] == "huge" and parts[1].isdigit():
+                    self._send_page(server.huge)
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def do_POST(self) -> None:
+                if self.path != "/api/generate":
+                    self._send(404, b"not found", "text/plain")
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if request.get("stream", True):
+                    self._send_stream(server._stream_lines(request))
+                    return
+                body = json.dumps(server._generate(request), ensure_ascii=False).encode("utf-8")
+                self._send(200, body, "application/json")
+
+        return Handler
@@ -0,0 +1,59 @@
+"""
+추출 백엔드 결과 비교 스크립트.
+bench/fixtures/html의 모든 HTML을 설치된 백엔드로 추출해 (제목, 본문)이 html.parser 결과와 같은지 확인하고
+소요 시간을 출력한다. bench.run도 벤치마크 전에 같은 확인을 하고,
+auto가 고르는 백엔드(AUTO_BACKENDS)에 불일치가 있으면 종료 코드 1을 반환한다.
+그 밖의 백엔드(selectolax)는 불일치를 보여 주기만 한다 — 모두 없어지면 AUTO_BACKENDS에 넣을 수 있다.
+
+    python -m bench.parser_parity
+"""
+import sys
+import time
+from pathlib import Path
+
+from agents.parser import AUTO_BACKENDS, available_backends, extract
+
+_FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+
+def check_parity() -> list[str]:
+    """
+    모든 픽스처를 설치된 백엔드로 추출하고,
+    auto가 고르는 백엔드 중 html.parser와 결과가 다른 것이 있는 픽스처 이름 목록을 반환한다.
+    """
+    backends = available_backends()
+    print(f"백엔드: {', '.join(backends)} (auto 후보: {', '.join(b for b in backends if b in AUTO_BACKENDS)})\n")
+
+    mismatches = []
+    known = 0
+    for fixture in sorted(_FIXTURES_DIR.glob("*.html")):
+        html = fixture.read_text(encoding="utf-8")
+        results = {}
+        timings = []
+        for backend in backends:
+            start = time.perf_counter()
+            results[backend] = extract(html, backend)
+            timings.append(f"{backend} {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        expected = results["html.parser"]
+        diff = [b for b, r in results.items() if r != expected]
+        if any(b in AUTO_BACKENDS for b in diff):
+            mismatches.append(fixture.name)
+            mark = "MISMATCH " + ", ".join(diff)
+        elif diff:
+            known += 1
+            mark = "diff " + ", ".join(diff) + " (auto 제외)"
+        else:
+            mark = "ok"
+        print(f"  [{mark}] {fixture.name} (본문 {len(expected[1])}자) — {' / '.join(timings)}")
+
+    print(f"\n불일치 {len(mismatches)}건 (auto 제외 백엔드 {known}건)")
+    return mismatches
+
+
+def main() -> None:
+    sys.exit(1 if check_parity() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+learn 파이프라인 오프라인 벤치마크.
+
+실제 블로그와 Ollama 대신 bench/mock_server.py의 로컬 서버를 띄우고, 임시 데이터 디렉터리에서
+crawl → parse → analyze → add_tone_and_manner → generate_style_guides를 단계별로 실행한다.
+단계마다 처리량(items/s), 호출별 p50/p95 지연(ms), 최대 RSS(MB)를 출력한다.
+
+    python -m bench.run                    # 측정 후 기준값(bench/baselines.json)과 비교
+    python -m bench.run --save-baseline    # 측정 결과를 기준값으로 저장
+
+기준값 대비 처리량이 tolerance 이상 줄거나 p95·RSS가 tolerance 이상 늘면 종료 코드 1을 반환한다.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench.mock_server import MockServer
+from utils.metrics import percentile
+
+_BASELINE_FILE = Path(__file__).parent / "baselines.json"
+
+# 지표별 방향: 1이면 클수록 좋고, -1이면 작을수록 좋다
+_METRICS = {"throughput": 1, "p95_ms": -1, "peak_rss_mb": -1}
+
+# 이보다 작은 절대 변화는 측정 잡음으로 보고 회귀로 세지 않는다 (건당 ms / MB)
+_NOISE_FLOOR_MS = 5.0
+_NOISE_FLOOR_MB = 5.0
+
+
+def _current_rss_mb() -> float:
+    """현재 프로세스 RSS(MB). /proc이 없으면 지금까지의 최대 RSS로 대신한다."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+class _RssSampler:
+    """단계 실행 중 RSS를 주기적으로 읽어 최댓값을 기록한다."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _current_rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "_RssSampler":
+        self.peak = _current_rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss_mb())
+
+
+def _run_stage(name: str, inputs: list, fn, items: int | None = None, verbose: bool = False) -> tuple[list, dict]:
+    """
+    inputs의 각 원소로 fn을 호출하며 호출별 시간을 잰다. (결과 목록, 지표 dict)를 반환한다.
+    items를 주면 처리량 계산에 호출 수 대신 사용한다. (예: 스타일 가이드 1회 생성 = 글 N개 처리)
+    """
+    latencies: list[float] = []
+    results = []
+    stdout = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    with _RssSampler() as rss, stdout:
+        start = time.perf_counter()
+        for item in inputs:
+            t = time.perf_counter()
+            results.append(fn(item))
+            latencies.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+
+    count = items if items is not None else len(inputs)
+    metrics = {
+        "count": count,
+        "elapsed_s": round(elapsed, 4),
+        "throughput": round(count / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "peak_rss_mb": round(rss.peak, 1),
+    }
+    print(
+        f"  [{name}] {count}건 {elapsed:.2f}s — {metrics['throughput']:.1f}/s, "
+        f"p50 {metrics['p50_ms']:.1f}ms, p95 {metrics['p95_ms']:.1f}ms, RSS {metrics['peak_rss_mb']:.0f}MB"
+    )
+    return results, metrics
+
+
+def _run_benchmark(args: argparse.Namespace) -> dict:
+    with MockServer(args.blog_latency, args.llm_latency, args.huge_components) as server, \
+            tempfile.TemporaryDirectory(prefix="vibewriter-bench-") as data_dir:
+        # config는 import 시점에 환경 변수를 읽으므로 agents를 import하기 전에 설정한다
+        os.environ["VIBEWRITER_DATA_DIR"] = data_dir
+        os.environ["VIBEWRITER_OLLAMA_BASE_URL"] = server.base_url
+        os.environ["VIBEWRITER_CRAWL_DELAY"] = "0"
+
+        from agents.analysis import add_tone_and_manner, analyze
+        from agents.crawler import crawl
+        from agents.parser import PARSER_BACKEND, _resolve_backend, parse
+        from agents.style_guide import generate_style_guides
+        from bench.parser_parity import check_parity
+
+        print("--- 추출 백엔드 일치 확인 ---")
+        parity_mismatches = check_parity()
+        print()
+
+        urls = [f"{server.base_url}/post/{n}" for n in range(args.posts)]
+        urls += [f"{server.base_url}/huge/{n}" for n in range(args.huge_pages)]
+
+        print(f"글 {args.posts}개 + 대용량 페이지 {args.huge_pages}개 ({len(server.huge) / 1e6:.1f}MB), "
+              f"LLM 지연 {args.llm_latency * 1000:.0f}ms\n")
+
+        stages: dict[str, dict] = {}
+        html_paths, stages["crawl"] = _run_stage("crawl", urls, crawl, verbose=args.verbose)
+
+        crawled = [(url, path) for url, path in zip(urls, html_paths) if path is not None]
+        json_paths, stages["parse"] = _run_stage(
+            "parse", crawled, lambda item: parse(*item), verbose=args.verbose
+        )
+
+        parsed = [path for path in json_paths if path is not None]
+        analysis_paths, stages["analyze"] = _run_stage(
+            "analyze", parsed, analyze, verbose=args.verbose
+        )
+
+        analyzed = [path for path in analysis_paths if path is not None]
+        _, stages["add_tone_and_manner"] = _run_stage(
+            "add_tone_and_manner", analyzed, add_tone_and_manner, verbose=args.verbose
+        )
+
+        _, stages["generate_style_guides"] = _run_stage(
+            "generate_style_guides", [None], lambda _: generate_style_guides(),
+            items=len(analyzed), verbose=args.verbose,
+        )
+
+        return {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "parser_backend": _resolve_backend(PARSER_BACKEND),
+            },
+            "params": {
+                "posts": args.posts,
+                "huge_pages": args.huge_pages,
+                "huge_components": args.huge_components,
+                "llm_latency": args.llm_latency,
+                "blog_latency": args.blog_latency,
+            },
+            "llm_requests": server.generate_calls,
+            "parser_parity_mismatches": parity_mismatches,
+            "stages": stages,
+        }
+
+
+def _compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """기준값 대비 tolerance(비율)를 넘게 나빠진 지표 목록을 반환한다."""
+    if baseline.get("params") != result["params"]:
+        print("  [warn] 기준값과 측정 조건(params)이 다릅니다. 비교 결과를 참고만 하세요.")
+
+    regressions = []
+    for stage, metrics in result["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        for metric, direction in _METRICS.items():
+            old, new = base.get(metric), metrics[metric]
+            if not old:
+                continue
+            if metric == "throughput":
+                delta = abs(1000 / new - 1000 / old) if new else float("inf")  # 건당 ms
+            else:
+                delta = abs(new - old)
+            if delta < (_NOISE_FLOOR_MB if metric == "peak_rss_mb" else _NOISE_FLOOR_MS):
+                continue
+            change = (new - old) / old
+            if change * direction < -tolerance:
+                regressions.append(f"{stage}.{metric}: {old} → {new} ({change:+.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="learn 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--posts", type=int, default=50, help="픽스처 기반 글 수")
+    parser.add_argument("--huge-pages", type=int, default=2, help="수 MB짜리 병적 페이지 수")
+    parser.add_argument("--huge-components", type=int, default=20_000, help="병적 페이지의 문단 수 (크기 조절)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="목 /api/generate 응답 지연(초)")
+    parser.add_argument("--blog-latency", type=float, default=0.0, help="목 블로그 응답 지연(초)")
+    parser.add_argument("--baseline", type=Path, default=_BASELINE_FILE, help="기준값 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="측정 결과를 기준값으로 저장한다")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="회귀로 판단할 변화 비율 (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="측정 결과 JSON을 저장할 경로")
+    parser.add_argument("--verbose", action="store_true", help="각 단계의 콘솔 출력을 그대로 보여준다")
+    args = parser.parse_args()
+
+    result = _run_benchmark(args)
+    if result["parser_parity_mismatches"]:
+        print(f"\n추출 백엔드 결과 불일치: {', '.join(result['parser_parity_mismatches'])}")
+        sys.exit(1)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n기준값 저장: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\n기준값이 없습니다. --save-baseline으로 먼저 저장하세요: {args.baseline}")
+        return
+
+    regressions = _compare(result, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    if regressions:
+        print(f"\n회귀 {len(regressions)}건 (허용 {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  [regression] {line}")
+        sys.exit(1)
+    print(f"\n기준값 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
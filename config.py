@@ -1,34 +1,113 @@
+import os
 from pathlib import Path
 
 # 프로젝트 루트
 BASE_DIR = Path(__file__).parent
 
-# 경로
-DATA_DIR = BASE_DIR / "data"
+# 경로 (VIBEWRITER_DATA_DIR 환경 변수로 데이터 디렉터리를 바꿀 수 있다 — 벤치마크·임시 실행용)
+DATA_DIR = Path(os.environ.get("VIBEWRITER_DATA_DIR", BASE_DIR / "data"))
 INPUT_DIR = DATA_DIR / "input"
 RAW_HTML_DIR = DATA_DIR / "raw_html"
 PARSED_POSTS_DIR = DATA_DIR / "parsed_posts"
 ANALYSIS_DIR = DATA_DIR / "analysis"
 STYLE_GUIDES_DIR = DATA_DIR / "style_guides"
 OUTPUT_DIR = DATA_DIR / "output"
+CACHE_DIR = DATA_DIR / "cache"
+STYLE_GUIDE_STATE_DIR = CACHE_DIR / "style_guides"  # 스타일 가이드 카테고리별 증분 집계 상태
+METRICS_DIR = DATA_DIR / "metrics"  # 실행별 span 리포트 (learn-YYYYmmdd-HHMMSS.jsonl)
+
+# 글·분석 결과 저장소: "files" (parsed_posts/·analysis/에 글별 JSON) / "sqlite" (STORE_DB_FILE 하나)
+STORAGE_BACKEND = "files"
+STORE_DB_FILE = DATA_DIR / "vibewriter.sqlite3"
 
 # 입력 파일
 BLOG_URLS_FILE = INPUT_DIR / "blog_urls.txt"
 
+# 원문 HTML 아카이브 (raw_html/objects/ 본문 해시 기반 압축 객체, raw_html/refs/ slug → 객체)
+# 압축 방식: "gzip" / "zstd" (zstandard 설치 시 — archive train-dict로 학습한 공유 사전 사용)
+RAW_HTML_COMPRESSION = "gzip"
+RAW_HTML_ZSTD_LEVEL = 19
+RAW_HTML_ZSTD_DICT_SIZE = 112 * 1024  # 바이트
+
+# 크롤링 매니페스트 (slug별 ETag·Last-Modified·본문 해시, JSONL 추가 기록)
+CRAWL_MANIFEST_FILE = DATA_DIR / "crawl_manifest.jsonl"
+
+# URL 탐색 (discover): 블로그의 RSS 피드·사이트맵에서 글 URL을 찾아 BLOG_URLS_FILE에 예약한다
+DISCOVERY_FRONTIER_FILE = DATA_DIR / "frontier.jsonl"  # 정규 URL별 lastmod·예약 기록 (JSONL 추가 기록)
+DISCOVERY_MAX_SITEMAPS = 500  # 블로그 하나에서 사이트맵 인덱스를 따라 읽을 최대 사이트맵 수
+
+# 로그 (logs/vibewriter.log): 백그라운드 스레드가 기록하며 크기 기준으로 순환한다
+LOG_FORMAT = os.environ.get("VIBEWRITER_LOG_FORMAT", "text")  # "text" / "json" (한 줄에 JSON 객체 하나)
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 바이트 — 넘으면 vibewriter.log.1, .2 …로 순환
+LOG_BACKUP_COUNT = 5
+
 # LLM
 OLLAMA_MODEL = "llama3.1:8b"
-OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_BASE_URL = os.environ.get("VIBEWRITER_OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_TIMEOUT = 120.0  # 초 — 비스트리밍 요청 전체 대기 시간
+OLLAMA_STREAM = True  # 토큰 스트림(NDJSON)으로 받는다 — 토큰 간 시간 초과·JSON 완성 시 조기 종료 적용
+OLLAMA_FIRST_TOKEN_TIMEOUT = 120.0  # 초 — 모델 로드·프롬프트 처리를 포함한 첫 토큰까지의 대기
+OLLAMA_TOKEN_TIMEOUT = 15.0  # 초 — 토큰 사이 최대 간격
+OLLAMA_MAX_TOKENS = 1024  # 응답 최대 토큰 수 (Ollama num_predict), None이면 제한 없음
+OLLAMA_PREFIX_REUSE = True  # 프롬프트 앞 고정 지시문을 모델 로드당 한 번 평가해 두고 Ollama KV 캐시로 재사용한다
+OLLAMA_KEEP_ALIVE = "30m"  # 마지막 요청 후 모델을 메모리에 유지하는 시간 (Ollama keep_alive)
+
+# Ollama 백엔드 목록: url별 동시 요청 상한 (각 서버의 OLLAMA_NUM_PARALLEL에 맞춘다)
+OLLAMA_BACKENDS = [
+    {"url": OLLAMA_BASE_URL, "max_concurrency": 1},
+]
+OLLAMA_BACKEND_COOLDOWN = 30.0  # 초 — 연결 실패·시간 초과 시 해당 백엔드를 제외하는 시간
+
+# LLM 응답 캐시 (model·프롬프트 템플릿 버전·프롬프트·옵션 해시 기반)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_FILE = CACHE_DIR / "llm_cache.sqlite3"
+LLM_CACHE_MAX_ENTRIES = 50_000
+LLM_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # 초
+
+# 분석 방식: "combined" (카테고리+톤앤매너 LLM 1회 호출) / "split" (카테고리·톤앤매너 각각 호출)
+ANALYSIS_MODE = "combined"
+
+# 톤앤매너 청크 분석: 긴 글은 단락 경계에서 TONE_CHUNK_CHARS자 이하 청크로 나눠 동시에 분석한 뒤 합친다
+# 청크 크기는 프롬프트와 함께 모델 컨텍스트(Ollama 기본 num_ctx)에 들어가는 크기로 잡는다
+TONE_CHUNK_CHARS = 2000
+TONE_MAX_CHUNKS = 4  # 글당 최대 청크 수 — 넘으면 첫·마지막 청크를 포함해 고르게 고른다 (1이면 앞부분만 분석)
 
 # 허용 카테고리 목록
 CATEGORIES = ["tech", "travel", "food", "lifestyle", "review", "etc"]
 
+# 카테고리 사전 분류기: 이전 LLM 분류 결과로 학습한 로컬 나이브 베이즈 모델이 먼저 분류하고,
+# 확신도가 CATEGORY_CONFIDENCE 미만인 글만 LLM에 여러 개씩 묶어 보낸다 (`classify report`로 임계값 조정)
+CATEGORY_CLASSIFIER = True
+CATEGORY_MODEL_FILE = CACHE_DIR / "category_model.json"
+CATEGORY_CONFIDENCE = 0.9
+CATEGORY_MIN_LABELS = 30  # LLM으로 분류한 글이 이 수 이상이어야 로컬 분류기를 사용한다
+# 일괄 분류는 동시에 분석 중인 글끼리 묶으므로 OLLAMA_BACKENDS의 max_concurrency 합이 2 이상일 때만 동작한다
+CATEGORY_BATCH_SIZE = 4  # LLM 일괄 분류 프롬프트 하나에 넣는 글 수 (모델 컨텍스트 안에 들어가는 크기)
+CATEGORY_BATCH_WAIT = 0.05  # 초 — 다른 분석 워커의 글을 묶기 위해 기다리는 최대 시간
+
+# 파서: 본문 추출 백엔드 ("auto" / "selectolax" / "lxml" / "html.parser")
+# auto는 설치된 것 중 lxml → html.parser 순으로 사용한다
+# selectolax는 가장 빠르지만 깨진 HTML(표 안의 단락, head 안의 noscript 등)에서 결과가 달라 직접 지정할 때만 사용한다
+PARSER_BACKEND = "auto"
+
+# 학습 파이프라인 (learn --pipeline)
+PIPELINE_QUEUE_SIZE = 32  # 단계 사이 큐 최대 길이 — 가득 차면 앞 단계가 대기한다 (backpressure)
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 파싱 프로세스 수
+
+# 중복 글 탐지 (parse 후 analyze 전) — 본문 SimHash 해밍 거리가 이 값 이하이면 같은 글로 본다
+DEDUP_MAX_DISTANCE = 3
+DEDUP_INDEX_FILE = CACHE_DIR / "dedup_index.jsonl"
+
 # 스타일 가이드
 VOCAB_TOP_N = 15  # 어휘 상위 N개 추출
 
 # 크롤러
 CRAWL_RETRY = 1
-CRAWL_DELAY = 1.0  # 초
+CRAWL_DELAY = float(os.environ.get("VIBEWRITER_CRAWL_DELAY", 1.0))  # 초 — 같은 호스트 요청 간 최소 간격
 CRAWL_TIMEOUT = 10.0  # 초
+CRAWL_CONCURRENCY = 16  # 비동기 크롤링 시 전체 동시 요청 수 상한
+ROBOTS_CACHE_FILE = CACHE_DIR / "robots.json"
+ROBOTS_CACHE_TTL = 24 * 60 * 60  # 초
 CRAWL_USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
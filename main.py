@@ -1,67 +1,450 @@
+"""
+VibeWriter CLI.
+
+서브커맨드에 필요한 에이전트와 무거운 라이브러리(httpx, bs4 등)는 각 cmd_* 함수 안에서 불러온다.
+`--help`나 인자 오류처럼 아무 작업도 하지 않는 실행은 설정만 읽고 끝난다. (bench/import_budget.py로 확인)
+"""
 import argparse
 import sys
+from datetime import datetime
+
+from config import (
+    ANALYSIS_DIR,
+    ANALYSIS_MODE,
+    BLOG_URLS_FILE,
+    CATEGORY_CLASSIFIER,
+    CATEGORY_CONFIDENCE,
+    CATEGORY_MIN_LABELS,
+    METRICS_DIR,
+    STORE_DB_FILE,
+)
+from utils.file_manager import (
+    STAGE_CRAWLED,
+    STAGE_PARSED,
+    STAGE_TONED,
+    mark_done,
+    mark_failed,
+    mark_stage,
+    progress_summary,
+    read_urls,
+)
+
+
+def _learn_sequential(
+    urls: list[str],
+    concurrent_crawl: bool,
+    analysis_mode: str,
+) -> tuple[int, int, list[float]]:
+    """
+    URL 순서대로 크롤링·파싱하고 분석은 스레드 풀에서 병렬 실행한다.
+    (성공 수, 실패 수, 글별 분석 소요 시간 목록)을 반환한다.
+    """
+    from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+    from agents.analysis import add_tone_and_manner, analyze_post
+    from agents.crawler import crawl, crawl_many, crawl_status
+    from agents.dedup import check_duplicate
+    from agents.parser import parse
+    from utils.llm_dispatcher import total_capacity
+    from utils.logger import get_logger
+    from utils.store import get_store
+
+    logger = get_logger(__name__)
+
+    # 동시 크롤링 모드: 전체 URL을 먼저 병렬로 수집한 뒤 순서대로 후처리한다
+    crawled: dict = {}
+    if concurrent_crawl:
+        print("--- 동시 크롤링 ---")
+        crawled = crawl_many(urls)
+        print()
+
+    success, fail = 0, 0
+    analysis_times: list[float] = []
+
+    # 분석은 Ollama 백엔드 동시 처리량만큼 스레드로 병렬 실행하고,
+    # 그동안 메인 스레드는 다음 URL의 크롤링·파싱을 진행한다
+    workers = total_capacity()
+    pending: dict[Future, str] = {}
+
+    def finish(done: set[Future]) -> None:
+        nonlocal success, fail
+        for future in done:
+            url = pending.pop(future)
+            try:
+                analysis_path, elapsed = future.result()
+            except Exception as e:
+                logger.error("분석 스레드 오류: url=%s, %s", url, e)
+                print(f"  [fail] 분석 중 오류: {e}")
+                analysis_path = None
+            if analysis_path is None:
+                mark_failed(BLOG_URLS_FILE, url, "analyze", "LLM 분석 실패")
+                fail += 1
+                continue
+
+            analysis_times.append(elapsed)
+            mark_stage(BLOG_URLS_FILE, url, STAGE_TONED)
+            mark_done(BLOG_URLS_FILE, url)
+            print(f"  [done] {analysis_path.name} (분석 {elapsed:.1f}s)")
+            success += 1
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, url in enumerate(urls, 1):
+            print(f"[{i}/{len(urls)}] {url}")
+
+            html_path = crawled[url] if concurrent_crawl else crawl(url)
+            if html_path is None:
+                mark_failed(BLOG_URLS_FILE, url, "crawl", "크롤링 실패 또는 robots.txt 차단")
+                fail += 1
+                continue
+            mark_stage(BLOG_URLS_FILE, url, STAGE_CRAWLED)
+
+            # 변경 없는 글(304 또는 본문 해시 동일)은 파싱·분석을 다시 하지 않는다
+            status = crawl_status(url)
+            analysis_path = ANALYSIS_DIR / f"{html_path.stem}.json"
+            if status == "unchanged" and get_store().has_analysis(html_path.stem):
+                print(f"  [skip] 변경 없음: {url}")
+                if not add_tone_and_manner(analysis_path):
+                    mark_failed(BLOG_URLS_FILE, url, "analyze", "톤앤매너 분석 실패")
+                    fail += 1
+                    continue
+                mark_done(BLOG_URLS_FILE, url)
+                success += 1
+                continue
+
+            json_path = parse(url, html_path)
+            if json_path is None:
+                mark_failed(BLOG_URLS_FILE, url, "parse", "본문 추출 실패")
+                fail += 1
+                continue
+            mark_stage(BLOG_URLS_FILE, url, STAGE_PARSED)
 
-from agents.analysis import add_tone_and_manner, analyze
-from agents.crawler import crawl
-from agents.parser import parse
-from agents.style_guide import generate_style_guides
-from config import BLOG_URLS_FILE
-from utils.file_manager import mark_done, read_urls
+            # 이미 분석된 글과 본문이 거의 같으면(교차 게시 등) LLM 분석을 하지 않는다
+            # 원본이 아직 분석 전이거나 실패했으면 check_duplicate가 None을 반환해 이 글을 분석한다
+            duplicate_of = check_duplicate(json_path)
+            if duplicate_of is not None:
+                print(f"  [skip] 중복 글 (원본: {duplicate_of}): {url}")
+                mark_done(BLOG_URLS_FILE, url)
+                success += 1
+                continue
 
+            future = pool.submit(analyze_post, json_path, analysis_mode, status == "modified")
+            pending[future] = url
 
-def cmd_learn() -> None:
-    urls = read_urls(BLOG_URLS_FILE)
+            # 분석 대기 중인 글이 워커 수의 2배를 넘으면 하나가 끝날 때까지 크롤링을 멈춘다
+            if len(pending) >= workers * 2:
+                wait(pending, return_when=FIRST_COMPLETED)
+            finish({f for f in pending if f.done()})
+
+        finish(set(wait(pending).done))
+
+    return success, fail, analysis_times
+
+
+def _dedupe_urls(urls: list[str]) -> list[str]:
+    """같은 글을 가리키는 URL이 여러 개면 첫 URL만 남기고 나머지는 완료 처리한다."""
+    from utils.urls import canonical_url
+
+    seen: dict[str, str] = {}
+    unique = []
+    for url in urls:
+        key = canonical_url(url)
+        if key in seen:
+            print(f"  [skip] 같은 글의 다른 URL: {url} → {seen[key]}")
+            mark_done(BLOG_URLS_FILE, url)
+            continue
+        seen[key] = url
+        unique.append(url)
+    return unique
+
+
+def cmd_learn(
+    concurrent_crawl: bool = False,
+    refresh: bool = False,
+    analysis_mode: str = ANALYSIS_MODE,
+    pipeline: bool = False,
+    metrics_port: int | None = None,
+    full_style_guides: bool = False,
+) -> None:
+    from agents.classifier import update as update_classifier
+    from agents.style_guide import generate_style_guides
+    from pipelines.learn_pipeline import run_learn_pipeline
+    from utils.metrics import format_summary, serve_prometheus, start_run, summarize
+    from utils.ollama_client import get_stats
+
+    urls = _dedupe_urls(read_urls(BLOG_URLS_FILE, include_done=refresh))
 
     if not urls:
         print("처리할 URL이 없습니다. data/input/blog_urls.txt 파일에 URL을 추가하세요.")
         return
 
+    report = start_run(METRICS_DIR / f"learn-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+    if metrics_port:
+        serve_prometheus(metrics_port)
+        print(f"메트릭: http://127.0.0.1:{metrics_port}/metrics")
+
     print(f"총 {len(urls)}개 URL 처리 시작\n")
 
-    success, fail = 0, 0
+    if pipeline:
+        success, fail, analysis_times = run_learn_pipeline(urls, analysis_mode)
+    else:
+        success, fail, analysis_times = _learn_sequential(urls, concurrent_crawl, analysis_mode)
 
-    for i, url in enumerate(urls, 1):
-        print(f"[{i}/{len(urls)}] {url}")
+    print(f"\n완료: {success}개 성공 / {fail}개 실패")
 
-        html_path = crawl(url)
-        if html_path is None:
-            fail += 1
-            continue
+    summary = progress_summary(BLOG_URLS_FILE)
+    print("진행 상황: " + ", ".join(f"{stage} {count}개" for stage, count in sorted(summary.items())))
 
-        json_path = parse(url, html_path)
-        if json_path is None:
-            fail += 1
-            continue
+    if analysis_times:
+        avg = sum(analysis_times) / len(analysis_times)
+        print(f"분석({analysis_mode}) 글당 평균 {avg:.1f}s (최대 {max(analysis_times):.1f}s, {len(analysis_times)}개)")
 
-        analysis_path = analyze(json_path)
-        if analysis_path is None:
-            fail += 1
-            continue
+    llm = get_stats()
+    if llm["calls"] or llm["cache_hits"]:
+        print(
+            f"LLM {llm['calls']:.0f}회 호출: "
+            f"load {llm['load_duration']:.1f}s / "
+            f"prompt_eval {llm['prompt_eval_duration']:.1f}s ({llm['prompt_eval_count']:.0f} tok) / "
+            f"eval {llm['eval_duration']:.1f}s ({llm['eval_count']:.0f} tok) / "
+            f"캐시 적중 {llm['cache_hits']}회"
+        )
+    if llm["prefix_hits"] or llm["prefix_misses"]:
+        print(
+            f"고정 지시문 재사용 {llm['prefix_hits']:.0f}/{llm['prefix_hits'] + llm['prefix_misses']:.0f}회 "
+            f"(미리 평가 {llm['prefix_primes']:.0f}회): "
+            f"prompt_eval 약 {llm['prefix_saved_duration']:.1f}s ({llm['prefix_saved_tokens']:.0f} tok) 절약"
+        )
 
-        if not add_tone_and_manner(analysis_path):
-            fail += 1
-            continue
+    if CATEGORY_CLASSIFIER and success:
+        added, labels = update_classifier()
+        print(f"카테고리 분류기 갱신: 새 LLM 라벨 {added}개 추가 (전체 {labels}개)")
 
-        mark_done(BLOG_URLS_FILE, url)
-        print(f"  [done] {json_path.name}")
-        success += 1
+    print("\n--- 스타일 가이드 생성 ---")
+    generate_style_guides(full=full_style_guides)
 
-    print(f"\n완료: {success}개 성공 / {fail}개 실패")
+    summary = summarize()
+    if summary:
+        print("\n--- 단계별 실행 시간 ---")
+        print(format_summary(summary))
+        print(f"리포트: {report}")
+
+
+def cmd_store(action: str) -> None:
+    from utils.store import export_files, import_files
+
+    if action == "import":
+        posts, analyses = import_files()
+        print(f"파일 → SQLite 가져오기 완료: 글 {posts}개, 분석 {analyses}개 ({STORE_DB_FILE})")
+    else:
+        posts, analyses = export_files()
+        print(f"SQLite → 파일 내보내기 완료: 글 {posts}개, 분석 {analyses}개")
 
+
+def cmd_stylometry(force: bool = False) -> None:
+    from agents.style_guide import generate_style_guides
+    from agents.stylometry import backfill as backfill_stylometry
+
+    updated = backfill_stylometry(force=force)
+    print(f"문체 지표 계산 완료: {updated}개 글")
     print("\n--- 스타일 가이드 생성 ---")
     generate_style_guides()
 
 
+def cmd_classify(action: str) -> None:
+    from agents.classifier import agreement_report
+    from agents.classifier import train as train_classifier
+
+    if action == "train":
+        labels = train_classifier()
+        state = "사용" if labels >= CATEGORY_MIN_LABELS else f"미사용 ({CATEGORY_MIN_LABELS}개 이상 필요)"
+        print(f"카테고리 분류기 학습 완료: LLM 라벨 {labels}개, 로컬 분류 {state}")
+        return
+
+    report = agreement_report()
+    if not report["labels"]:
+        print("LLM으로 분류한 글이 없습니다. learn을 먼저 실행하세요.")
+        return
+    print(f"LLM 라벨 {report['labels']}개 교차 검증 (로컬 분류 / 나머지는 LLM)\n")
+    print("  임계값  로컬 비율  로컬 일치율  전체 일치율")
+    for row in report["thresholds"]:
+        local = f"{row['local_agreement']:.1%}" if row["local_agreement"] is not None else "-"
+        current = "  ← CATEGORY_CONFIDENCE" if row["threshold"] == CATEGORY_CONFIDENCE else ""
+        print(
+            f"  {row['threshold']:>6.2f}  {row['coverage']:>9.1%}  {local:>11}  "
+            f"{row['overall_agreement']:>11.1%}{current}"
+        )
+    print("\n카테고리별 로컬 분류 일치율 (임계값 없음)")
+    for category, row in report["categories"].items():
+        print(f"  {category}: {row['agreement']:.1%} ({row['labels']}개)")
+
+
+def cmd_discover(targets: list[str], limit: int | None = None, full: bool = False) -> None:
+    from agents.discovery import discover
+
+    new = changed = 0
+    for target in targets:
+        result = discover(target, limit=limit, full=full)
+        skipped = f", 변경 없어 건너뜀 {result['skipped_sitemaps']}개" if result["skipped_sitemaps"] else ""
+        print(
+            f"  [discover] {target}: 피드 {result['feeds']}개·사이트맵 {result['sitemaps']}개{skipped}에서 "
+            f"글 {result['found']}개 → 새 글 {result['new']}개, 수정된 글 {result['changed']}개 예약"
+        )
+        new += result["new"]
+        changed += result["changed"]
+        if limit is not None:
+            limit = max(0, limit - result["new"] - result["changed"])
+
+    print(f"\n{BLOG_URLS_FILE}: 새 글 {new}개 추가, 수정된 글 {changed}개 재처리 예약")
+    if new or changed:
+        print("learn을 실행하면 예약한 글을 수집합니다.")
+
+
+def cmd_archive(action: str) -> None:
+    from utils.html_archive import (
+        archive_stats,
+        pack_legacy,
+        recompress,
+        remove_unreferenced,
+        train_dictionary,
+    )
+
+    if action == "pack":
+        moved = pack_legacy()
+        converted = recompress()
+        print(f"원문 HTML 압축: 이전 파일 {moved}개 이전, 객체 {converted}개 재압축")
+    elif action == "train-dict":
+        try:
+            dict_id = train_dictionary()
+        except RuntimeError as e:
+            print(f"  [fail] {e}")
+            sys.exit(1)
+        converted = recompress()
+        print(f"zstd 사전 학습 완료: dict_id={dict_id}, 객체 {converted}개 재압축")
+    else:
+        count, size = remove_unreferenced()
+        print(f"참조되지 않는 객체 {count}개 삭제 ({size / 1e6:.1f}MB)")
+
+    stats = archive_stats()
+    print(f"아카이브: 글 {stats['refs']}개, 객체 {stats['objects']}개, {stats['bytes'] / 1e6:.1f}MB")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(prog="vibewriter")
     subparsers = parser.add_subparsers(dest="command")
 
-    subparsers.add_parser("learn", help="블로그 URL을 학습해 스타일 가이드를 생성한다")
+    learn_parser = subparsers.add_parser("learn", help="블로그 URL을 학습해 스타일 가이드를 생성한다")
+    learn_parser.add_argument(
+        "--concurrent-crawl",
+        action="store_true",
+        help="asyncio로 여러 URL을 동시에 크롤링한다 (호스트별 CRAWL_DELAY 유지)",
+    )
+    learn_parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="크롤링·파싱·분석을 단계별 워커와 큐로 동시에 진행한다",
+    )
+    learn_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="완료 처리된 URL도 다시 확인한다 (변경된 글만 재분석)",
+    )
+    learn_parser.add_argument(
+        "--analysis-mode",
+        choices=["combined", "split"],
+        default=ANALYSIS_MODE,
+        help="combined: 카테고리+톤앤매너 LLM 1회 호출 / split: 각각 호출 (비교용)",
+    )
+    learn_parser.add_argument(
+        "--full-style-guides",
+        action="store_true",
+        help="스타일 가이드를 증분 갱신하지 않고 모든 분석 결과로 다시 만든다 (검증용)",
+    )
+    learn_parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="지정한 포트에서 Prometheus 텍스트 형식 메트릭(/metrics)을 제공한다",
+    )
+
+    store_parser = subparsers.add_parser(
+        "store", help="파일 레이아웃(parsed_posts/, analysis/)과 SQLite 저장소 사이에서 데이터를 옮긴다"
+    )
+    store_parser.add_argument(
+        "action",
+        choices=["import", "export"],
+        help="import: 파일 → SQLite / export: SQLite → 파일",
+    )
+
+    stylometry_parser = subparsers.add_parser(
+        "stylometry", help="분석된 글의 문체 지표(문장 길이·단락·경어 비율·접속 표현)를 LLM 없이 다시 계산한다"
+    )
+    stylometry_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="현재 버전의 지표가 이미 있는 글도 다시 계산한다",
+    )
+
+    classify_parser = subparsers.add_parser(
+        "classify", help="카테고리 사전 분류기(로컬 나이브 베이즈)를 학습하거나 LLM 분류와의 일치율을 확인한다"
+    )
+    classify_parser.add_argument(
+        "action",
+        choices=["train", "report"],
+        help=(
+            "train: LLM으로 분류한 글로 분류기를 다시 학습한다 / "
+            "report: 교차 검증으로 임계값별 로컬 분류 비율과 LLM 분류 일치율을 보여 준다 (LLM 호출 없음)"
+        ),
+    )
+
+    discover_parser = subparsers.add_parser(
+        "discover", help="블로그의 RSS 피드·사이트맵에서 글 URL을 찾아 blog_urls.txt에 예약한다"
+    )
+    discover_parser.add_argument(
+        "targets",
+        nargs="+",
+        help="네이버 blogId 또는 blog.naver.com/{blogId}, 티스토리 도메인, 블로그 루트 URL",
+    )
+    discover_parser.add_argument(
+        "--limit",
+        type=int,
+        help="이번에 예약할 최대 글 수 (lastmod 최신순, 나머지는 다음 실행에서 예약)",
+    )
+    discover_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="사이트맵 인덱스의 lastmod가 지난번과 같은 하위 사이트맵도 다시 읽는다",
+    )
+
+    archive_parser = subparsers.add_parser("archive", help="원문 HTML 압축 아카이브(raw_html/)를 관리한다")
+    archive_parser.add_argument(
+        "action",
+        choices=["pack", "train-dict", "gc"],
+        help=(
+            "pack: 이전 비압축 파일을 압축 객체로 옮기고 현재 압축 설정으로 맞춘다 / "
+            "train-dict: 저장된 HTML로 zstd 공유 사전을 학습해 다시 압축한다 / "
+            "gc: 어떤 글도 가리키지 않는 객체를 지운다"
+        ),
+    )
 
     args = parser.parse_args()
 
     if args.command == "learn":
-        cmd_learn()
+        cmd_learn(
+            concurrent_crawl=args.concurrent_crawl,
+            refresh=args.refresh,
+            analysis_mode=args.analysis_mode,
+            pipeline=args.pipeline,
+            metrics_port=args.metrics_port,
+            full_style_guides=args.full_style_guides,
+        )
+    elif args.command == "store":
+        cmd_store(args.action)
+    elif args.command == "stylometry":
+        cmd_stylometry(force=args.force)
+    elif args.command == "classify":
+        cmd_classify(args.action)
+    elif args.command == "discover":
+        cmd_discover(args.targets, limit=args.limit, full=args.full)
+    elif args.command == "archive":
+        cmd_archive(args.action)
     else:
         parser.print_help()
         sys.exit(1)
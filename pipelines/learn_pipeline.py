@@ -0,0 +1,185 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from agents.analysis import add_tone_and_manner, analyze_post
+from agents.crawler import HostPacer, crawl_async, crawl_status, new_async_client
+from agents.dedup import check_duplicate
+from agents.parser import parse
+from config import (
+    ANALYSIS_DIR,
+    BLOG_URLS_FILE,
+    CRAWL_CONCURRENCY,
+    PARSE_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+)
+from utils.file_manager import (
+    STAGE_CRAWLED,
+    STAGE_PARSED,
+    STAGE_TONED,
+    mark_done,
+    mark_failed,
+    mark_stage,
+)
+from utils.llm_dispatcher import total_capacity
+from utils.logger import get_logger, init_worker_logging, worker_log_queue
+from utils.store import get_store
+
+logger = get_logger(__name__)
+
+
+class _LearnPipeline:
+    """
+    crawl → parse(+중복 탐지) → analyze 단계를 각각의 워커 그룹으로 실행하고 크기 제한 큐로 연결한다.
+
+    - crawl: asyncio 워커 CRAWL_CONCURRENCY개 (공유 AsyncClient, 호스트별 간격 유지)
+    - parse: ProcessPoolExecutor 워커 PARSE_WORKERS개 (CPU 작업)
+    - analyze: 스레드 워커 total_capacity()개 (Ollama 백엔드 동시 처리량)
+
+    큐가 가득 차면 앞 단계가 멈추므로 처리 속도는 가장 느린 단계에 맞춰지고 메모리 사용량은 일정하다.
+    진행 저널 기록(mark_stage/mark_done)은 이벤트 루프 스레드에서만 하며,
+    mark_done은 한 URL이 모든 단계를 마친 뒤에만 호출한다.
+    """
+
+    def __init__(self, urls: list[str], analysis_mode: str):
+        self.urls = urls
+        self.analysis_mode = analysis_mode
+        self.url_queue: asyncio.Queue = asyncio.Queue()
+        self.parse_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.analysis_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.success = 0
+        self.fail = 0
+        self.analysis_times: list[float] = []
+
+    async def _crawl_worker(self, client, pacer: HostPacer) -> None:
+        while (url := await self.url_queue.get()) is not None:
+            html_path = await crawl_async(client, pacer, url)
+            if html_path is None:
+                mark_failed(BLOG_URLS_FILE, url, "crawl", "크롤링 실패 또는 robots.txt 차단")
+                self.fail += 1
+                continue
+            mark_stage(BLOG_URLS_FILE, url, STAGE_CRAWLED)
+            await self.parse_queue.put((url, html_path, crawl_status(url)))
+
+    async def _parse_worker(self, pool: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await self.parse_queue.get()) is not None:
+            url, html_path, status = item
+
+            # 변경 없는 글(304 또는 본문 해시 동일)은 파싱·분석을 다시 하지 않는다
+            analysis_path = ANALYSIS_DIR / f"{html_path.stem}.json"
+            if status == "unchanged" and get_store().has_analysis(html_path.stem):
+                print(f"  [skip] 변경 없음: {url}")
+                await self.analysis_queue.put((url, analysis_path, status))
+                continue
+
+            try:
+                json_path = await loop.run_in_executor(pool, parse, url, html_path)
+            except Exception as e:
+                logger.error("파싱 워커 오류: url=%s, %s", url, e)
+                json_path = None
+            if json_path is None:
+                mark_failed(BLOG_URLS_FILE, url, "parse", "본문 추출 실패")
+                self.fail += 1
+                continue
+            mark_stage(BLOG_URLS_FILE, url, STAGE_PARSED)
+
+            # 이미 분석된 글과 본문이 거의 같으면(교차 게시 등) LLM 분석을 하지 않는다
+            # 원본이 아직 분석 전이거나 실패했으면 check_duplicate가 None을 반환해 이 글을 분석한다
+            duplicate_of = await asyncio.to_thread(check_duplicate, json_path)
+            if duplicate_of is not None:
+                print(f"  [skip] 중복 글 (원본: {duplicate_of}): {url}")
+                mark_done(BLOG_URLS_FILE, url)
+                self.success += 1
+                continue
+            await self.analysis_queue.put((url, json_path, status))
+
+    async def _analysis_worker(self, pool: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await self.analysis_queue.get()) is not None:
+            # 변경 없는 글은 path가 기존 analysis 파일, 그 외에는 parsed_posts 파일이다
+            url, path, status = item
+
+            try:
+                if status == "unchanged":
+                    ok = await loop.run_in_executor(pool, add_tone_and_manner, path)
+                    elapsed = None
+                else:
+                    analysis_path, elapsed = await loop.run_in_executor(
+                        pool, analyze_post, path, self.analysis_mode, status == "modified"
+                    )
+                    ok = analysis_path is not None
+            except Exception as e:
+                # 한 글의 예외가 워커를 멈추고 gather로 전체 실행을 중단시키지 않도록 실패로 기록한다
+                logger.error("분석 워커 오류: url=%s, %s", url, e)
+                print(f"  [fail] 분석 중 오류: {e}")
+                ok = False
+
+            if not ok:
+                mark_failed(BLOG_URLS_FILE, url, "analyze", "LLM 분석 실패")
+                self.fail += 1
+                continue
+
+            mark_stage(BLOG_URLS_FILE, url, STAGE_TONED)
+            mark_done(BLOG_URLS_FILE, url)
+            if elapsed is not None:
+                self.analysis_times.append(elapsed)
+                print(f"  [done] {analysis_path.name} (분석 {elapsed:.1f}s)")
+            self.success += 1
+
+    async def run(self) -> None:
+        for url in self.urls:
+            self.url_queue.put_nowait(url)
+
+        analysis_workers = total_capacity()
+        pacer = HostPacer(CRAWL_CONCURRENCY)
+        # fork는 이미 실행 중인 스레드(httpx, asyncio)의 락 상태를 복제하므로 spawn을 사용한다
+        # 파싱 워커의 로그는 프로세스 간 큐로 받아 이 프로세스의 리스너가 같은 로그 파일에 쓴다
+        parse_pool = ProcessPoolExecutor(
+            PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_logging,
+            initargs=(worker_log_queue(),),
+        )
+        analysis_pool = ThreadPoolExecutor(analysis_workers)
+
+        try:
+            async with new_async_client(CRAWL_CONCURRENCY) as client:
+                crawlers = [
+                    asyncio.create_task(self._crawl_worker(client, pacer))
+                    for _ in range(CRAWL_CONCURRENCY)
+                ]
+                parsers = [
+                    asyncio.create_task(self._parse_worker(parse_pool))
+                    for _ in range(PARSE_WORKERS)
+                ]
+                analyzers = [
+                    asyncio.create_task(self._analysis_worker(analysis_pool))
+                    for _ in range(analysis_workers)
+                ]
+
+                # 앞 단계가 모두 끝나면 다음 단계 워커 수만큼 종료 신호(None)를 보낸다
+                for _ in crawlers:
+                    self.url_queue.put_nowait(None)
+                await asyncio.gather(*crawlers)
+
+            for _ in parsers:
+                await self.parse_queue.put(None)
+            await asyncio.gather(*parsers)
+
+            for _ in analyzers:
+                await self.analysis_queue.put(None)
+            await asyncio.gather(*analyzers)
+        finally:
+            parse_pool.shutdown(cancel_futures=True)
+            analysis_pool.shutdown(cancel_futures=True)
+
+
+def run_learn_pipeline(urls: list[str], analysis_mode: str) -> tuple[int, int, list[float]]:
+    """
+    크롤링·파싱·분석을 단계별 워커로 동시에 진행한다.
+    (성공 수, 실패 수, 글별 분석 소요 시간 목록)을 반환한다.
+    """
+    pipeline = _LearnPipeline(urls, analysis_mode)
+    asyncio.run(pipeline.run())
+    return pipeline.success, pipeline.fail, pipeline.analysis_times
@@ -1,30 +1,257 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # fcntl이 없는 플랫폼: 프로세스 간 잠금 없이 기록하고 압축하지 않는다
+    fcntl = None
 
-def read_urls(path: Path) -> list[str]:
-    """urls 파일에서 미처리 URL 목록을 반환한다. (# done, # 주석 라인 제외)"""
+_DONE_PREFIX = "# done "
+
+# 진행 상황 저널의 단계 값
+STAGE_CRAWLED = "crawled"
+STAGE_PARSED = "parsed"
+STAGE_TONED = "toned"  # 카테고리 + 톤앤매너 분석 완료
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+STAGE_QUEUED = "queued"  # 완료된 URL을 다시 처리하도록 예약 (discover가 글 수정을 감지했을 때)
+
+# 저널 경로별 {url: 마지막 기록} 인덱스
+_indexes: dict[Path, dict[str, dict]] = {}
+# 저널 경로별 urls 파일 위치 기록: {"cursor": 바이트 오프셋, "before": 오프셋 바로 앞 줄, "at"}
+# 오프셋 앞의 줄은 모두 완료(또는 주석)라서 read_urls가 그 위치부터 읽는다
+_cursors: dict[Path, dict | None] = {}
+_lock = threading.Lock()
+
+
+def _journal_path(path: Path) -> Path:
+    """URL 목록 파일에 대응하는 진행 상황 저널 경로를 반환한다. (blog_urls.txt → blog_urls.progress.jsonl)"""
+    return path.with_name(f"{path.stem}.progress.jsonl")
+
+
+def _read_journal(journal: Path) -> tuple[dict[str, dict], dict | None, int]:
+    """저널을 읽어 (URL별 마지막 기록, 마지막 위치 기록, 줄 수)를 반환한다."""
+    index = {}
+    cursor = None
+    lines = 0
+    if journal.exists():
+        with journal.open(encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 중단된 마지막 줄
+                if "cursor" in record:
+                    cursor = record
+                else:
+                    index[record["url"]] = record
+    return index, cursor, lines
+
+
+@contextmanager
+def _journal_lock(journal: Path, exclusive: bool):
+    """
+    저널의 프로세스 간 잠금(journal.lock 파일에 flock)을 잡는다.
+    추가 기록은 공유 잠금, 압축(저널 교체)은 배타 잠금을 사용해 압축 도중 다른 프로세스의 기록이 사라지지 않게 한다.
+    """
+    if fcntl is None:
+        yield
+        return
+    journal.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(journal.with_suffix(".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)  # 닫으면 잠금도 풀린다
+
+
+def _compact(journal: Path) -> tuple[dict[str, dict], dict | None]:
+    """
+    배타 잠금을 잡고 저널을 다시 읽어 최신 기록만 남긴 저널로 교체하고, (인덱스, 위치 기록)을 반환한다.
+    잠금을 기다리는 동안 다른 프로세스가 추가한 기록도 포함된다.
+    """
+    with _journal_lock(journal, exclusive=True):
+        index, cursor, _ = _read_journal(journal)
+        records = [*index.values(), cursor] if cursor else index.values()
+        tmp_path = journal.with_suffix(".tmp")
+        tmp_path.write_text(
+            "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records),
+            encoding="utf-8",
+        )
+        tmp_path.replace(journal)
+    return index, cursor
+
+
+def _load_index(path: Path) -> dict[str, dict]:
+    """
+    저널을 한 번 읽어 URL별 마지막 기록 인덱스와 위치 기록을 만든다. 호출 측에서 _lock을 잡고 있어야 한다.
+    중복 기록이 많이 쌓였으면 최신 기록만 남겨 저널을 다시 쓴다. (프로세스 간 잠금을 쓸 수 있을 때만)
+    """
+    journal = _journal_path(path)
+    index = _indexes.get(journal)
+    if index is not None:
+        return index
+
+    index, cursor, lines = _read_journal(journal)
+    if fcntl is not None and lines > 2 * len(index) + 100:
+        index, cursor = _compact(journal)
+
+    _indexes[journal] = index
+    _cursors[journal] = cursor
+    return index
+
+
+def _write_line(journal: Path, record: dict) -> None:
+    """
+    저널에 한 줄을 추가한다. 호출 측에서 _lock을 잡고 있어야 한다.
+    O_APPEND로 한 번에 쓰므로 여러 스레드·프로세스가 동시에 기록해도 줄이 섞이지 않는다.
+    기록하는 동안 공유 잠금을 잡아 다른 프로세스의 압축과 겹치지 않게 한다.
+    """
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    journal.parent.mkdir(parents=True, exist_ok=True)
+    with _journal_lock(journal, exclusive=False):
+        fd = os.open(journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def _set_cursor(journal: Path, offset: int, before: str) -> None:
+    """urls 파일 위치 기록을 저널에 추가한다. 호출 측에서 _lock을 잡고 있어야 한다."""
+    cursor = {"cursor": offset, "before": before, "at": datetime.now(timezone.utc).isoformat()}
+    _write_line(journal, cursor)
+    _cursors[journal] = cursor
+
+
+def _append(path: Path, record: dict) -> None:
+    """
+    저널에 한 줄을 추가하고 인덱스를 갱신한다.
+    완료된 URL이 다시 처리 대상이 되면(queued, --refresh 재처리) 그 URL이 위치 기록 앞에 있을 수 있으므로
+    위치 기록을 파일 처음으로 되돌린다.
+    """
+    journal = _journal_path(path)
+
+    with _lock:
+        index = _load_index(path)
+        _write_line(journal, record)
+        previous = index.get(record["url"])
+        index[record["url"]] = record
+        cursor = _cursors.get(journal)
+        requeued = previous and previous["stage"] == STAGE_DONE and record["stage"] != STAGE_DONE
+        if requeued and cursor and cursor["cursor"]:
+            _set_cursor(journal, 0, "")
+
+
+def _cursor_offset(path: Path, cursor: dict | None) -> int:
+    """
+    위치 기록이 지금 urls 파일에도 맞으면 그 오프셋을, 아니면 0을 반환한다.
+    오프셋 바로 앞 줄이 기록과 같은지만 확인한다. (append_urls처럼 끝에 추가하는 것은 그대로 유효하다)
+    """
+    if not cursor or not cursor["cursor"]:
+        return 0
+    offset = cursor["cursor"]
+    before = cursor["before"].encode("utf-8")
+    try:
+        with path.open("rb") as f:
+            f.seek(max(0, offset - len(before)))
+            if offset >= len(before) and f.read(len(before)) == before:
+                return offset
+    except OSError:
+        pass
+    return 0
+
+
+def read_urls(path: Path, include_done: bool = False) -> list[str]:
+    """
+    urls 파일에서 미처리 URL 목록을 반환한다. (# 주석 라인, 진행 저널에서 done인 URL 제외)
+    진행 저널의 위치 기록(앞줄이 모두 완료된 바이트 오프셋)부터 읽으므로,
+    재개 비용은 파일 전체가 아니라 첫 미처리 URL(실패한 URL 포함) 이후의 줄 수에 비례한다.
+    include_done=True이면 완료된 URL도 포함해 파일 전체를 읽는다. (재크롤링용)
+    이전 방식의 '# done' 접두어 라인도 완료로 취급한다.
+    """
     if not path.exists():
         return []
 
-    urls = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        urls.append(line)
+    # 읽는 동안 다른 스레드가 완료된 URL을 다시 예약해 위치 기록을 되돌리지 않도록 잠금을 유지한다
+    journal = _journal_path(path)
+    with _lock:
+        index = _load_index(path)
+        start = 0 if include_done else _cursor_offset(path, _cursors.get(journal))
+        with path.open("rb") as f:
+            f.seek(start)
+            data = f.read()
+
+        urls = []
+        offset, passed, before = start, start, None
+        for raw in data.splitlines(keepends=True):
+            offset += len(raw)
+            line = raw.decode("utf-8").strip()
+            if include_done and line.startswith(_DONE_PREFIX):
+                line = line[len(_DONE_PREFIX):].strip()
+            if line and not line.startswith("#") and (include_done or index.get(line, {}).get("stage") != STAGE_DONE):
+                urls.append(line)
+            elif not urls and raw.endswith(b"\n"):
+                # 첫 미처리 URL 전까지 완료·주석 줄만 이어지면 위치 기록을 그 뒤로 옮길 수 있다
+                passed, before = offset, raw.decode("utf-8")
+
+        if not include_done and before is not None and passed > start:
+            _set_cursor(journal, passed, before)
     return urls
 
 
+def mark_stage(path: Path, url: str, stage: str) -> None:
+    """URL의 처리 단계(crawled / parsed / toned / done / queued)를 진행 저널에 기록한다."""
+    _append(path, {
+        "url": url,
+        "stage": stage,
+        "at": datetime.now(timezone.utc).isoformat(),
+    })
+
+
+def mark_failed(path: Path, url: str, stage: str, reason: str) -> None:
+    """URL이 stage 단계에서 실패했음을 사유와 함께 진행 저널에 기록한다."""
+    _append(path, {
+        "url": url,
+        "stage": STAGE_FAILED,
+        "failed_stage": stage,
+        "reason": reason,
+        "at": datetime.now(timezone.utc).isoformat(),
+    })
+
+
 def mark_done(path: Path, url: str) -> None:
-    """처리 완료된 URL 앞에 '# done ' 접두어를 추가한다."""
-    text = path.read_text(encoding="utf-8")
-    lines = text.splitlines(keepends=True)
-
-    updated = []
-    for line in lines:
-        if line.strip() == url:
-            updated.append(f"# done {line.lstrip()}")
-        else:
-            updated.append(line)
-
-    path.write_text("".join(updated), encoding="utf-8")
+    """처리 완료된 URL을 진행 저널에 기록한다. (urls 파일은 다시 쓰지 않는다)"""
+    mark_stage(path, url, STAGE_DONE)
+
+
+def append_urls(path: Path, urls: list[str]) -> int:
+    """urls 파일에 아직 없는 URL을 주어진 순서대로 끝에 추가하고, 추가한 수를 반환한다."""
+    existing = set(read_urls(path, include_done=True))
+    new_urls = [url for url in dict.fromkeys(urls) if url not in existing]
+    if not new_urls:
+        return 0
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = path.read_text(encoding="utf-8") if path.exists() else ""
+    with path.open("a", encoding="utf-8") as f:
+        if text and not text.endswith("\n"):
+            f.write("\n")
+        f.write("".join(url + "\n" for url in new_urls))
+    return len(new_urls)
+
+
+def progress_summary(path: Path) -> dict[str, int]:
+    """진행 저널 기준 URL별 마지막 단계의 개수를 반환한다."""
+    with _lock:
+        index = _load_index(path)
+    summary: dict[str, int] = {}
+    for record in index.values():
+        summary[record["stage"]] = summary.get(record["stage"], 0) + 1
+    return summary
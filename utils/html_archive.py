@@ -0,0 +1,304 @@
+"""
+원문 HTML 아카이브. 본문 바이트의 SHA-256을 이름으로 하는 압축 객체(content-addressed)로 저장한다.
+
+    raw_html/objects/ab/abcdef....html.gz    RAW_HTML_COMPRESSION = "gzip"
+    raw_html/objects/ab/abcdef....html.zst   RAW_HTML_COMPRESSION = "zstd" (zstandard 설치 시)
+    raw_html/refs/{slug}                     slug → 객체 ID (한 줄)
+
+URL 형태가 달라도(모바일·PC, 쿼리스트링 차이) 본문이 같으면 객체는 하나만 저장된다.
+zstd는 말뭉치로 학습한 공유 사전(raw_html/dicts/{dict_id}.zdict)을 사용할 수 있다.
+프레임에 사전 ID가 기록되므로 사전을 다시 학습해도 이전 객체를 그대로 읽을 수 있다.
+이전 레이아웃(raw_html/{slug}.html, 비압축)도 읽을 수 있으며 pack_legacy()로 옮긴다.
+"""
+import functools
+import gzip
+import hashlib
+import os
+import random
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from config import RAW_HTML_COMPRESSION, RAW_HTML_DIR, RAW_HTML_ZSTD_DICT_SIZE, RAW_HTML_ZSTD_LEVEL
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+OBJECTS_DIR = RAW_HTML_DIR / "objects"
+REFS_DIR = RAW_HTML_DIR / "refs"
+DICTS_DIR = RAW_HTML_DIR / "dicts"
+_CURRENT_DICT_FILE = DICTS_DIR / "current"
+
+_SUFFIXES = {"gzip": ".html.gz", "zstd": ".html.zst"}
+_GZIP_LEVEL = 6
+
+# 아카이브 읽기에서 발생할 수 있는 예외 (파일 I/O, 잘린 gzip, zstd 프레임 오류)
+ARCHIVE_ERRORS = (OSError, EOFError) + ((zstandard.ZstdError,) if zstandard else ())
+
+# 사전 학습에 쓰는 샘플 수와 샘플당 최대 크기 — 상용구는 문서 앞뒤에 몰려 있어 앞부분만으로 충분하다
+_DICT_SAMPLES = 2000
+_DICT_SAMPLE_BYTES = 128 * 1024
+
+_dicts: dict[int, "zstandard.ZstdCompressionDict"] = {}
+_dicts_lock = threading.Lock()
+
+
+@functools.cache
+def _compression() -> str:
+    """실제로 사용할 압축 방식. zstd를 지정했지만 zstandard가 없으면 gzip으로 대신한다."""
+    if RAW_HTML_COMPRESSION == "zstd" and zstandard is None:
+        logger.warning("zstandard 미설치, gzip으로 압축: pip install zstandard")
+        return "gzip"
+    return RAW_HTML_COMPRESSION
+
+
+def _object_base(object_id: str) -> Path:
+    return OBJECTS_DIR / object_id[:2] / object_id
+
+
+def _object_path(object_id: str) -> Path | None:
+    """객체 파일 경로. 압축 방식과 관계없이 존재하는 파일을 찾고, 없으면 None."""
+    base = _object_base(object_id)
+    for suffix in _SUFFIXES.values():
+        path = base.with_name(base.name + suffix)
+        if path.exists():
+            return path
+    return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 교체한다. 여러 스레드·프로세스가 같은 객체를 써도 반쯤 쓴 파일이 보이지 않는다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+
+def _load_dict(dict_id: int) -> "zstandard.ZstdCompressionDict":
+    with _dicts_lock:
+        zdict = _dicts.get(dict_id)
+        if zdict is None:
+            zdict = zstandard.ZstdCompressionDict((DICTS_DIR / f"{dict_id}.zdict").read_bytes())
+            _dicts[dict_id] = zdict
+        return zdict
+
+
+def _current_dict_id() -> int | None:
+    try:
+        return int(_CURRENT_DICT_FILE.read_text(encoding="ascii").strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        dict_id = _current_dict_id()
+        zdict = _load_dict(dict_id) if dict_id else None
+        return zstandard.ZstdCompressor(level=RAW_HTML_ZSTD_LEVEL, dict_data=zdict).compress(data)
+    return gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0)
+
+
+def _open_object(path: Path) -> BinaryIO:
+    """압축 객체를 스트리밍으로 풀어 읽는 파일 객체를 반환한다."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+
+    if zstandard is None:
+        raise OSError(f"zstandard 미설치로 zstd 객체를 읽을 수 없습니다: {path}")
+    f = path.open("rb")
+    try:
+        dict_id = zstandard.get_frame_parameters(f.read(18)).dict_id
+        f.seek(0)
+        zdict = _load_dict(dict_id) if dict_id else None
+        return zstandard.ZstdDecompressor(dict_data=zdict).stream_reader(f, closefd=True)
+    except BaseException:
+        f.close()
+        raise
+
+
+def _legacy_path(slug: str) -> Path:
+    return RAW_HTML_DIR / f"{slug}.html"
+
+
+def _read_ref(slug: str) -> str | None:
+    try:
+        return (REFS_DIR / slug).read_text(encoding="ascii").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def put_object(data: bytes) -> str:
+    """
+    본문을 압축 객체로 저장하고 객체 ID(SHA-256)를 반환한다.
+    같은 본문의 객체가 이미 있으면 다시 쓰지 않는다.
+    """
+    object_id = hashlib.sha256(data).hexdigest()
+    if _object_path(object_id) is None:
+        compression = _compression()
+        base = _object_base(object_id)
+        _write_atomic(base.with_name(base.name + _SUFFIXES[compression]), _compress(data, compression))
+    return object_id
+
+
+def put_html(slug: str, data: bytes) -> str:
+    """slug의 원문 HTML을 저장하고 객체 ID를 반환한다. 이전 레이아웃의 비압축 파일은 지운다."""
+    object_id = put_object(data)
+    if _read_ref(slug) != object_id:
+        _write_atomic(REFS_DIR / slug, object_id.encode("ascii"))
+    _legacy_path(slug).unlink(missing_ok=True)
+    return object_id
+
+
+def has_html(slug: str) -> bool:
+    """slug의 원문 HTML이 저장되어 있는지 확인한다."""
+    object_id = _read_ref(slug)
+    if object_id is not None:
+        return _object_path(object_id) is not None
+    return _legacy_path(slug).exists()
+
+
+def open_html(slug: str) -> BinaryIO:
+    """
+    slug의 원문 HTML을 읽는 바이너리 스트림을 반환한다. (with 문으로 사용)
+    압축 객체는 파일 전체를 먼저 읽지 않고 스트리밍으로 풀며, 없으면 이전 레이아웃 파일을 연다.
+    """
+    object_id = _read_ref(slug)
+    if object_id is not None:
+        path = _object_path(object_id)
+        if path is None:
+            raise FileNotFoundError(f"원문 HTML 객체 없음: slug={slug}, object={object_id}")
+        return _open_object(path)
+    return _legacy_path(slug).open("rb")
+
+
+def iter_objects() -> Iterator[tuple[str, Path]]:
+    """(객체 ID, 파일 경로)를 반환한다."""
+    if not OBJECTS_DIR.exists():
+        return
+    for shard in os.scandir(OBJECTS_DIR):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            for suffix in _SUFFIXES.values():
+                if entry.name.endswith(suffix):
+                    yield entry.name[:-len(suffix)], Path(entry.path)
+                    break
+
+
+def _referenced() -> set[str]:
+    if not REFS_DIR.exists():
+        return set()
+    return {
+        path.read_text(encoding="ascii").strip()
+        for path in REFS_DIR.iterdir()
+        if path.is_file() and not path.name.endswith(".tmp")
+    }
+
+
+def pack_legacy() -> int:
+    """이전 레이아웃(raw_html/{slug}.html)을 압축 객체로 옮기고 옮긴 파일 수를 반환한다."""
+    if not RAW_HTML_DIR.exists():
+        return 0
+    moved = 0
+    for path in sorted(RAW_HTML_DIR.glob("*.html")):
+        try:
+            put_html(path.stem, path.read_bytes())
+        except OSError as e:
+            logger.error("원문 HTML 이전 실패: path=%s, %s", path, e)
+            continue
+        moved += 1
+    return moved
+
+
+def _is_current_format(path: Path, compression: str, dict_id: int | None) -> bool:
+    if not path.name.endswith(_SUFFIXES[compression]):
+        return False
+    if compression != "zstd":
+        return True
+    with path.open("rb") as f:
+        return (zstandard.get_frame_parameters(f.read(18)).dict_id or None) == dict_id
+
+
+def recompress() -> int:
+    """
+    현재 설정(압축 방식, zstd 사전)과 다른 객체를 다시 압축하고 그 수를 반환한다.
+    사전을 새로 학습한 뒤 기존 객체에도 적용할 때 사용한다.
+    """
+    compression = _compression()
+    dict_id = _current_dict_id() if compression == "zstd" else None
+    count = 0
+    for object_id, path in list(iter_objects()):
+        try:
+            if _is_current_format(path, compression, dict_id):
+                continue
+            with _open_object(path) as f:
+                data = f.read()
+            base = _object_base(object_id)
+            new_path = base.with_name(base.name + _SUFFIXES[compression])
+            _write_atomic(new_path, _compress(data, compression))
+            if new_path != path:  # 압축 방식이 바뀐 경우만 — 사전만 바뀐 zstd 객체는 같은 경로에 덮어썼다
+                path.unlink()
+        except ARCHIVE_ERRORS as e:
+            logger.error("원문 HTML 객체 재압축 실패: path=%s, %s", path, e)
+            continue
+        count += 1
+    return count
+
+
+def remove_unreferenced() -> tuple[int, int]:
+    """
+    어떤 slug도 가리키지 않는 객체(글이 바뀌어 남은 이전 본문)를 지우고 (개수, 바이트)를 반환한다.
+    크롤링 중에는 새 객체가 slug 기록보다 먼저 저장되므로 실행하지 않는다.
+    """
+    referenced = _referenced()
+    count = size = 0
+    for object_id, path in list(iter_objects()):
+        if object_id in referenced:
+            continue
+        size += path.stat().st_size
+        path.unlink()
+        count += 1
+    return count, size
+
+
+def train_dictionary(dict_size: int = RAW_HTML_ZSTD_DICT_SIZE) -> int:
+    """
+    저장된 객체에서 샘플을 뽑아 zstd 공유 사전을 학습하고 사전 ID를 반환한다.
+    이후 저장하는 객체부터 이 사전으로 압축한다. (기존 객체는 recompress()로 다시 압축)
+    """
+    if zstandard is None:
+        raise RuntimeError("zstandard가 설치되어 있지 않습니다: pip install zstandard")
+
+    objects = list(iter_objects())
+    random.Random(0).shuffle(objects)
+    samples = []
+    for _, path in objects[:_DICT_SAMPLES]:
+        try:
+            with _open_object(path) as f:
+                samples.append(f.read(_DICT_SAMPLE_BYTES))
+        except ARCHIVE_ERRORS as e:
+            logger.warning("사전 학습 샘플 읽기 실패, 스킵: path=%s, %s", path, e)
+    if len(samples) < 10:
+        raise RuntimeError(f"사전 학습에 필요한 객체가 부족합니다: {len(samples)}개 (최소 10개)")
+
+    zdict = zstandard.train_dictionary(dict_size, samples)
+    dict_id = zdict.dict_id()
+    _write_atomic(DICTS_DIR / f"{dict_id}.zdict", zdict.as_bytes())
+    _write_atomic(_CURRENT_DICT_FILE, str(dict_id).encode("ascii"))
+    return dict_id
+
+
+def archive_stats() -> dict[str, int]:
+    """{"objects", "bytes", "refs"}: 객체 수, 압축 후 전체 크기, slug 수"""
+    count = size = 0
+    for _, path in iter_objects():
+        count += 1
+        size += path.stat().st_size
+    refs = sum(1 for p in REFS_DIR.iterdir() if not p.name.endswith(".tmp")) if REFS_DIR.exists() else 0
+    return {"objects": count, "bytes": size, "refs": refs}
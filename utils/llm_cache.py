@@ -0,0 +1,115 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from config import LLM_CACHE_FILE, LLM_CACHE_MAX_AGE, LLM_CACHE_MAX_ENTRIES
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# put() 호출이 이 횟수만큼 쌓일 때마다 만료·초과 항목을 정리한다
+_PRUNE_INTERVAL = 500
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+_puts_since_prune = 0
+_counters = {"hits": 0, "misses": 0}
+
+
+def make_key(model: str, template_version: str, prompt: str, options: dict | None = None) -> str:
+    """(모델, 프롬프트 템플릿 버전, 프롬프트, 옵션)의 SHA-256 해시를 캐시 키로 반환한다."""
+    payload = json.dumps(
+        [model, template_version, prompt, options or {}],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """캐시 DB 연결을 반환한다. 호출 측에서 _lock을 잡고 있어야 한다."""
+    global _conn
+    if _conn is None:
+        LLM_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(LLM_CACHE_FILE, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                template_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        _prune_locked()
+    return _conn
+
+
+def _prune_locked() -> None:
+    """LLM_CACHE_MAX_AGE보다 오래 쓰이지 않은 항목과 LLM_CACHE_MAX_ENTRIES 초과분(오래된 순)을 지운다."""
+    global _puts_since_prune
+    _puts_since_prune = 0
+    conn = _conn
+    cutoff = time.time() - LLM_CACHE_MAX_AGE
+    expired = conn.execute("DELETE FROM llm_cache WHERE accessed_at < ?", (cutoff,)).rowcount
+    overflow = conn.execute(
+        """
+        DELETE FROM llm_cache WHERE key IN (
+            SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+        )
+        """,
+        (LLM_CACHE_MAX_ENTRIES,),
+    ).rowcount
+    conn.commit()
+    if expired or overflow:
+        logger.debug("LLM 캐시 정리: 만료 %d건, 용량 초과 %d건", expired, overflow)
+
+
+def get(key: str) -> str | None:
+    """캐시된 응답을 반환한다. 없으면 None."""
+    try:
+        with _lock:
+            conn = _get_conn()
+            row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                _counters["misses"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            _counters["hits"] += 1
+            return row[0]
+    except sqlite3.Error as e:
+        logger.warning("LLM 캐시 조회 실패: %s", e)
+        return None
+
+
+def put(key: str, model: str, template_version: str, response: str) -> None:
+    """응답을 캐시에 저장한다."""
+    global _puts_since_prune
+    now = time.time()
+    try:
+        with _lock:
+            conn = _get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, template_version, response, now, now),
+            )
+            conn.commit()
+            _puts_since_prune += 1
+            if _puts_since_prune >= _PRUNE_INTERVAL:
+                _prune_locked()
+    except sqlite3.Error as e:
+        logger.warning("LLM 캐시 저장 실패: %s", e)
+
+
+def get_counters() -> dict[str, int]:
+    """이번 실행의 캐시 적중(hits)·미적중(misses) 횟수를 반환한다."""
+    with _lock:
+        return dict(_counters)
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from config import OLLAMA_BACKEND_COOLDOWN, OLLAMA_BACKENDS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class NoBackendAvailable(RuntimeError):
+    """요청을 보낼 수 있는 Ollama 백엔드가 없을 때 발생한다."""
+
+
+class _Backend:
+    def __init__(self, url: str, max_concurrency: int):
+        self.url = url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.in_flight = 0
+        self.down_until = 0.0
+
+    def load(self) -> float:
+        return self.in_flight / self.max_concurrency
+
+
+_backends = [_Backend(b["url"], b.get("max_concurrency", 1)) for b in OLLAMA_BACKENDS]
+_cond = threading.Condition()
+
+
+def total_capacity() -> int:
+    """전체 백엔드의 동시 요청 상한 합계를 반환한다. (분석 워커 수 산정용)"""
+    return sum(b.max_concurrency for b in _backends)
+
+
+def backend_urls() -> list[str]:
+    return [b.url for b in _backends]
+
+
+def _pick(exclude: set[str], now: float) -> _Backend | None:
+    """제외·장애 상태가 아니고 여유 슬롯이 있는 백엔드 중 부하 비율이 가장 낮은 것을 고른다."""
+    candidates = [
+        b for b in _backends
+        if b.url not in exclude and b.down_until <= now and b.in_flight < b.max_concurrency
+    ]
+    return min(candidates, key=_Backend.load, default=None)
+
+
+@contextmanager
+def acquire(exclude: set[str] | None = None) -> Iterator[str]:
+    """
+    요청 슬롯 하나를 점유하고 백엔드 URL을 반환한다.
+    모든 슬롯이 사용 중이거나 남은 백엔드가 일시 제외 상태이면 사용 가능해질 때까지 기다린다.
+    모든 백엔드가 exclude에 포함되면 NoBackendAvailable을 발생시킨다.
+    """
+    exclude = exclude or set()
+
+    with _cond:
+        while True:
+            now = time.monotonic()
+            backend = _pick(exclude, now)
+            if backend is not None:
+                backend.in_flight += 1
+                break
+
+            remaining = [b for b in _backends if b.url not in exclude]
+            if not remaining:
+                raise NoBackendAvailable("사용 가능한 Ollama 백엔드가 없습니다")
+
+            # 슬롯 반환(notify) 또는 가장 빠른 제외 해제 시각까지 대기
+            recover_at = min(b.down_until for b in remaining)
+            _cond.wait(timeout=recover_at - now if recover_at > now else None)
+
+    try:
+        yield backend.url
+    finally:
+        with _cond:
+            backend.in_flight -= 1
+            _cond.notify_all()
+
+
+def mark_failed(url: str) -> None:
+    """연결 실패·시간 초과가 난 백엔드를 OLLAMA_BACKEND_COOLDOWN 동안 순환에서 제외한다."""
+    with _cond:
+        for b in _backends:
+            if b.url == url.rstrip("/"):
+                b.down_until = time.monotonic() + OLLAMA_BACKEND_COOLDOWN
+                logger.warning("Ollama 백엔드 일시 제외: url=%s, %.0fs", b.url, OLLAMA_BACKEND_COOLDOWN)
+        _cond.notify_all()
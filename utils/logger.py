@@ -1,38 +1,152 @@
+"""
+로깅 설정. 모든 모듈 logger가 같은 핸들러 두 개를 공유한다.
+
+- 콘솔: WARNING 이상을 stderr에 바로 출력한다.
+- 파일: DEBUG 이상을 QueueHandler로 큐에 넣기만 하고, 백그라운드 스레드(QueueListener)가
+  logs/vibewriter.log에 기록한다. 크기가 LOG_MAX_BYTES를 넘으면 LOG_BACKUP_COUNT개까지 순환한다.
+  LOG_FORMAT = "json"이면 한 줄에 JSON 객체 하나로 기록한다.
+- 워커 프로세스: 부모가 worker_log_queue()로 만든 프로세스 간 큐를 init_worker_logging()에 넘기면
+  워커의 기록도 부모의 리스너가 같은 파일에 쓴다. (여러 프로세스가 같은 파일을 순환하지 않도록)
+"""
+import atexit
+import json
 import logging
+import queue
 import sys
-from pathlib import Path
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from config import BASE_DIR
+from config import BASE_DIR, LOG_BACKUP_COUNT, LOG_FORMAT, LOG_MAX_BYTES
 
 LOG_DIR = BASE_DIR / "logs"
 LOG_FILE = LOG_DIR / "vibewriter.log"
 
+_TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s — %(message)s"
+
+_lock = threading.Lock()
+_file_handler: RotatingFileHandler | None = None
+_listeners: list[QueueListener] = []
+_worker_queue = None  # 부모 프로세스의 워커용 큐 (worker_log_queue)
+_in_worker = False  # init_worker_logging()을 호출한 워커 프로세스
+_stopped = False  # 종료 처리로 리스너를 멈춘 뒤 (이후 기록은 바로 파일에 쓴다)
+
+
+class _JsonFormatter(logging.Formatter):
+    """기록 하나를 JSON 한 줄로 만든다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    첫 기록이 들어올 때 파일 리스너를 시작한다. (import만 하는 프로세스는 로그 파일을 열지 않는다)
+    같은 프로세스의 리스너에는 기록을 그대로 넘겨 포맷을 리스너 스레드에서 하고,
+    워커 프로세스에서는 프로세스 간 큐로 보낼 수 있도록 메시지를 미리 만든다.
+    """
+
+    _started = False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return super().prepare(record) if _in_worker else record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if _stopped:
+            with _lock:
+                handler = _get_file_handler()
+            handler.handle(record)
+            return
+        if not _in_worker and not self._started:
+            _start_listener(self.queue)
+            self._started = True
+        super().enqueue(record)
+
+
+def _get_file_handler() -> RotatingFileHandler:
+    """공유 파일 핸들러를 만든다. 호출 측에서 _lock을 잡고 있어야 한다."""
+    global _file_handler
+    if _file_handler is None:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        _file_handler = RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+        _file_handler.setLevel(logging.DEBUG)
+        _file_handler.setFormatter(_JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(_TEXT_FORMAT))
+    return _file_handler
+
+
+def _start_listener(log_queue) -> None:
+    """log_queue를 비우며 파일에 기록하는 백그라운드 리스너를 시작한다. 종료 시 남은 기록을 모두 쓰고 멈춘다."""
+    with _lock:
+        if any(listener.queue is log_queue for listener in _listeners):
+            return
+        listener = QueueListener(log_queue, _get_file_handler(), respect_handler_level=True)
+        listener.start()
+        if not _listeners:
+            atexit.register(_stop_listeners)
+        _listeners.append(listener)
+
+
+def _stop_listeners() -> None:
+    global _stopped
+    with _lock:
+        listeners = list(_listeners)
+        _listeners.clear()
+        _stopped = True
+    for listener in listeners:
+        listener.stop()  # 큐에 남은 기록을 모두 쓴 뒤 멈춘다
+
+
+# 모든 모듈 logger가 공유하는 핸들러
+_console_handler = logging.StreamHandler(sys.stderr)
+_console_handler.setLevel(logging.WARNING)
+_console_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+
+_queue_handler = _QueueHandler(queue.SimpleQueue())
+_queue_handler.setLevel(logging.DEBUG)
+
 
 def get_logger(name: str) -> logging.Logger:
-    """모듈별 logger를 반환한다. 콘솔(WARNING+)과 파일(DEBUG+)에 동시 출력한다."""
+    """모듈별 logger를 반환한다. 콘솔(WARNING+)과 파일(DEBUG+, 백그라운드 기록)에 동시 출력한다."""
     logger = logging.getLogger(name)
 
     if logger.handlers:
         return logger  # 중복 핸들러 방지
 
     logger.setLevel(logging.DEBUG)
+    logger.addHandler(_console_handler)
+    logger.addHandler(_queue_handler)
+    return logger
 
-    # 콘솔: WARNING 이상만 출력
-    console_handler = logging.StreamHandler(sys.stderr)
-    console_handler.setLevel(logging.WARNING)
-    console_handler.setFormatter(
-        logging.Formatter("[%(levelname)s] %(message)s")
-    )
 
-    # 파일: DEBUG 이상 전체 기록
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(
-        logging.Formatter("%(asctime)s [%(levelname)s] %(name)s — %(message)s")
-    )
+def worker_log_queue():
+    """
+    워커 프로세스(spawn)에 넘길 프로세스 간 로그 큐를 반환하고, 이 큐를 비우는 리스너를 부모 프로세스에서 시작한다.
+    ProcessPoolExecutor(initializer=init_worker_logging, initargs=(worker_log_queue(),))로 사용한다.
+    """
+    global _worker_queue
+    import multiprocessing  # 워커 프로세스를 쓰는 명령에서만 불러온다
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    with _lock:
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.get_context("spawn").Queue()
+    _start_listener(_worker_queue)
+    return _worker_queue
 
-    return logger
+
+def init_worker_logging(log_queue) -> None:
+    """워커 프로세스의 파일 기록을 부모 프로세스의 큐로 보낸다. (워커 프로세스 initializer)"""
+    global _in_worker
+    _in_worker = True
+    _queue_handler.queue = log_queue
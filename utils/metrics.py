@@ -0,0 +1,304 @@
+"""
+단계별 실행 시간·바이트 수·토큰 수를 span 단위로 기록한다.
+
+    with span("crawl.fetch", url=url) as s:
+        response = httpx.get(url)
+        s["bytes"] = len(response.content)
+
+start_run()으로 실행 리포트 경로를 정하면 span이 끝날 때마다 JSONL 한 줄씩 추가 기록한다.
+경로는 환경 변수로도 전달되므로 spawn으로 띄운 파싱 프로세스의 span도 같은 리포트에 쌓인다.
+요약 표와 Prometheus 텍스트 엔드포인트는 모두 이 리포트를 읽어 만든다.
+"""
+import atexit
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_REPORT_ENV = "VIBEWRITER_METRICS_REPORT"
+
+# 합계를 내는 숫자 속성
+_SUM_KEYS = ("bytes", "prompt_tokens", "response_tokens")
+
+# 요약의 p50 / p95는 실행 시간을 로그 구간별 개수로 세어 구한다 — span 수가 늘어도 구간 수만큼만 메모리를 쓴다
+# 구간 상한이 _BUCKET_GROWTH배씩 커지므로 백분위수는 실제 값보다 최대 5% 크게 나온다
+_BUCKET_GROWTH = 1.05
+_BUCKET_MIN_SECONDS = 1e-6
+
+_report_path: Path | None = Path(os.environ[_REPORT_ENV]) if os.environ.get(_REPORT_ENV) else None
+_current: ContextVar[dict | None] = ContextVar("metrics_span", default=None)
+
+
+def start_run(path: Path) -> Path:
+    """이번 실행의 리포트 파일을 정한다. 이후 시작하는 자식 프로세스도 같은 파일에 기록한다."""
+    global _report_path, _reader
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _close_report()
+    _report_path = path
+    _reader = None
+    os.environ[_REPORT_ENV] = str(path)
+    return path
+
+
+def report_path() -> Path | None:
+    return _report_path
+
+
+_report_fd: int | None = None
+_report_fd_key: tuple[Path, int] | None = None  # (경로, pid) — fork된 자식은 부모의 fd를 쓰지 않는다
+_report_fd_lock = threading.Lock()
+
+
+def _close_report() -> None:
+    global _report_fd, _report_fd_key
+    with _report_fd_lock:
+        if _report_fd is not None and _report_fd_key is not None and _report_fd_key[1] == os.getpid():
+            os.close(_report_fd)
+        _report_fd = _report_fd_key = None
+
+
+def _report_fd_for(path: Path) -> int:
+    """리포트 파일을 프로세스마다 한 번만 열고 fd를 재사용한다. (span마다 open/close하지 않는다)"""
+    global _report_fd, _report_fd_key
+    key = (path, os.getpid())
+    with _report_fd_lock:
+        if _report_fd_key != key:
+            _report_fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            _report_fd_key = key
+        return _report_fd
+
+
+def _write(record: dict) -> None:
+    """리포트에 한 줄을 추가한다. O_APPEND로 한 번에 쓰므로 여러 프로세스가 기록해도 줄이 섞이지 않는다."""
+    if _report_path is None:
+        return
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    os.write(_report_fd_for(_report_path), line)
+
+
+atexit.register(_close_report)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    구간 실행 시간을 잰다. yield한 dict에 넣은 값(bytes, prompt_tokens 등)도 함께 기록한다.
+    예외로 끝나면 error: true를 남긴다.
+    """
+    record = {"name": name, **attrs}
+    token = _current.set(record)
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record["error"] = True
+        raise
+    finally:
+        _current.reset(token)
+        record["duration"] = round(time.perf_counter() - start, 6)
+        record["at"] = round(started_at, 3)
+        record["pid"] = os.getpid()
+        _write(record)
+
+
+def annotate(**attrs) -> None:
+    """현재 실행 중인 span에 속성을 추가한다. span 밖에서는 아무 일도 하지 않는다."""
+    record = _current.get()
+    if record is not None:
+        record.update(attrs)
+
+
+def timed(name: str):
+    """함수 전체를 span으로 감싸는 데코레이터. 코루틴 함수도 지원한다."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class _ReportReader:
+    """리포트 파일을 이어 읽으며 span 이름별 집계를 갱신한다. (완성된 줄만 반영)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offset = 0
+        self.stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self) -> dict[str, dict]:
+        with self._lock:
+            try:
+                with self.path.open("rb") as f:
+                    f.seek(self.offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return self.stats
+
+            end = data.rfind(b"\n") + 1
+            self.offset += end
+            for line in data[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._add(record)
+            return self.stats
+
+    def _add(self, record: dict) -> None:
+        stat = self.stats.setdefault(record["name"], {
+            "count": 0, "errors": 0, "cache_hits": 0, "seconds": 0.0,
+            **dict.fromkeys(_SUM_KEYS, 0), "max": 0.0, "buckets": {},
+        })
+        stat["count"] += 1
+        stat["errors"] += bool(record.get("error"))
+        stat["cache_hits"] += bool(record.get("cache_hit"))
+        stat["seconds"] += record["duration"]
+        stat["max"] = max(stat["max"], record["duration"])
+        bucket = _bucket(record["duration"])
+        stat["buckets"][bucket] = stat["buckets"].get(bucket, 0) + 1
+        for key in _SUM_KEYS:
+            stat[key] += record.get(key) or 0
+
+
+_reader: _ReportReader | None = None
+_reader_lock = threading.Lock()
+
+
+def _get_reader() -> _ReportReader | None:
+    global _reader
+    with _reader_lock:
+        if _report_path is None:
+            return None
+        if _reader is None:
+            _reader = _ReportReader(_report_path)
+        return _reader
+
+
+def _bucket(seconds: float) -> int:
+    """실행 시간이 속하는 로그 구간 번호. 구간 i의 상한은 _BUCKET_GROWTH ** i초다."""
+    return math.ceil(math.log(max(seconds, _BUCKET_MIN_SECONDS), _BUCKET_GROWTH))
+
+
+def _bucket_percentile(buckets: dict[int, int], q: float, maximum: float) -> float:
+    """구간별 개수에서 nearest-rank 백분위수를 구간 상한으로 구한다. (최댓값을 넘지 않는다)"""
+    count = sum(buckets.values())
+    if not count:
+        return 0
+    rank = max(1, math.ceil(q / 100 * count))
+    seen = 0
+    for index in sorted(buckets):
+        seen += buckets[index]
+        if seen >= rank:
+            return min(_BUCKET_GROWTH ** index, maximum)
+    return maximum
+
+
+def percentile(values: list[float], q: float) -> float:
+    """nearest-rank 백분위수 (q·n/100 이상인 가장 작은 순위의 값). 값이 없으면 0을 반환한다."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize() -> dict[str, dict]:
+    """
+    리포트 기준 span 이름별 집계를 반환한다.
+    {name: {count, errors, cache_hits, seconds, p50_ms, p95_ms, max_ms, bytes, prompt_tokens, response_tokens}}
+    """
+    reader = _get_reader()
+    if reader is None:
+        return {}
+
+    summary = {}
+    for name, stat in sorted(reader.update().items()):
+        summary[name] = {
+            **{k: v for k, v in stat.items() if k not in ("max", "buckets")},
+            "p50_ms": _bucket_percentile(stat["buckets"], 50, stat["max"]) * 1000,
+            "p95_ms": _bucket_percentile(stat["buckets"], 95, stat["max"]) * 1000,
+            "max_ms": stat["max"] * 1000,
+        }
+    return summary
+
+
+def format_summary(summary: dict[str, dict]) -> str:
+    """summarize() 결과를 콘솔용 표로 만든다."""
+    header = (
+        f"{'span':<24}{'count':>7}{'err':>5}{'total(s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}"
+        f"{'max(ms)':>10}{'bytes':>12}{'prompt tok':>12}{'resp tok':>10}{'cache':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, s in summary.items():
+        lines.append(
+            f"{name:<24}{s['count']:>7}{s['errors']:>5}{s['seconds']:>10.2f}{s['p50_ms']:>10.1f}"
+            f"{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}{s['bytes']:>12}{s['prompt_tokens']:>12}"
+            f"{s['response_tokens']:>10}{s['cache_hits']:>7}"
+        )
+    return "\n".join(lines)
+
+
+def _prometheus_text() -> str:
+    """현재까지의 집계를 Prometheus 텍스트 형식(counter)으로 만든다."""
+    reader = _get_reader()
+    stats = reader.update() if reader else {}
+
+    metrics = [
+        ("span_count_total", "count", "span 실행 횟수"),
+        ("span_errors_total", "errors", "예외로 끝난 span 수"),
+        ("span_duration_seconds_total", "seconds", "span 실행 시간 합계(초)"),
+        ("span_bytes_total", "bytes", "처리한 바이트 수"),
+        ("span_prompt_tokens_total", "prompt_tokens", "LLM 프롬프트 토큰 수"),
+        ("span_response_tokens_total", "response_tokens", "LLM 응답 토큰 수"),
+        ("span_cache_hits_total", "cache_hits", "캐시 적중 수"),
+    ]
+    lines = []
+    for metric, key, help_text in metrics:
+        lines.append(f"# HELP vibewriter_{metric} {help_text}")
+        lines.append(f"# TYPE vibewriter_{metric} counter")
+        for name, stat in sorted(stats.items()):
+            lines.append(f'vibewriter_{metric}{{span="{name}"}} {stat[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """GET /metrics로 Prometheus 텍스트를 응답하는 서버를 백그라운드 스레드에서 시작한다."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = _prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
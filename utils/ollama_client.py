@@ -1,37 +1,485 @@
+import atexit
+import hashlib
+import json
+import queue
+import socket
+import threading
+import time
+
 import httpx
 
-from config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from config import (
+    LLM_CACHE_ENABLED,
+    OLLAMA_FIRST_TOKEN_TIMEOUT,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MAX_TOKENS,
+    OLLAMA_MODEL,
+    OLLAMA_PREFIX_REUSE,
+    OLLAMA_STREAM,
+    OLLAMA_TIMEOUT,
+    OLLAMA_TOKEN_TIMEOUT,
+)
+from utils import llm_cache, llm_dispatcher
 from utils.logger import get_logger
+from utils.metrics import annotate, span, timed
 
 logger = get_logger(__name__)
 
+# 프로세스 전체에서 재사용하는 커넥션 풀 클라이언트
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+# Ollama 응답의 시간·토큰 통계 누적값 (시간 단위: 초)
+_STAT_KEYS = (
+    "calls",
+    "load_duration",
+    "prompt_eval_duration",
+    "eval_duration",
+    "total_duration",
+    "prompt_eval_count",
+    "eval_count",
+    "prefix_primes",
+    "prefix_hits",
+    "prefix_misses",
+    "prefix_saved_tokens",
+    "prefix_saved_duration",
+)
+_stats: dict[str, float] = dict.fromkeys(_STAT_KEYS, 0)
+_stats_lock = threading.Lock()
+
+# load_duration이 이 값(초)보다 길면 모델이 새로 로드된 것으로 본다
+_RELOAD_THRESHOLD = 1.0
+
+# 스트리밍 요청의 httpx 시간 제한. 토큰 간격은 _read_stream이 따로 재고, 이 값은 읽기 스레드의 안전장치다
+_STREAM_TIMEOUT = httpx.Timeout(
+    OLLAMA_TIMEOUT, read=max(OLLAMA_FIRST_TOKEN_TIMEOUT, OLLAMA_TOKEN_TIMEOUT)
+)
+_CANCEL_POLL = 0.1  # 초 — 토큰을 기다리는 동안 취소 여부를 확인하는 간격
+_DONE_GRACE = 0.5  # 초 — JSON 완성 후 통계가 담긴 done 줄을 기다리는 시간
+_STREAM_END = object()
+
+
+# 백엔드별로 KV 캐시에 올려 둔 prefix의 평가량: {(base_url, model, prefix 해시): {"tokens", "duration", "bytes"}}
+_primed: dict[tuple[str, str, str], dict] = {}
+_primed_lock = threading.Lock()
+
+# prefix 평가 토큰 수가 이보다 적으면(바이트/토큰 기준) 이미 캐시되어 있던 것으로 보고 절약량을 재지 않는다
+_MAX_BYTES_PER_TOKEN = 8
+
+
+class GenerationCancelled(RuntimeError):
+    """cancel 이벤트가 설정되어 생성을 중단했다."""
+
 
-def generate(prompt: str, model: str = OLLAMA_MODEL) -> str:
+def _get_client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(timeout=OLLAMA_TIMEOUT)
+            atexit.register(close)
+        return _client
+
+
+def close() -> None:
+    """공유 HTTP 클라이언트를 닫는다."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_stats() -> dict[str, float]:
+    """
+    누적 LLM 호출 통계(호출 수, load/prompt_eval/eval 시간(초), 토큰 수),
+    prefix 재사용 통계(prefix_primes, prefix_hits, prefix_misses, 절약한 prompt_eval 토큰·시간 추정치)와
+    응답 캐시 적중 횟수(cache_hits, cache_misses)를 반환한다.
     """
-    Ollama에 프롬프트를 전송하고 생성된 텍스트를 반환한다.
+    with _stats_lock:
+        stats = dict(_stats)
+    counters = llm_cache.get_counters()
+    stats["cache_hits"] = counters["hits"]
+    stats["cache_misses"] = counters["misses"]
+    return stats
+
+
+def _record_stats(data: dict) -> dict[str, float]:
+    """Ollama 응답의 duration(ns)·count 필드를 초 단위로 변환해 누적하고 이번 호출 값을 반환한다."""
+    durations = {
+        key: data.get(key, 0) / 1e9
+        for key in ("load_duration", "prompt_eval_duration", "eval_duration", "total_duration")
+    }
+    counts = {key: data.get(key, 0) for key in ("prompt_eval_count", "eval_count")}
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        for key, value in (durations | counts).items():
+            _stats[key] += value
+
+    return durations | counts
+
+
+class _JsonObjectEnd:
+    """스트림으로 이어 받는 텍스트에서 최상위 JSON 객체가 닫히는 위치를 찾는다."""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.disabled = False  # 응답이 '{'로 시작하지 않으면 끝까지 받는다
+
+    def feed(self, text: str) -> int | None:
+        """text를 이어 받아, 최상위 객체가 닫혔으면 text 안에서 닫는 괄호 다음 위치를 반환한다."""
+        for i, ch in enumerate(text):
+            if self.disabled:
+                return None
+            if not self.started:
+                if ch.isspace():
+                    continue
+                self.started = True
+                self.disabled = ch != "{"
+                self.depth = 1
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return None
+
+
+def _read_lines(response: httpx.Response, lines: queue.Queue) -> None:
+    """읽기 스레드: 스트림의 NDJSON 줄을 큐에 넣는다. 끝나면 _STREAM_END, 실패하면 예외를 넣는다."""
+    try:
+        for line in response.iter_lines():
+            if line:
+                lines.put(line)
+    except (httpx.HTTPError, httpx.StreamError, OSError) as e:  # 조기 종료로 연결을 끊은 경우 포함
+        lines.put(e)
+    else:
+        lines.put(_STREAM_END)
+
+
+def _next_line(lines: queue.Queue, timeout: float, cancel: threading.Event | None):
+    """다음 줄을 기다린다. timeout 안에 오지 않으면 None, cancel이 설정되면 GenerationCancelled."""
+    deadline = time.monotonic() + timeout
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise GenerationCancelled("LLM 생성 취소")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            return lines.get(timeout=min(remaining, _CANCEL_POLL))
+        except queue.Empty:
+            continue
+
+
+def _abort(response: httpx.Response) -> None:
+    """
+    소켓을 shutdown해 읽기 스레드의 블로킹 recv를 바로 풀고 연결을 끊는다.
+    Ollama는 클라이언트 연결이 끊기면 생성을 멈춘다.
+    """
+    stream = response.extensions.get("network_stream")
+    sock = stream.get_extra_info("socket") if stream is not None else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _read_stream(
+    response: httpx.Response,
+    max_tokens: int | None,
+    cancel: threading.Event | None,
+    stop_at_json: bool,
+) -> dict:
+    """
+    Ollama NDJSON 토큰 스트림을 읽어 비스트리밍 응답과 같은 형태의 dict를 반환한다.
+    첫 토큰은 OLLAMA_FIRST_TOKEN_TIMEOUT, 이후 토큰은 OLLAMA_TOKEN_TIMEOUT 안에 와야 한다.
+    stop_at_json이면 최상위 JSON 객체가 닫힌 뒤 _DONE_GRACE초 동안만 통계가 담긴 done 줄을 기다리고
+    그 전에 다른 토큰이 오면 바로 끊는다. max_tokens개를 받으면 그 자리에서 끊는다.
+    중간에 끊은 응답에는 Ollama 통계가 없으므로 받은 토큰 수만 eval_count로 채운다.
+    """
+    lines: queue.Queue = queue.Queue()
+    threading.Thread(target=_read_lines, args=(response, lines), daemon=True).start()
+
+    parts: list[str] = []
+    tokens = 0
+    json_end = _JsonObjectEnd() if stop_at_json else None
+    json_complete = False
+    finished = False
+    try:
+        while True:
+            if json_complete:
+                timeout = _DONE_GRACE
+            else:
+                timeout = OLLAMA_TOKEN_TIMEOUT if tokens else OLLAMA_FIRST_TOKEN_TIMEOUT
+            line = _next_line(lines, timeout, cancel)
+            chunk = json.loads(line) if isinstance(line, str) else None
+            if json_complete and not (chunk and chunk.get("done")):
+                return {"response": "".join(parts), "eval_count": tokens, "done_reason": "json_complete"}
+            if line is None:
+                kind = "다음 토큰" if tokens else "첫 토큰"
+                raise httpx.ReadTimeout(f"{kind} 대기 {timeout:.0f}초 초과 (받은 토큰 {tokens}개)")
+            if line is _STREAM_END:
+                raise ValueError("Ollama 스트림이 done 없이 끝났습니다")
+            if isinstance(line, Exception):
+                raise line
+
+            if "error" in chunk:
+                raise ValueError(f"Ollama 오류: {chunk['error']}")
+            if chunk.get("done"):
+                finished = True
+                text = "" if json_complete else chunk.get("response", "")
+                return chunk | {"response": "".join(parts) + text}
+
+            text = chunk.get("response", "")
+            tokens += 1
+            end = json_end.feed(text) if json_end is not None else None
+            if end is not None:
+                parts.append(text[:end])
+                json_complete = True  # 통계가 담긴 done 줄만 잠시 더 기다린다
+                continue
+            parts.append(text)
+            if max_tokens is not None and tokens >= max_tokens:
+                return {"response": "".join(parts), "eval_count": tokens, "done_reason": "length"}
+    finally:
+        if not finished:
+            _abort(response)
+
+
+def _prime(base_url: str, payload: dict, prefix: str) -> dict:
+    """
+    백엔드가 prefix(고정 지시문)를 아직 평가하지 않았으면 prefix만으로 1토큰 생성을 요청해
+    Ollama 러너의 KV 캐시에 올려 두고, prefix 평가량 {"tokens", "duration", "bytes"}를 반환한다.
+    이후 같은 prefix로 시작하는 프롬프트는 러너가 공통 접두부의 KV 캐시를 재사용해 나머지만 평가한다.
+    """
+    key = (base_url, payload["model"], hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+    with _primed_lock:
+        info = _primed.get(key)
+    if info is not None:
+        return info
+
+    prime = {
+        "model": payload["model"],
+        "prompt": prefix,
+        "stream": False,
+        "keep_alive": payload["keep_alive"],
+        "options": {**payload.get("options", {}), "num_predict": 1},
+    }
+    with span("llm.prime", backend=base_url):
+        response = _get_client().post(f"{base_url}/api/generate", json=prime)
+    response.raise_for_status()
+    data = response.json()
+    _record_stats(data)
+    info = {
+        "tokens": data.get("prompt_eval_count", 0),
+        "duration": data.get("prompt_eval_duration", 0) / 1e9,
+        "bytes": len(prefix.encode("utf-8")),
+    }
+    with _stats_lock:
+        _stats["prefix_primes"] += 1
+    with _primed_lock:
+        _primed[key] = info
+    logger.debug("prefix 평가: url=%s, %d tok, %.2fs", base_url, info["tokens"], info["duration"])
+    return info
+
+
+def _account_prefix(base_url: str, payload: dict, info: dict, data: dict) -> None:
+    """
+    prefix를 올려 둔 뒤의 호출이 KV 캐시를 재사용했는지 판정해 절약한 prompt_eval 토큰·시간을 누적한다.
+    재사용했다면 이번 호출의 prompt_eval_count는 (전체 프롬프트 토큰 − prefix 토큰) 정도로 줄어든다.
+    전체 토큰 수는 prefix의 바이트당 토큰 수로 추정한다.
+    모델이 다시 로드된 호출(load_duration)은 캐시 없이 전체 프롬프트를 평가한 것이므로 재사용 실패로 센다.
+    이때 전체 프롬프트가 prefix를 다시 캐시에 올리므로 따로 다시 평가하지 않는다.
+    """
+    if data.get("load_duration", 0) / 1e9 > _RELOAD_THRESHOLD:
+        logger.info("모델 재로드 감지, 전체 프롬프트로 평가: url=%s, model=%s", base_url, payload["model"])
+        hit = False
+    elif "prompt_eval_count" not in data or info["tokens"] * _MAX_BYTES_PER_TOKEN < info["bytes"]:
+        return  # 스트림을 중간에 끊어 통계가 없거나, prefix가 이미 캐시되어 있어 평가량을 모른다
+    else:
+        expected = len(payload["prompt"].encode("utf-8")) * info["tokens"] / info["bytes"]
+        hit = data["prompt_eval_count"] <= expected - info["tokens"] / 2
+
+    annotate(prefix_hit=hit)
+    with _stats_lock:
+        if hit:
+            _stats["prefix_hits"] += 1
+            _stats["prefix_saved_tokens"] += info["tokens"]
+            _stats["prefix_saved_duration"] += info["duration"]
+        else:
+            _stats["prefix_misses"] += 1
+
+
+def _request(
+    base_url: str,
+    payload: dict,
+    max_tokens: int | None,
+    cancel: threading.Event | None,
+    stop_at_json: bool,
+    prefix: str,
+) -> dict:
+    info = _prime(base_url, payload, prefix) if prefix else None
+
+    url = f"{base_url}/api/generate"
+    if not payload["stream"]:
+        response = _get_client().post(url, json=payload)
+        response.raise_for_status()
+        data = response.json()
+    else:
+        with _get_client().stream("POST", url, json=payload, timeout=_STREAM_TIMEOUT) as response:
+            response.raise_for_status()
+            data = _read_stream(response, max_tokens, cancel, stop_at_json)
+
+    if info is not None:
+        _account_prefix(base_url, payload, info, data)
+    return data
+
+
+def _post_generate(
+    payload: dict,
+    max_tokens: int | None = None,
+    cancel: threading.Event | None = None,
+    stop_at_json: bool = False,
+    prefix: str = "",
+) -> dict:
+    """
+    디스패처가 고른 백엔드(부하 비율이 가장 낮은 곳)로 /api/generate 요청을 보낸다.
+    연결 실패·시간 초과가 난 백엔드는 순환에서 잠시 제외하고 남은 백엔드로 다시 보낸다.
+    prefix를 주면 같은 슬롯 안에서 먼저 prefix를 KV 캐시에 올린다. (_prime)
+    """
+    tried: set[str] = set()
+    last_error: httpx.TransportError | None = None
+
+    while True:
+        try:
+            with llm_dispatcher.acquire(exclude=tried) as base_url:
+                try:
+                    with span("llm.request", backend=base_url):
+                        return _request(base_url, payload, max_tokens, cancel, stop_at_json, prefix)
+                except (httpx.ConnectError, httpx.TimeoutException) as e:
+                    logger.warning("Ollama 백엔드 요청 실패: url=%s, %s", base_url, e)
+                    llm_dispatcher.mark_failed(base_url)
+                    tried.add(base_url)
+                    last_error = e
+                    continue
+        except llm_dispatcher.NoBackendAvailable as e:
+            raise last_error or httpx.ConnectError(str(e))
+
+
+@timed("llm.generate")
+def generate(
+    prompt: str,
+    model: str = OLLAMA_MODEL,
+    format: str | dict | None = None,
+    options: dict | None = None,
+    cache_version: str | None = None,
+    max_tokens: int | None = OLLAMA_MAX_TOKENS,
+    cancel: threading.Event | None = None,
+    stream: bool = OLLAMA_STREAM,
+    prefix: str = "",
+) -> str:
+    """
+    Ollama에 prefix + prompt를 전송하고 생성된 텍스트를 반환한다.
+    prefix는 여러 호출에 똑같이 들어가는 고정 지시문이다. OLLAMA_PREFIX_REUSE이면 백엔드마다
+    모델 로드당 한 번 먼저 평가해 KV 캐시에 올려 두고, 이후 호출은 prompt 부분만 평가된다.
+    항상 전체 프롬프트를 보내므로 모델이 다시 로드되어 캐시가 없어도 결과는 같다.
+    format에 "json" 또는 JSON 스키마(dict)를 주면 Ollama가 해당 형식으로만 응답한다.
+    cache_version(프롬프트 템플릿 버전)을 주면 응답 캐시를 사용한다.
+    템플릿을 바꿀 때 버전을 올리면 해당 템플릿의 캐시만 무효화된다.
+    max_tokens는 응답 토큰 수 상한(num_predict)이다.
+    stream이면 토큰 스트림으로 받아, format이 있을 때는 JSON 객체가 완성되는 즉시 끊고,
+    cancel 이벤트가 설정되면 GenerationCancelled를 발생시킨다.
     Ollama가 실행 중이지 않으면 SystemExit을 발생시킨다.
     """
+    prompt = prefix + prompt
+    annotate(model=model, bytes=len(prompt.encode("utf-8")))
+    if max_tokens is not None:
+        options = {**(options or {}), "num_predict": max_tokens}
+    cache_key = None
+    if LLM_CACHE_ENABLED and cache_version is not None:
+        cache_key = llm_cache.make_key(
+            model, cache_version, prompt, {"format": format, "options": options}
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("LLM 캐시 적중: model=%s, version=%s", model, cache_version)
+            annotate(cache_hit=True)
+            return cached
+
     logger.debug("LLM 요청: model=%s, prompt_len=%d", model, len(prompt))
 
+    payload: dict = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+    }
+    if format is not None:
+        payload["format"] = format
+    if options:
+        payload["options"] = options
+
     try:
-        response = httpx.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
-            timeout=120.0,
+        data = _post_generate(
+            payload,
+            max_tokens,
+            cancel,
+            stop_at_json=format is not None,
+            prefix=prefix if OLLAMA_PREFIX_REUSE else "",
         )
-        response.raise_for_status()
-
-        data = response.json()
         if "response" not in data:
             raise ValueError(f"Ollama 응답에 'response' 필드가 없습니다: {data}")
+        if data.get("done_reason"):
+            annotate(done_reason=data["done_reason"])
+        truncated = data.get("done_reason") == "length"
+        if truncated:
+            logger.warning("최대 토큰 수(%s) 도달, 응답이 잘렸을 수 있음 (캐시하지 않음): model=%s", max_tokens, model)
+
+        timing = _record_stats(data)
+        annotate(
+            prompt_tokens=timing["prompt_eval_count"],
+            response_tokens=timing["eval_count"],
+            load_s=round(timing["load_duration"], 3),
+            eval_s=round(timing["eval_duration"], 3),
+        )
+        logger.debug(
+            "LLM 응답 수신: %d자, load=%.2fs, prompt_eval=%.2fs(%d tok), eval=%.2fs(%d tok), total=%.2fs",
+            len(data["response"]),
+            timing["load_duration"],
+            timing["prompt_eval_duration"],
+            timing["prompt_eval_count"],
+            timing["eval_duration"],
+            timing["eval_count"],
+            timing["total_duration"],
+        )
+        if timing["load_duration"] > _RELOAD_THRESHOLD:
+            logger.info("모델 로드 발생: model=%s, load=%.2fs", model, timing["load_duration"])
 
-        logger.debug("LLM 응답 수신: %d자", len(data["response"]))
+        # 잘린 응답을 캐시하면 다시 실행해도(--force 포함) 같은 불완전한 JSON을 받게 되므로 저장하지 않는다
+        if cache_key is not None and not truncated:
+            llm_cache.put(cache_key, model, cache_version, data["response"])
         return data["response"]
 
     except httpx.ConnectError as e:
         logger.critical("Ollama 연결 실패: %s", e)
         raise SystemExit(
-            f"[error] Ollama에 연결할 수 없습니다. 'ollama serve'로 서버를 실행하세요. ({OLLAMA_BASE_URL})"
+            "[error] Ollama에 연결할 수 없습니다. 'ollama serve'로 서버를 실행하세요. "
+            f"({', '.join(llm_dispatcher.backend_urls())})"
         )
     except httpx.TimeoutException as e:
         logger.error("Ollama 응답 시간 초과: model=%s, %s", model, e)
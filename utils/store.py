@@ -0,0 +1,300 @@
+"""
+파싱된 글(post)과 분석 결과(analysis, tone_and_manner 포함) 저장소.
+
+- FileStore: 기존 파일 레이아웃 (parsed_posts/{slug}.json, analysis/{slug}.json)
+- SqliteStore: SQLite 파일 하나(WAL)에 posts / analyses 테이블로 저장, 카테고리 인덱스
+
+agents는 get_store()가 돌려준 저장소를 slug 단위로만 사용한다.
+parse / analyze 등이 주고받는 Path는 slug를 나타내는 키로 쓰며(stem = slug),
+SqliteStore에서는 실제 파일이 없을 수 있다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from config import ANALYSIS_DIR, PARSED_POSTS_DIR, STORAGE_BACKEND, STORE_DB_FILE
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 저장소 읽기·쓰기에서 발생할 수 있는 예외 (파일 I/O, JSON 디코딩, SQLite)
+STORE_ERRORS = (OSError, ValueError, sqlite3.Error)
+
+# 메모리에 보관할 최근 글 수 — split 모드에서 analyze 직후 add_tone_and_manner가 같은 글을 다시 읽는다
+_RECENT_POSTS = 64
+
+
+class _RecentPosts:
+    """
+    최근 글을 파일 mtime과 함께 보관하는 LRU. 여러 분석 스레드가 함께 사용한다.
+    다른 프로세스(파싱 워커)가 파일을 다시 쓰면 mtime이 달라져 캐시를 쓰지 않는다.
+    """
+
+    def __init__(self, size: int = _RECENT_POSTS):
+        self._size = size
+        self._items: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug: str, mtime_ns: int) -> dict | None:
+        with self._lock:
+            item = self._items.get(slug)
+            if item is None or item[0] != mtime_ns:
+                return None
+            self._items.move_to_end(slug)
+            return item[1]
+
+    def put(self, slug: str, mtime_ns: int, post: dict) -> None:
+        with self._lock:
+            self._items[slug] = (mtime_ns, post)
+            self._items.move_to_end(slug)
+            while len(self._items) > self._size:
+                self._items.popitem(last=False)
+
+
+class FileStore:
+    """글·분석 결과를 slug별 JSON 파일로 저장한다. (기존 레이아웃)"""
+
+    name = "files"
+
+    def __init__(self):
+        self._recent = _RecentPosts()
+
+    def get_post(self, slug: str) -> dict | None:
+        path = PARSED_POSTS_DIR / f"{slug}.json"
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        post = self._recent.get(slug, mtime_ns)
+        if post is None:
+            post = json.loads(path.read_text(encoding="utf-8"))
+            self._recent.put(slug, mtime_ns, post)
+        return post
+
+    def put_post(self, slug: str, post: dict) -> None:
+        PARSED_POSTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = PARSED_POSTS_DIR / f"{slug}.json"
+        path.write_text(json.dumps(post, ensure_ascii=False, indent=2), encoding="utf-8")
+        self._recent.put(slug, path.stat().st_mtime_ns, post)
+
+    def iter_posts(self) -> Iterator[tuple[str, dict]]:
+        """(slug, post)를 slug 순으로 반환한다."""
+        if not PARSED_POSTS_DIR.exists():
+            return
+        for path in sorted(PARSED_POSTS_DIR.glob("*.json")):
+            yield path.stem, json.loads(path.read_text(encoding="utf-8"))
+
+    def get_analysis(self, slug: str) -> dict | None:
+        path = ANALYSIS_DIR / f"{slug}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def put_analysis(self, slug: str, analysis: dict) -> None:
+        ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+        path = ANALYSIS_DIR / f"{slug}.json"
+        path.write_text(json.dumps(analysis, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def has_analysis(self, slug: str) -> bool:
+        return (ANALYSIS_DIR / f"{slug}.json").exists()
+
+    def analysis_stamps(self) -> dict[str, list[int]]:
+        """{slug: 변경 감지용 값}. 파일 저장소는 [mtime_ns, size]를 사용한다."""
+        if not ANALYSIS_DIR.exists():
+            return {}
+        stamps = {}
+        for entry in os.scandir(ANALYSIS_DIR):
+            if entry.name.endswith(".json") and entry.is_file():
+                st = entry.stat()
+                stamps[entry.name[:-len(".json")]] = [st.st_mtime_ns, st.st_size]
+        return stamps
+
+    def iter_analyses(self, category: str | None = None) -> Iterator[tuple[str, dict]]:
+        """
+        (slug, analysis)를 slug 순으로 반환한다. category를 주면 해당 카테고리만 반환한다.
+        읽을 수 없는 파일은 건너뛴다.
+        """
+        if not ANALYSIS_DIR.exists():
+            return
+        for path in sorted(ANALYSIS_DIR.glob("*.json")):
+            try:
+                analysis = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error("analysis 파일 읽기 실패, 스킵: path=%s, %s", path, e)
+                continue
+            if category is None or analysis.get("category", "etc") == category:
+                yield path.stem, analysis
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteStore:
+    """
+    글·분석 결과를 SQLite(WAL) 파일 하나에 저장한다.
+    스레드 간에는 연결 하나를 락으로 공유하고, 파싱 프로세스는 각자 연결을 연다.
+    인덱스 조회 한 번이면 되므로 최근 글 캐시는 두지 않는다.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = STORE_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """DB 연결을 반환한다. 호출 측에서 _lock을 잡고 있어야 한다."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS posts (
+                    slug TEXT PRIMARY KEY,
+                    url TEXT,
+                    data TEXT NOT NULL,
+                    updated_ns INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS analyses (
+                    slug TEXT PRIMARY KEY,
+                    category TEXT,
+                    has_tone INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_ns INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_analyses_category ON analyses (category, slug);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _fetch_data(self, table: str, slug: str) -> dict | None:
+        with self._lock:
+            row = self._get_conn().execute(
+                f"SELECT data FROM {table} WHERE slug = ?", (slug,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_post(self, slug: str) -> dict | None:
+        return self._fetch_data("posts", slug)
+
+    def put_post(self, slug: str, post: dict) -> None:
+        data = json.dumps(post, ensure_ascii=False)
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO posts (slug, url, data, updated_ns) VALUES (?, ?, ?, ?)",
+                (slug, post.get("url"), data, time.time_ns()),
+            )
+            conn.commit()
+
+    def iter_posts(self) -> Iterator[tuple[str, dict]]:
+        with self._lock:
+            rows = self._get_conn().execute("SELECT slug, data FROM posts ORDER BY slug").fetchall()
+        for slug, data in rows:
+            yield slug, json.loads(data)
+
+    def get_analysis(self, slug: str) -> dict | None:
+        return self._fetch_data("analyses", slug)
+
+    def put_analysis(self, slug: str, analysis: dict) -> None:
+        data = json.dumps(analysis, ensure_ascii=False)
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO analyses (slug, category, has_tone, data, updated_ns)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    slug,
+                    analysis.get("category", "etc"),
+                    int("tone_and_manner" in analysis),
+                    data,
+                    time.time_ns(),
+                ),
+            )
+            conn.commit()
+
+    def has_analysis(self, slug: str) -> bool:
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT 1 FROM analyses WHERE slug = ?", (slug,)
+            ).fetchone()
+        return row is not None
+
+    def analysis_stamps(self) -> dict[str, list[int]]:
+        """{slug: 변경 감지용 값}. SQLite 저장소는 [마지막 기록 시각(ns)]을 사용한다."""
+        with self._lock:
+            rows = self._get_conn().execute("SELECT slug, updated_ns FROM analyses").fetchall()
+        return {slug: [updated_ns] for slug, updated_ns in rows}
+
+    def iter_analyses(self, category: str | None = None) -> Iterator[tuple[str, dict]]:
+        """(slug, analysis)를 slug 순으로 반환한다. category를 주면 인덱스로 해당 카테고리만 읽는다."""
+        with self._lock:
+            conn = self._get_conn()
+            if category is None:
+                rows = conn.execute("SELECT slug, data FROM analyses ORDER BY slug").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT slug, data FROM analyses WHERE category = ? ORDER BY slug", (category,)
+                ).fetchall()
+        for slug, data in rows:
+            yield slug, json.loads(data)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_store: FileStore | SqliteStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> FileStore | SqliteStore:
+    """STORAGE_BACKEND("files" / "sqlite")에 맞는 프로세스 공용 저장소를 반환한다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SqliteStore() if STORAGE_BACKEND == "sqlite" else FileStore()
+        return _store
+
+
+def copy_store(source: FileStore | SqliteStore, target: FileStore | SqliteStore) -> tuple[int, int]:
+    """source의 모든 글·분석 결과를 target에 복사하고 (글 수, 분석 수)를 반환한다."""
+    posts = analyses = 0
+    for slug, post in source.iter_posts():
+        target.put_post(slug, post)
+        posts += 1
+    for slug, analysis in source.iter_analyses():
+        target.put_analysis(slug, analysis)
+        analyses += 1
+    return posts, analyses
+
+
+def import_files() -> tuple[int, int]:
+    """기존 파일 레이아웃(parsed_posts/, analysis/)을 SQLite 저장소로 가져온다."""
+    target = SqliteStore()
+    try:
+        return copy_store(FileStore(), target)
+    finally:
+        target.close()
+
+
+def export_files() -> tuple[int, int]:
+    """SQLite 저장소의 내용을 기존 파일 레이아웃(parsed_posts/, analysis/)으로 내보낸다."""
+    source = SqliteStore()
+    try:
+        return copy_store(source, FileStore())
+    finally:
+        source.close()
@@ -0,0 +1,71 @@
+"""
+URL 정규화. 같은 글을 가리키는 여러 URL 형태를 하나의 정규 URL로 바꾼다.
+
+- 네이버 블로그: blog.naver.com/{blogId}/{logNo}, m.blog.naver.com/{blogId}/{logNo},
+  (m.)blog.naver.com/PostView.naver|nhn?blogId=…&logNo=… → https://blog.naver.com/{blogId}/{logNo}
+- 티스토리 모바일: {blog}.tistory.com/m/{n} → {blog}.tistory.com/{n}
+- 네이버 블로그 본문 주소: naver_postview_url()이 위 형태를 모두 PostView 주소로 바꾼다 (크롤링용)
+- 공통: 소문자 호스트, www. 제거, 프래그먼트·추적용 쿼리(utm_* 등) 제거, 쿼리 정렬, 끝 슬래시 제거
+"""
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+_NAVER_BLOG_HOSTS = {"blog.naver.com", "m.blog.naver.com"}
+_NAVER_POSTVIEW_PATHS = {"/PostView.naver", "/PostView.nhn"}
+
+# 글 내용과 무관한 유입 추적용 쿼리 파라미터
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "from", "ref", "trackingCode", "redirect", "widgetTypeCall"}
+
+
+def _is_tracking(key: str) -> bool:
+    return key in _TRACKING_PARAMS or key.startswith("utm_")
+
+
+def naver_post_id(url: str) -> tuple[str, str] | None:
+    """네이버 블로그 글 URL이면 (blogId, logNo)를, 아니면 None을 반환한다."""
+    parsed = urlparse(url)
+    if parsed.netloc.lower() not in _NAVER_BLOG_HOSTS:
+        return None
+
+    if parsed.path in _NAVER_POSTVIEW_PATHS:
+        query = dict(parse_qsl(parsed.query))
+        if query.get("blogId") and query.get("logNo", "").isdigit():
+            return query["blogId"], query["logNo"]
+        return None
+
+    parts = parsed.path.strip("/").split("/")
+    if len(parts) == 2 and parts[1].isdigit():
+        return parts[0], parts[1]
+    return None
+
+
+def naver_postview_url(url: str) -> str | None:
+    """
+    네이버 블로그 글 URL이면 본문이 들어 있는 PostView 페이지 URL을 반환한다.
+    blog.naver.com/{blogId}/{logNo}는 본문을 iframe(PostView)으로 싣는 틀 페이지라서,
+    틀을 받지 않고 iframe 주소를 바로 만든다. 글 URL이 아니면 None.
+    """
+    naver = naver_post_id(url)
+    if naver is None:
+        return None
+    return f"https://blog.naver.com/PostView.naver?blogId={naver[0]}&logNo={naver[1]}"
+
+
+def canonical_url(url: str) -> str:
+    """같은 글을 가리키는 URL이면 같은 문자열이 되도록 정규화한다."""
+    url = url.strip()
+    naver = naver_post_id(url)
+    if naver is not None:
+        return f"https://blog.naver.com/{naver[0]}/{naver[1]}"
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower().removeprefix("www.")
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+
+    path = parsed.path.rstrip("/") or "/"
+    if host.endswith(".tistory.com") and path.startswith("/m/"):
+        path = path[len("/m"):]
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parsed.query) if not _is_tracking(k)))
+    scheme = "https" if parsed.scheme in ("http", "https") else parsed.scheme
+    return urlunparse((scheme, host, path, "", query, ""))